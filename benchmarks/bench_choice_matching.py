@@ -0,0 +1,156 @@
+"""
+bench_choice_matching.py — Benchmark des Choice-Matchings (valid_choice_slot ohne LLM-Fallback)
+
+Vergleicht die frühere Implementierung (Normalisierung je Aufruf + difflib.SequenceMatcher) mit dem
+vorberechneten ChoiceIndex auf den Auswahllisten aller Formulare sowie einer längeren Liste.
+Eingaben: exakte Labels, Kleinschreibung, Teilwörter, Tippfehler (Auslassung, Vertauschung,
+Verdopplung, Ersetzung), Umlaut-Umschreibungen und Nicht-Treffer.
+
+    python benchmarks/bench_choice_matching.py
+    python benchmarks/bench_choice_matching.py --repeat 20 --cutoff 0.75
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.choice_index import ChoiceIndex, choice_index_for  # noqa: E402
+
+# Zusätzliche, längere Auswahlliste (Rechtsformen)
+LEGAL_FORMS = [
+    "Einzelunternehmen", "GbR", "OHG", "KG", "GmbH", "UG (haftungsbeschränkt)", "GmbH & Co. KG",
+    "AG", "eG", "e.K.", "PartG", "PartG mbB", "KGaA", "SE", "Limited", "Verein (e.V.)",
+    "Stiftung", "Körperschaft des öffentlichen Rechts", "Anstalt des öffentlichen Rechts",
+    "Sonstige Rechtsform",
+]
+NON_MATCHES = ["vielleicht", "weiß nicht", "Fahrrad", "asdf", "Montag", "keine Ahnung"]
+
+
+# --- frühere Implementierung (Referenz) ------------------------------------
+_UMLAUT_MAP = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue"})
+
+
+def _normalize_old(s: str) -> str:
+    s = s.strip().translate(_UMLAUT_MAP)
+    s = "".join(ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch))
+    s = re.sub(r"[^a-z0-9\s]", " ", s.lower())
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def best_choice_match_old(user_text: str, choices: List[str]) -> Tuple[Optional[str], float]:
+    ut = _normalize_old(user_text)
+    if not ut:
+        return None, 0.0
+    ut_tokens = set(ut.split())
+    best: Tuple[Optional[str], float] = (None, 0.0)
+    for choice in choices:
+        ct = _normalize_old(choice)
+        if not ct:
+            continue
+        if ut == ct:
+            return choice, 1.0
+        ct_tokens = set(ct.split())
+        if (ut in ct or ut_tokens.issubset(ct_tokens)) and 0.92 > best[1]:
+            best = (choice, 0.92)
+        score = max(SequenceMatcher(None, ut, ct).ratio(),
+                    max((SequenceMatcher(None, ut, w).ratio() for w in ct_tokens), default=0.0))
+        if score > best[1]:
+            best = (choice, score)
+    return best
+
+
+# --- Eingaben ---------------------------------------------------------------
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word + word[-1]
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("drop", "swap", "double", "replace"))
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "double":
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + rng.choice("aeiounrst") + word[i + 1:]
+
+
+def make_inputs(choices: List[str], rng: random.Random) -> List[Tuple[str, Optional[str]]]:
+    """(input, expected choice or None) pairs for one choice list."""
+    cases: List[Tuple[str, Optional[str]]] = []
+    for choice in choices:
+        words = choice.split()
+        cases.append((choice, choice))
+        cases.append((choice.lower(), choice))
+        cases.append((words[0], choice))
+        cases.append((_typo(choice, rng), choice))
+        cases.append((_typo(words[0], rng), choice))
+        if any(ch in choice for ch in "äöüÄÖÜß"):
+            cases.append((choice.translate(_UMLAUT_MAP), choice))
+    cases.extend((text, None) for text in NON_MATCHES)
+    return cases
+
+
+def load_choice_lists(forms_path: Path) -> List[List[str]]:
+    lists = []
+    for fname in sorted(os.listdir(forms_path)):
+        if fname.endswith(".json"):
+            with open(forms_path / fname, encoding="utf-8") as f:
+                lists.extend(slot["choices"] for slot in json.load(f).get("slots", []) if slot.get("choices"))
+    lists.append(LEGAL_FORMS)
+    return lists
+
+
+def run(label: str, match, workload, repeat: int, cutoff: float) -> None:
+    hits = correct = calls = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for choices, cases in workload:
+            for text, expected in cases:
+                choice, score = match(text, choices)
+                calls += 1
+                if score >= cutoff:
+                    hits += 1
+                    correct += choice == expected
+                else:
+                    correct += expected is None
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1e6 / calls:8.1f} µs/Eingabe   "
+          f"Treffer {hits / repeat:6.0f}   korrekt {correct / calls:6.1%}   ({calls} Aufrufe)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des Choice-Matchings.")
+    parser.add_argument("--forms-path", default=str(ROOT / "forms" / "ge"))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--cutoff", type=float, default=0.75, help="Schwelle wie in chatbot_fn")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    workload = [(choices, make_inputs(choices, rng)) for choices in load_choice_lists(Path(args.forms_path))]
+    print(f"{len(workload)} Auswahllisten, {sum(len(c) for _, c in workload)} Eingaben, cutoff {args.cutoff}\n")
+
+    start = time.perf_counter()
+    for choices, _ in workload:
+        ChoiceIndex(choices)
+    print(f"Indexaufbau: {(time.perf_counter() - start) * 1e3:.2f} ms für alle Listen\n")
+
+    run("difflib (bisher)", best_choice_match_old, workload, args.repeat, args.cutoff)
+    run("ChoiceIndex", lambda text, choices: choice_index_for(choices).best_match(text),
+        workload, args.repeat, args.cutoff)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
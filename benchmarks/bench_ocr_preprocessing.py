@@ -0,0 +1,99 @@
+"""
+bench_ocr_preprocessing.py — Benchmark der OCR mit und ohne Bildvorverarbeitung
+
+Erkennt jedes Beispielbild aus dem Manifest (benchmarks/ocr_samples.json) einmal ohne Vorverarbeitung
+und einmal mit den Schritten aus --steps (Default: OCR_PREPROCESS, falls gesetzt, sonst alle) und meldet die mittlere
+OCR-Zeit (inkl. Vorverarbeitung) sowie den Anteil der erwarteten Felder, die im OCR-Text gefunden
+werden (Vergleich nach normalize_choice_text, d. h. ohne Groß-/Kleinschreibung, Umlaute, Satzzeichen).
+
+Manifest: {"<Bildpfad relativ zum Repo>": {"document_long_side_mm": 85.6, "expected": ["Feld", ...]}}
+
+    python benchmarks/bench_ocr_preprocessing.py
+    python benchmarks/bench_ocr_preprocessing.py --repeat 5 --lang deu
+    python benchmarks/bench_ocr_preprocessing.py --steps grayscale,resize
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.choice_index import normalize_choice_text  # noqa: E402
+from src.ocr import OCR_LANG, ocr_page  # noqa: E402
+from src.ocr_preprocessing import STEPS, PreprocessConfig  # noqa: E402
+
+
+def load_samples(path: Path) -> Dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def found_fields(text: str, expected: List[str]) -> List[str]:
+    haystack = normalize_choice_text(text)
+    return [field for field in expected if normalize_choice_text(field) in haystack]
+
+
+def run(img, config: PreprocessConfig, expected: List[str], repeat: int, lang: str) -> Tuple[float, List[str]]:
+    """(mean seconds per OCR call, fields found in the last run)."""
+    text = ""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = ocr_page(img, lang, config)
+    return (time.perf_counter() - start) / repeat, found_fields(text, expected)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark der OCR-Vorverarbeitung.")
+    parser.add_argument("--samples", default=str(ROOT / "benchmarks" / "ocr_samples.json"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--steps", default=os.getenv("OCR_PREPROCESS") or ",".join(STEPS),
+                        help="Zu messende Schritte (kommagetrennt)")
+    parser.add_argument("--dpi", type=int, default=int(os.getenv("OCR_TARGET_DPI", "300")))
+    args = parser.parse_args(argv)
+
+    candidate = PreprocessConfig(
+        steps=STEPS if args.steps == "all" else tuple(s.strip() for s in args.steps.split(",") if s.strip() in STEPS),
+        target_dpi=args.dpi,
+    )
+    samples = load_samples(Path(args.samples))
+    steps = ",".join(candidate.steps) or "keine"
+    print(f"{len(samples)} Bilder, {args.repeat} Wiederholungen, Schritte: {steps}, "
+          f"Ziel-DPI {candidate.target_dpi}\n")
+
+    totals = {"ohne": [0.0, 0, 0], "mit": [0.0, 0, 0]}   # Zeit, gefundene Felder, erwartete Felder
+    for rel_path, sample in samples.items():
+        img = cv2.imread(str(ROOT / rel_path))
+        if img is None:
+            print(f"{rel_path}: nicht lesbar, übersprungen")
+            continue
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # wie in der App: Seiten kommen als RGB
+        expected = sample.get("expected", [])
+        with_config = candidate.for_document(sample.get("document_long_side_mm", candidate.doc_long_side_mm))
+        print(rel_path)
+        for label, config in (("ohne", PreprocessConfig(steps=())), ("mit", with_config)):
+            seconds, found = run(img, config, expected, args.repeat, args.lang)
+            missing = [field for field in expected if field not in found]
+            totals[label][0] += seconds
+            totals[label][1] += len(found)
+            totals[label][2] += len(expected)
+            print(f"  {label:<5} {seconds * 1e3:8.0f} ms   Felder {len(found)}/{len(expected)}"
+                  + (f"   fehlend: {', '.join(missing)}" if missing else ""))
+
+    print()
+    for label, (seconds, found, expected) in totals.items():
+        accuracy = found / expected if expected else 0.0
+        print(f"{label + ' Vorverarbeitung':<20} {seconds * 1e3:8.0f} ms gesamt   Felder {accuracy:6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+make_ocr_samples.py — Erzeugt die synthetischen Beispielbilder für bench_ocr_preprocessing.py
+
+Alle Angaben sind erfunden. Die Bilder sind mit festem Seed reproduzierbar und liegen in images/:
+
+    hra_auszug_a4.png          – Handelsregisterauszug (HRA) als A4-Seite mit 150 dpi, wie load_file_as_images sie rendert
+    hra_auszug_foto.jpg        – dieselbe Seite als Handyfoto (verkleinert, schräg, Hintergrund, ungleichmäßiges Licht)
+    gewerbeanmeldung_s1.png    – Seite 1 von pdfs/gewerbeanmeldung.pdf mit 150 dpi (PyMuPDF)
+
+    python benchmarks/make_ocr_samples.py
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+ROOT = Path(__file__).resolve().parents[1]
+IMAGES = ROOT / "images"
+DPI = 150
+A4_PX = (round(210 / 25.4 * DPI), round(297 / 25.4 * DPI))
+FONT_DIR = Path("/usr/share/fonts/truetype/dejavu")
+
+HRA_LINES = (
+    ("bold", 30, "Handelsregister A des Amtsgerichts Stuttgart"),
+    ("regular", 22, "Abteilung A   Wiedergabe des aktuellen Registerinhalts"),
+    ("regular", 22, "Nummer der Firma: HRA 734512"),
+    ("regular", 22, ""),
+    ("bold", 24, "1. Anzahl der bisherigen Eintragungen: 3"),
+    ("regular", 22, ""),
+    ("bold", 24, "2. a) Firma:"),
+    ("regular", 22, "Kunzmann Feinmechanik e.K."),
+    ("bold", 24, "b) Sitz, Niederlassung, inländische Geschäftsanschrift:"),
+    ("regular", 22, "Esslingen am Neckar"),
+    ("regular", 22, "Geschäftsanschrift: Pliensaustraße 18, 73728 Esslingen am Neckar"),
+    ("bold", 24, "c) Gegenstand des Unternehmens:"),
+    ("regular", 22, "Herstellung und Reparatur von feinmechanischen Messgeräten"),
+    ("regular", 22, ""),
+    ("bold", 24, "3. a) Allgemeine Vertretungsregelung:"),
+    ("regular", 22, "Der Inhaber vertritt allein."),
+    ("bold", 24, "b) Inhaber, persönlich haftende Gesellschafter:"),
+    ("regular", 22, "Inhaber: Kunzmann, Jonas, Esslingen am Neckar, *14.03.1981"),
+    ("regular", 22, ""),
+    ("bold", 24, "4. Rechtsform, Beginn und Satzung:"),
+    ("regular", 22, "Einzelkaufmann"),
+    ("regular", 22, ""),
+    ("regular", 22, "Tag der letzten Eintragung: 02.05.2023"),
+    ("regular", 18, "Abruf vom 11.09.2024 08:15   Seite 1 von 1"),
+)
+
+
+def _font(weight: str, size: int):
+    name = "DejaVuSans-Bold.ttf" if weight == "bold" else "DejaVuSans.ttf"
+    try:
+        return ImageFont.truetype(str(FONT_DIR / name), size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def hra_page() -> Image.Image:
+    page = Image.new("RGB", A4_PX, "white")
+    draw = ImageDraw.Draw(page)
+    y = 120
+    for weight, size, text in HRA_LINES:
+        draw.text((110, y), text, fill=(20, 20, 20), font=_font(weight, size))
+        y += int(size * 1.9)
+    draw.rectangle((90, 90, A4_PX[0] - 90, y + 30), outline=(60, 60, 60), width=2)
+    return page
+
+
+def photographed(page: Image.Image, seed: int = 7) -> np.ndarray:
+    """Page as a phone photo: smaller, rotated, on a darker background with uneven lighting (RGB)."""
+    rng = np.random.default_rng(seed)
+    doc = cv2.resize(np.asarray(page), None, fx=0.55, fy=0.55, interpolation=cv2.INTER_AREA)
+    h, w = doc.shape[:2]
+    canvas_h, canvas_w = int(h * 1.35), int(w * 1.35)
+    background = np.full((canvas_h, canvas_w, 3), (96, 72, 52), np.uint8)
+    background = cv2.add(background, rng.integers(0, 18, background.shape, dtype=np.uint8))
+    x0, y0 = (canvas_w - w) // 2, (canvas_h - h) // 2
+    background[y0:y0 + h, x0:x0 + w] = doc
+    matrix = cv2.getRotationMatrix2D((canvas_w / 2, canvas_h / 2), 4.0, 1.0)
+    photo = cv2.warpAffine(background, matrix, (canvas_w, canvas_h), borderMode=cv2.BORDER_REPLICATE)
+    ramp = np.linspace(1.0, 0.7, canvas_w, dtype=np.float32)[None, :, None]
+    return np.clip(photo.astype(np.float32) * ramp, 0, 255).astype(np.uint8)
+
+
+def pdf_page(path: Path, index: int = 0) -> Image.Image:
+    import pymupdf
+    with pymupdf.open(path) as doc:
+        pix = doc[index].get_pixmap(alpha=False, matrix=pymupdf.Matrix(DPI / 72, DPI / 72))
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def main() -> int:
+    IMAGES.mkdir(exist_ok=True)
+    page = hra_page()
+    page.save(IMAGES / "hra_auszug_a4.png", optimize=True)
+    Image.fromarray(photographed(page)).save(IMAGES / "hra_auszug_foto.jpg", quality=85)
+    pdf_page(ROOT / "pdfs" / "gewerbeanmeldung.pdf").save(IMAGES / "gewerbeanmeldung_s1.png", optimize=True)
+    print(f"Beispielbilder in {IMAGES} erzeugt")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,15 +9,15 @@ Ziele dieser Überarbeitung:
 
 Voraussetzungen:
 - Bot-Logik: src.bot.chatbot_fn(history, state) liefert neue History/State zurück
-- PDF-Füller: src.pdf_backend.GenericPdfFiller
+- PDF-Füller: src.pdf_backend.GenericPdfFiller (über den Cache src.pdf_cache.PDF_CACHE)
 - Übersetzungen: src.translator.*
-- Helper: src.bot_helper.save_responses_to_json
+- Helper: src.bot_helper.build_responses_payload
+- Ablage: src.artifact_store.ARTIFACT_STORE (out/ mit Index und Verdrängung)
 """
 
 from __future__ import annotations
 import os
 import time
-import uuid
 from pathlib import Path
 from typing import Any, Dict, List
 import cv2
@@ -32,10 +32,12 @@ import streamlit as st
 from openai import OpenAI
 
 # --- Projektabhängige Importe ---
-from src import bot_helper
+from src import bot_helper, bot_texts
 from src.bot import chatbot_fn
-from src.bot_helper import save_responses_to_json, load_forms
-from src.pdf_backend import GenericPdfFiller
+from src.bot_helper import build_responses_payload, load_forms
+from src.artifact_store import ARTIFACT_STORE
+from src.pdf_cache import PDF_CACHE
+from src.openai_clients import get_openai_client as shared_openai_client
 from src.translator import final_msgs, download_button_msgs, files_msgs, pdf_file_msgs
 from src.wizards import ShortCutWizard, ShortCutWizardState, IDCardWizard, IDCardWizardState, PreRegistrationWizardState, PreRegistrationWizard
 from src.bot_helper import extract_information_HRA_info_from_img, extract_information_id_card
@@ -48,6 +50,8 @@ PAGE_TITLE = "Göppingen Chatbot"
 PAGE_ICON = "💬"
 CHAT_INPUT_PLACEHOLDER = "Ihre Nachricht hier eingeben …"
 GREETING_TEXT = "👋 Willkommen! Ich helfe Ihnen beim Ausfüllen von Formularen. Los geht’s!"
+# "viewer" (NeedAppearances) | "generate" (eigene Appearance-Streams) | "flatten" (Felder eingebrannt)
+PDF_APPEARANCE_MODE = os.getenv("PDF_APPEARANCE_MODE", "viewer")
 
 # base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # forms_path = os.path.join(base_path, 'GPBot_v3/forms', 'ge')
@@ -258,14 +262,29 @@ def content_of(message: Any) -> str:
 
 
 def generate_filled_pdf(current_state: Dict[str, Any]) -> str:
-    """Erzeugt das PDF aus dem aktuellen State und gibt den Pfad zur Datei zurück."""
-    os.makedirs("out", exist_ok=True)
-    unique_id = uuid.uuid4().hex
-    json_path = f"out/{unique_id}.json"
-    pdf_path = f"out/{unique_id}.pdf"
-    save_responses_to_json(state=current_state, output_path=json_path)
-    GenericPdfFiller(json_path=json_path).fill(output_path=pdf_path)
-    return pdf_path
+    """
+    Erzeugt das PDF aus dem aktuellen State und gibt die Artefakt-ID zurück.
+    Payload (<id>.json) und PDF (<id>.pdf) liegen im ARTIFACT_STORE; die ID ist der
+    inhaltsadressierte Cache-Schlüssel, identische Antworten werden nicht erneut gefüllt.
+    """
+    payload = build_responses_payload(current_state)
+    artifact_id = PDF_CACHE.key_for(payload, PDF_APPEARANCE_MODE)
+    if not ARTIFACT_STORE.has(artifact_id, "json"):
+        payload_json = json.dumps(payload, ensure_ascii=False, indent=2)
+        ARTIFACT_STORE.put(artifact_id, "json", payload_json.encode("utf-8"))
+    fill_plan = (FORMS.get(current_state.get("form_type")) or {}).get("fill_plan")
+    PDF_CACHE.get_or_fill(payload, plan=fill_plan, appearance=PDF_APPEARANCE_MODE, key=artifact_id)
+    return artifact_id
+
+def load_generated_pdf(artifact_id: str, current_state: Dict[str, Any]) -> bytes:
+    """Liest das PDF zur Artefakt-ID; wurde es inzwischen verdrängt, wird es neu erzeugt."""
+    pdf_bytes = PDF_CACHE.get(artifact_id)
+    if pdf_bytes is None:
+        fill_plan = (FORMS.get(current_state.get("form_type")) or {}).get("fill_plan")
+        pdf_bytes = PDF_CACHE.get_or_fill(
+            build_responses_payload(current_state), plan=fill_plan, appearance=PDF_APPEARANCE_MODE
+        )
+    return pdf_bytes
 
 def set_defaults(state: Dict) -> None:
     """
@@ -393,7 +412,8 @@ def load_file_as_images(uploaded_file, dpi = 150) -> list:
             np_arr = np.frombuffer(img_bytes, np.uint8)
             cv_img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
             if cv_img is not None:
-                images.append(cv_img)
+                # OCR-Pipeline erwartet RGB (siehe ocr_preprocessing.py)
+                images.append(cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB))
 
         return images
 
@@ -410,14 +430,12 @@ if "mini_chat_model" not in st.session_state:
 
 
 def get_openai_client() -> OpenAI:
-    """Initialisiert den OpenAI-Client (Key aus st.secrets, optional base_url)."""
+    """Liefert den gemeinsamen OpenAI-Client (Key aus st.secrets, optional base_url)."""
     base_url = st.secrets.get("OPENAI_BASE_URL")
     api_key = st.secrets.get("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY fehlt in st.secrets")
-    if base_url:
-        return OpenAI(api_key=api_key, base_url=base_url)
-    return OpenAI(api_key=api_key)
+    return shared_openai_client(api_key=api_key, base_url=base_url)
 
 
 def mini_chat_respond(
@@ -648,17 +666,14 @@ def render_completion_ui() -> None:
 
     language_code = form_state.get("lang") or "de"
 
-    # PDF nur einmal erzeugen und cachen
-    if "generated_pdf_path" not in st.session_state:
-        st.session_state.generated_pdf_path = generate_filled_pdf(form_state)
-
-    pdf_path = st.session_state.generated_pdf_path
+    # PDF nur einmal erzeugen; in der Session liegt nur die Artefakt-ID
+    if "generated_artifact_id" not in st.session_state:
+        st.session_state.generated_artifact_id = generate_filled_pdf(form_state)
 
     with st.container(border=True):
         st.subheader("Formular fertiggestellt")
         try:
-            with open(pdf_path, "rb") as pdf_fp:
-                pdf_bytes = pdf_fp.read()
+            pdf_bytes = load_generated_pdf(st.session_state.generated_artifact_id, form_state)
             st.download_button(
                 label=download_button_msgs.get(language_code, download_button_msgs["de"]),
                 data=pdf_bytes,
@@ -676,7 +691,7 @@ def render_completion_ui() -> None:
         show_upload_mock = bool(form_state.get("show_upload"))
         if show_upload_mock:
             st.write("**Upload (Mock)**")
-            upload_label = form_state.get("upload_label") or "Dateien hochladen"
+            upload_label = form_state.get("upload_label") or bot_texts.UPLOAD_LABEL
             files_label = files_msgs.get(language_code, files_msgs["de"]) 
 
             uploaded_files = st.file_uploader(
@@ -794,6 +809,7 @@ def render_shortcut_wizard_ui() -> None:
             if img_file_buffer is not None:
                 bytes_data = img_file_buffer.getvalue()
                 image = cv2.imdecode(np.frombuffer(bytes_data, np.uint8), cv2.IMREAD_COLOR)
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
                 # OCR + LLM-Extraktion
                 with st.spinner("Informationen werden aus dem Bild extrahiert …"):
                     data = extract_information_HRA_info_from_img(image)
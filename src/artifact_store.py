@@ -0,0 +1,247 @@
+"""
+artifact_store.py — Speicherverwaltung für erzeugte Artefakte in out/
+
+Jedes Artefakt (z. B. ein Antwort-Payload und das zugehörige PDF) hat eine ID und pro Art
+("json", "pdf", …) eine Datei <id>.<art> im Wurzelverzeichnis. Ein Index (artifacts.idx)
+hält Größe, Erstellungs- und Zugriffszeit je ID, damit Lookups ohne Verzeichnis-Scan
+auskommen. Einträge werden nach Alter (max_age_seconds) und Gesamtgröße (max_total_bytes,
+am längsten nicht genutzte zuerst) entfernt; 0 bzw. None schaltet die jeweilige Grenze ab.
+
+Mehrere Prozesse (Streamlit-Worker, Batch-Läufe) teilen sich den Index: Änderungen laufen unter
+einer Dateisperre (artifacts.lock) und lesen den Index vorher neu ein, sodass Einträge anderer
+Prozesse nicht überschrieben werden. Verzeichnis und Index werden erst bei der ersten Nutzung
+angelegt bzw. gelesen; relative Pfade beziehen sich auf das Repo-Verzeichnis.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Sperre
+    fcntl = None
+
+from .llm_cache import env_float, resolve_path
+
+INDEX_FILE = "artifacts.idx"
+LOCK_FILE = "artifacts.lock"
+
+
+@dataclass
+class ArtifactEntry:
+    files: Dict[str, int] = field(default_factory=dict)  # Art -> Dateigröße in Bytes
+    created: float = 0.0
+    accessed: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return sum(self.files.values())
+
+
+class ArtifactStore:
+    """Size- and age-bounded artifact storage with an index file shared between processes."""
+
+    def __init__(self, root: str = "out", max_age_seconds: Optional[float] = 30 * 24 * 3600,
+                 max_total_bytes: Optional[int] = 500 * 1024 * 1024):
+        self.root = Path(resolve_path(str(root)))
+        self.max_age_seconds = max_age_seconds or None
+        self.max_total_bytes = max_total_bytes or None
+        self._lock = threading.RLock()
+        self._entries: Dict[str, ArtifactEntry] = {}
+        self._index_mtime: Optional[float] = None
+        self._loaded = False
+
+    # -- Index ---------------------------------------------------------------
+    @property
+    def _index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Thread lock plus exclusive file lock; the index is re-read on entry."""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / LOCK_FILE, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh_locked(force=True)
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_stamp(self) -> Optional[float]:
+        try:
+            return self._index_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self) -> None:
+        """Re-reads the index if another process has written it since the last read."""
+        with self._lock:
+            self._refresh_locked(force=False)
+
+    def _refresh_locked(self, force: bool) -> None:
+        stamp = self._index_stamp()
+        if self._loaded and not force and stamp == self._index_mtime:
+            return
+        if stamp is None:
+            if not self._loaded:
+                self._loaded = True
+                if self.root.is_dir() and any(self.root.iterdir()):
+                    self._scan_locked()
+            return
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            disk = {aid: ArtifactEntry(**entry) for aid, entry in raw.items()}
+        except (OSError, ValueError, TypeError):
+            self._scan_locked()
+            return
+        # Index auf der Platte ist maßgeblich; lokal gemerkte (neuere) Zugriffszeiten bleiben erhalten
+        for aid, entry in disk.items():
+            local = self._entries.get(aid)
+            if local is not None:
+                entry.accessed = max(entry.accessed, local.accessed)
+        self._entries = disk
+        self._index_mtime = stamp
+        self._loaded = True
+
+    def _save_index(self) -> None:
+        tmp_path = self._index_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({aid: asdict(entry) for aid, entry in self._entries.items()}, f)
+        os.replace(tmp_path, self._index_path)
+        self._index_mtime = self._index_stamp()
+
+    def _scan_locked(self) -> None:
+        self._entries = {}
+        if self.root.is_dir():
+            for path in self.root.iterdir():
+                if not path.is_file() or path.name in (INDEX_FILE, LOCK_FILE) or path.suffix in ("", ".tmp"):
+                    continue
+                stat = path.stat()
+                entry = self._entries.setdefault(path.stem, ArtifactEntry(created=stat.st_mtime))
+                entry.files[path.suffix[1:]] = stat.st_size
+                entry.created = min(entry.created, stat.st_mtime)
+                entry.accessed = max(entry.accessed, stat.st_mtime)
+        self._loaded = True
+
+    def rebuild_index(self) -> None:
+        """Rebuilds the index from the files in root (one scan, e.g. for an existing out/ directory)."""
+        with self._locked():
+            self._scan_locked()
+            self._save_index()
+
+    # -- Zugriff -------------------------------------------------------------
+    def path(self, artifact_id: str, kind: str) -> Path:
+        return self.root / f"{artifact_id}.{kind}"
+
+    def has(self, artifact_id: str, kind: str) -> bool:
+        self._refresh()
+        entry = self._entries.get(artifact_id)
+        return entry is not None and kind in entry.files
+
+    def put(self, artifact_id: str, kind: str, data: bytes) -> Path:
+        """Stores data as <artifact_id>.<kind>, updates the index and evicts if necessary."""
+        path = self.path(artifact_id, kind)
+        with self._locked():
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            now = time.time()
+            entry = self._entries.setdefault(artifact_id, ArtifactEntry(created=now))
+            entry.files[kind] = len(data)
+            entry.accessed = now
+            self._evict_locked(now, keep=artifact_id)
+            self._save_index()
+        return path
+
+    def get(self, artifact_id: str, kind: str) -> Optional[bytes]:
+        """
+        Returns the stored bytes or None. A hit refreshes the access time in memory; it is
+        written to the index with the next change of this process.
+        """
+        if not self.has(artifact_id, kind):
+            return None
+        try:
+            data = self.path(artifact_id, kind).read_bytes()
+        except OSError:
+            with self._locked():
+                entry = self._entries.get(artifact_id)
+                if entry is not None:
+                    entry.files.pop(kind, None)
+                    if not entry.files:
+                        del self._entries[artifact_id]
+                self._save_index()
+            return None
+        with self._lock:
+            entry = self._entries.get(artifact_id)
+            if entry is not None:
+                entry.accessed = time.time()
+        return data
+
+    def delete(self, artifact_id: str) -> None:
+        with self._locked():
+            self._delete_locked(artifact_id)
+            self._save_index()
+
+    def _delete_locked(self, artifact_id: str) -> None:
+        entry = self._entries.pop(artifact_id, None)
+        if entry is None:
+            return
+        for kind in entry.files:
+            try:
+                self.path(artifact_id, kind).unlink()
+            except OSError:
+                pass
+
+    # -- Verdrängung ---------------------------------------------------------
+    @property
+    def total_bytes(self) -> int:
+        self._refresh()
+        return sum(entry.size for entry in self._entries.values())
+
+    def evict(self) -> int:
+        """Removes expired artifacts and, if over max_total_bytes, the least recently used ones."""
+        with self._locked():
+            removed = self._evict_locked(time.time())
+            if removed:
+                self._save_index()
+        return removed
+
+    def _evict_locked(self, now: float, keep: Optional[str] = None) -> int:
+        removed = 0
+        if self.max_age_seconds is not None:
+            for artifact_id in [aid for aid, e in self._entries.items()
+                                if aid != keep and now - e.created > self.max_age_seconds]:
+                self._delete_locked(artifact_id)
+                removed += 1
+        if self.max_total_bytes is not None:
+            total = sum(entry.size for entry in self._entries.values())
+            if total > self.max_total_bytes:
+                for artifact_id, entry in sorted(self._entries.items(), key=lambda item: item[1].accessed):
+                    if total <= self.max_total_bytes:
+                        break
+                    if artifact_id == keep:
+                        continue
+                    total -= entry.size
+                    self._delete_locked(artifact_id)
+                    removed += 1
+        return removed
+
+
+# Prozessweiter Speicher für out/ (OUT_MAX_AGE_DAYS / OUT_MAX_MB = 0 schaltet die Grenze ab)
+ARTIFACT_STORE = ArtifactStore(
+    root=os.getenv("OUT_DIR", "out"),
+    max_age_seconds=env_float("OUT_MAX_AGE_DAYS", 30) * 24 * 3600,
+    max_total_bytes=int(env_float("OUT_MAX_MB", 500) * 1024 * 1024),
+)
@@ -13,13 +13,15 @@ from .validators import BaseValidators, GewerbeanmeldungValidators
 from .bot_helper import (
     load_forms, next_slot_index, print_summary, map_yes_no_to_bool,
     save_responses_to_json, utter_message_with_translation,
-    compose_prompt_for_slot, valid_choice_slot
+    compose_prompt_for_slot, valid_choice_slot, prefetch_next_slot_translations,
+    batched_translations, set_translated, set_slot_response
 )
 from .wizards import (
     LanguageWizard, LanguageWizardState,
     FormSelectionWizard, FormSelectionWizardState
 )
-from .translator import translate_from_de, translate_to_de
+from .translator import translate_to_de
+from . import bot_texts
 from gradio import ChatMessage
 
 # ---------------------------------------------------------------------------
@@ -97,6 +99,19 @@ def chatbot_fn(
     message: Optional[str],
     history: List[Any],
     state: Optional[Dict[str, Any]]
+) -> Tuple[List[Any], Optional[Dict[str, Any]], str]:
+    """
+    Processes one user turn (see _chatbot_turn). All bot messages of the turn that need a
+    translation are collected and translated together in one request per language.
+    """
+    with batched_translations():
+        return _chatbot_turn(message, history, state)
+
+
+def _chatbot_turn(
+    message: Optional[str],
+    history: List[Any],
+    state: Optional[Dict[str, Any]]
 ) -> Tuple[List[Any], Optional[Dict[str, Any]], str]:
     """
     Ablauf:
@@ -126,7 +141,7 @@ def chatbot_fn(
             "ui": None,                   # UI-Direktive für Streamlit (aktueller Slot)
             "completed": False,           # Abschlussstatus (PDF-Buttons)
             "show_upload": False,         # Upload einblenden
-            "upload_label": "Dateien hochladen",
+            "upload_label": bot_texts.UPLOAD_LABEL,
             "awaiting_first_slot_prompt": False  # nach Shortcut-Mapping: erste Slotfrage
         }
 
@@ -277,18 +292,13 @@ def chatbot_fn(
         next_idx, state = next_slot_index(slots_def, state)
         if next_idx is None:
             # Nichts mehr zu tun → direkt in Abschluss-Flow springen
-            thanks = (
-                "Vielen Dank! Das Formular ist abgeschlossen. "
-                "Nachdem Sie das Formular unterschrieben haben, können Sie es hier zur elektronischen Übermittlung direkt hochladen."
-            )
-            history = utter_message_with_translation(history, thanks, state.get("lang"))
+            history = utter_message_with_translation(history, bot_texts.FORM_COMPLETED, state.get("lang"))
             print_summary(state=state, forms=FORMS)
             state["completed"] = True
             state["awaiting_final_upload"] = True
             state["show_upload"] = True
-            base_label_de = "Unterschriebenes Formular hochladen und Vorgang abschließen."
-            state["upload_label"] = base_label_de if (state.get("lang") == "de" or not state.get("lang")) \
-                else translate_from_de(base_label_de, state["lang"])
+            base_label_de = bot_texts.FINAL_UPLOAD_LABEL
+            set_translated(state, "upload_label", base_label_de, state.get("lang"))
             state["uploaded_files"] = None
             return history, state, ""
 
@@ -296,14 +306,14 @@ def chatbot_fn(
 
         # Upload-Steuerung für die UI (falls Slot Upload vorsieht)
         state["show_upload"]  = bool(next_def.get("show_upload", False))
-        state["upload_label"] = next_def.get("upload_label", "Dateien hochladen")
-        if state.get("lang") and state["lang"] != "de":
-            state["upload_label"] = translate_from_de(state["upload_label"], state["lang"])
+        set_translated(state, "upload_label", next_def.get("upload_label", bot_texts.UPLOAD_LABEL), state.get("lang"))
 
         # Prompt + UI-Direktive an die Oberfläche geben
         prompt_text = compose_prompt_for_slot(next_def)
         history = utter_message_with_translation(history, prompt_text, state.get("lang"))
         state["ui"] = _build_ui_for_slot(next_def, state=state)
+        # Übersetzungen der voraussichtlich folgenden Slots anstoßen, während der Nutzer antwortet
+        prefetch_next_slot_translations(slots_def, state, next_idx)
         return history, state, ""
 
     # -----------------------------------------------------------------------
@@ -330,15 +340,13 @@ def chatbot_fn(
 
         # --- Choice-Slot -----------------------------------------------------
         if slot_type == "choice":
-            # Fremdsprache → nach Deutsch übersetzen, außer Nutzer gibt Index
+            # Fremdsprache → direkt gegen die lokalisierten Labels matchen (kein translate_to_de-Umweg)
             user_text = (message or "").strip()
-            if state.get("lang") and state["lang"] != "de" and not user_text.rstrip(".").isdigit():
-                user_text = translate_to_de(user_text, state["lang"])
-            selection, matched = valid_choice_slot(user_text, slot_def, cutoff=0.75)
+            selection, matched = valid_choice_slot(user_text, slot_def, cutoff=0.75, lang=state.get("lang"))
             if not matched:
                 history = utter_message_with_translation(
                     history,
-                    "Ungültige Auswahl. Bitte nutzen Sie die Buttons oder geben Sie die Nummer ein.",
+                    bot_texts.INVALID_CHOICE,
                     state.get("lang")
                 )
                 return history, state, ""
@@ -358,7 +366,7 @@ def chatbot_fn(
                 payload["choices"] = slot_def["choices"]
             if check_cond:
                 payload["check_box_condition"] = check_cond
-            state["responses"][slot_name] = payload
+            set_slot_response(slots_def, state, slot_name, payload)
 
             # Hinweise dynamisch ausspielen
             if hints and selection in hints:
@@ -382,7 +390,7 @@ def chatbot_fn(
             if reason:  # optionale Info aus Validator
                 history = utter_message_with_translation(history, reason, state.get("lang"))
 
-            state["responses"][slot_name] = {"value": normalized_value, "target_filed_name": target}
+            set_slot_response(slots_def, state, slot_name, {"value": normalized_value, "target_filed_name": target})
 
         # Slot abgeschlossen → UI-Direktive leeren und Index erhöhen
         state.pop("ui", None)
@@ -397,29 +405,25 @@ def chatbot_fn(
 
         # Upload-Steuerung für die UI (falls Slot Upload vorsieht)
         state["show_upload"]  = bool(next_def.get("show_upload", False))
-        state["upload_label"] = next_def.get("upload_label", "Dateien hochladen")
+        set_translated(state, "upload_label", next_def.get("upload_label", bot_texts.UPLOAD_LABEL), state.get("lang"))
         state["uploaded_files"] = None
-        if state.get("lang") and state["lang"] != "de":
-            state["upload_label"] = translate_from_de(state["upload_label"], state["lang"])
 
         # Prompt + UI-Direktive an die Oberfläche geben
         prompt_text = compose_prompt_for_slot(next_def)
         history = utter_message_with_translation(history, prompt_text, state.get("lang"))
         state["ui"] = _build_ui_for_slot(next_def, state=state)
+        # Übersetzungen der voraussichtlich folgenden Slots anstoßen, während der Nutzer antwortet
+        prefetch_next_slot_translations(slots_def, state, next_idx)
         return history, state, ""
 
     # --- Alle Slots fertig → Abschlussbotschaft, PDF/Upload signalisieren ---
-    thanks = (
-        "Vielen Dank! Das Formular ist abgeschlossen. "
-        "Nachdem Sie das Formular unterschrieben haben, können Sie es hier zur elektronischen Übermittlung direkt hochladen."
-    )
-    history = utter_message_with_translation(history, thanks, state.get("lang"))
+    history = utter_message_with_translation(history, bot_texts.FORM_COMPLETED, state.get("lang"))
     print_summary(state=state, forms=FORMS)
     state["completed"] = True
     state["awaiting_final_upload"] = True
     state["show_upload"] = True
-    base_label_de = "Unterschriebenes Formular hochladen und Vorgang abschließen."
-    state["upload_label"] = base_label_de if (state.get("lang") == "de" or not state.get("lang")) else translate_from_de(base_label_de, state["lang"])
+    base_label_de = bot_texts.FINAL_UPLOAD_LABEL
+    set_translated(state, "upload_label", base_label_de, state.get("lang"))
     state["uploaded_files"] = None
 
     return history, state, ""
@@ -4,7 +4,7 @@ import os
 from .validators import BaseValidators, GewerbeanmeldungValidators
 from .bot_helper import load_forms, next_slot_index, print_summary, map_yes_no_to_bool, save_responses_to_json
 from .llm_validator_service import LLMValidatorService
-from openai import OpenAI
+from .openai_clients import get_openai_client
 from gradio import ChatMessage
 from .pdf_backend import GenericPdfFiller
 
@@ -109,7 +109,7 @@ def chatbot_fn(
             f"Basierend auf der Nutzeranfrage: '{message}' und den folgenden Slot-Beschreibungen,"
             " gib nur den Slot-Namen zurück, der geändert werden soll, ohne zusätzliche Erklärungen:\n" + descriptions
         )
-        slot_key = LLMValidatorService.validate_openai(classify_prompt, "gpt-4.1-mini", OpenAI())
+        slot_key = LLMValidatorService.validate_openai(classify_prompt, "gpt-4.1-mini", get_openai_client())
         if slot_key and any(slot_def['slot_name'] == slot_key for slot_def in slots_def):
             # Index des Slots finden
             edit_idx = next(
@@ -1,29 +1,57 @@
-from typing import Optional, Tuple, List, Dict, Any, Literal
+from typing import Optional, Tuple, List, Dict, Any, Literal, Callable
 import os
 import json
-from .translator import translate_from_de
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .translator import translate_from_de, translate_many, prefetch_from_de
 from gradio import ChatMessage
-from difflib import SequenceMatcher
-import difflib
-import unicodedata
-import re
 from pydantic import BaseModel
 from .llm_validator_service import LLMValidatorService
-from openai import OpenAI
+from .openai_clients import get_openai_client
 import cv2 
-import pytesseract
 from src.validator_helper import response_to_dict
+from .pdf_backend import compile_fill_plan
+from .i18n_bundles import default_i18n_path, load_bundles
+from . import bot_texts
+from .slot_graph import ResponseChange, SlotList, graph_for, is_answered
+from .choice_index import choice_index_for
+from .choice_resolver import choice_resolver_for, register_translations
+from .ocr import ocr_text
+from .ocr_preprocessing import ID_CARD_LONG_SIDE_MM, PREPROCESS_CONFIG
 
 
-def load_forms(form_path:str, validator_map:Dict[str,callable]):
+def load_forms(form_path:str, validator_map:Dict[str,callable], i18n_path:Optional[str] = None):
     forms = {}
+    i18n_path = i18n_path or default_i18n_path(form_path)
     for fname in os.listdir(form_path):
         if fname.endswith(".json"):
             with open(os.path.join(form_path, fname), encoding="utf-8") as f:
                 form_conf = json.load(f)
             validator_class = validator_map[form_conf["validators"]]
             form_conf["validators"] = validator_class
+            # PDF-Vorlage einmalig parsen und Slot→Feld-Plan kompilieren;
+            # Slots mit unbekannten Feldnamen machen das Formular ungültig
+            fill_plan = compile_fill_plan(form_conf)
+            if fill_plan.unknown_fields:
+                unknown = ", ".join(f"{slot} -> {field}" for slot, field in fill_plan.unknown_fields)
+                raise ValueError(f"Formular '{fname}': Feldnamen nicht in {form_conf['pdf_file']} vorhanden: {unknown}")
+            form_conf["fill_plan"] = fill_plan
+            # Bedingungen einmalig zu Abhängigkeitsgraph + Prädikaten kompilieren;
+            # Verweise auf unbekannte oder später definierte Slots machen das Formular ungültig
+            form_conf["slots"] = SlotList(form_conf["slots"])
+            slot_graph = graph_for(form_conf["slots"])
+            if slot_graph.invalid_conditions:
+                invalid = ", ".join(f"{slot} -> {dep}" for slot, dep in slot_graph.invalid_conditions)
+                raise ValueError(f"Formular '{fname}': Bedingungen verweisen auf keinen vorher definierten Slot: {invalid}")
+            form_conf["slot_graph"] = slot_graph
             form_key = fname.rsplit(".", 1)[0]
+            # Vorübersetzte Sprachpakete laden (falls gebaut) und im Übersetzungsspeicher pinnen
+            form_conf["i18n"] = load_bundles(form_key, i18n_path)
+            # Matching-Index der Auswahllisten vorberechnen, übersetzte Labels als Synonyme registrieren
+            for slot in form_conf["slots"]:
+                if slot.get("choices"):
+                    choice_index_for(slot["choices"])
+                    register_translations(slot["choices"], form_conf["i18n"])
             forms[form_key] = form_conf
     return forms
 
@@ -105,60 +133,79 @@ def next_slot_index(
         state['responses'][slot] = {'value': '', 'target_filed_name': ..., 'locked': True}
         und übersprungen.
       - Leere, aber NICHT gelockte Antworten gelten als "noch offen" → werden gefragt.
+    Die Bedingungen kommen vorkompiliert aus dem SlotGraph des Formulars (siehe slot_graph.py).
     """
-    start_idx = int(state.get("idx", 0) or 0)
-    responses = state.setdefault("responses", {})
-
-    def _answered(slot_name: str) -> bool:
-        """True, wenn Slot bereits sinnvoll gefüllt ODER durch Condition-Lock gesperrt ist."""
-        entry = responses.get(slot_name)
-        if not entry:
-            return False
-        if entry.get("locked"):
-            return True
-        val = entry.get("value")
-        # leere Strings/Listen/Dicts = nicht beantwortet
-        return val not in (None, "", [], {})
-
-    for i in range(start_idx, len(slots_def)):
-        slot_def = slots_def[i]
-        slot_name = slot_def["slot_name"]
-        cond = slot_def.get("condition")
-
-        # Bereits beantwortet? -> weiter
-        if _answered(slot_name):
-            continue
-
-        # Condition prüfen
-        if cond:
-            dep = cond["slot_name"]
-            assert responses.get(dep) is not None, \
-                "The slot on which a slot is conditioned needs to be asked first!"
-
-            dep_val = responses.get(dep, {}).get("value")
-            should_ask = False
+    return graph_for(slots_def).next_open(state), state
 
-            if cond["slot_value"] == "not empty":
-                should_ask = bool(dep_val)
-            elif isinstance(cond["slot_value"], list):
-                should_ask = dep_val in cond["slot_value"]
-            else:
-                should_ask = (dep_val == cond["slot_value"])
 
-            if not should_ask:
-                # soft-skip: als gelockt markieren, damit wir später nicht wiederkommen
-                responses[slot_name] = {
-                    "value": "",
-                    "target_filed_name": slot_def.get("filed_name"),
-                    "locked": True
-                }
-                continue  # nächsten Slot prüfen
+def set_slot_response(
+    slots_def: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    slot_name: str,
+    entry: Dict[str, Any]
+) -> ResponseChange:
+    """
+    Stores a response and re-evaluates the slots whose condition depends on it. The returned
+    ResponseChange lists answers that were set aside (locked) or brought back (restored); it is
+    internal information and not shown to the user.
+    """
+    return graph_for(slots_def).set_response(state, slot_name, entry)
 
-        # Wenn wir hier sind: Slot ist dran
-        return i, state
 
-    # Keine weiteren Slots
-    return None, state
+def predict_next_slots(
+    slots_def: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    after_idx: int,
+    limit: int = 2
+) -> List[int]:
+    """
+    Indices of the slots most likely asked after slot `after_idx` has been answered (without changing state).
+    Slots whose condition depends on a still unanswered slot are possible candidates; the search then
+    continues with the following slot, which is asked if the condition turns out to be false.
+    """
+    graph = graph_for(slots_def)
+    responses = state.get("responses", {})
+    current = slots_def[after_idx]["slot_name"]
+    candidates: List[int] = []
+    for i in range(after_idx + 1, len(slots_def)):
+        if is_answered(responses.get(slots_def[i]["slot_name"])):
+            continue
+        predicate = graph.predicates[i]
+        if predicate is not None:
+            dep = graph.depends_on[i]
+            dep_entry = responses.get(dep)
+            dep_open = dep_entry is None or dep == current
+            # Bekannte Abhängigkeit nicht erfüllt -> Slot wird übersprungen
+            if not dep_open and not predicate(dep_entry.get("value")):
+                continue
+        candidates.append(i)
+        if len(candidates) >= limit:
+            break
+    return candidates
+
+
+def slot_texts_de(slot_def: Dict[str, Any]) -> List[str]:
+    """German texts shown for a slot: prompt, upload label, choice labels and hints."""
+    texts = [compose_prompt_for_slot(slot_def), slot_def.get("upload_label", bot_texts.UPLOAD_LABEL)]
+    texts.extend(slot_def.get("choices", []))
+    texts.extend((slot_def.get("hints") or {}).values())
+    return [t for t in texts if t]
+
+
+def prefetch_next_slot_translations(
+    slots_def: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    cur_idx: int,
+    limit: int = 2
+) -> int:
+    """Starts background translations for the slots likely asked after `cur_idx` (no-op for German)."""
+    lang = state.get("lang")
+    if not lang or lang == "de":
+        return 0
+    texts: List[str] = []
+    for i in predict_next_slots(slots_def, state, cur_idx, limit=limit):
+        texts.extend(slot_texts_de(slots_def[i]))
+    return prefetch_from_de(texts, lang)
 
 
 def print_summary(state: Dict[str, Any], forms: Dict[str, Any]) -> None:
@@ -210,10 +257,10 @@ def map_yes_no_to_bool(selection: str) -> str:
         return "false"
     return selection  # fallback: unverändert
 
-def save_responses_to_json(state: dict, output_path: str):
+def build_responses_payload(state: dict) -> dict:
     """
-    Liest alle Antworten aus state['responses'] aus und schreibt sie
-    als JSON im Format { slot_name: { value, target_filed_name } }.
+    Liest alle Antworten aus state['responses'] aus und baut daraus das Payload
+    im Format { slot_name: { value, target_filed_name } }, das GenericPdfFiller erwartet.
     """
     responses = state.get("responses", {})
     out_data = {}
@@ -233,13 +280,19 @@ def save_responses_to_json(state: dict, output_path: str):
                 "check_box_condition": check_box_condition
             }
 
-    result = {
+    return {
         "form_type": state.get("form_type"),
         "lang":       state.get("lang"),
         "data":       out_data,
         "pdf_file": state.get("pdf_file")
     }
 
+def save_responses_to_json(state: dict, output_path: str):
+    """
+    Schreibt das Payload aus build_responses_payload als JSON nach output_path.
+    """
+    result = build_responses_payload(state)
+
     # Verzeichnis anlegen, falls nicht existent
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
@@ -249,6 +302,51 @@ def save_responses_to_json(state: dict, output_path: str):
 
     print(f"Antworten gespeichert in {output_path}")
 
+# Innerhalb von batched_translations() gesammelte Übersetzungen: (Text, Sprache, Setter)
+_PENDING_TRANSLATIONS: ContextVar[Optional[List[Tuple[str, str, Callable[[str], None]]]]] = \
+    ContextVar("pending_translations", default=None)
+
+
+@contextmanager
+def batched_translations():
+    """
+    Collects all translations requested via utter_message_with_translation / set_translated inside the
+    block and translates them on exit with one translate_many call per language.
+    Messages and values hold the German text until then.
+    """
+    pending: List[Tuple[str, str, Callable[[str], None]]] = []
+    token = _PENDING_TRANSLATIONS.set(pending)
+    try:
+        yield
+    finally:
+        _PENDING_TRANSLATIONS.reset(token)
+
+    by_lang: Dict[str, List[Tuple[str, Callable[[str], None]]]] = {}
+    for text, lang, apply in pending:
+        by_lang.setdefault(lang, []).append((text, apply))
+    for lang, items in by_lang.items():
+        translated = translate_many([text for text, _ in items], lang)
+        for (_, apply), translation in zip(items, translated):
+            apply(translation)
+
+
+def _translate_or_defer(text_de: str, target_lang: str, apply: Callable[[str], None]) -> None:
+    pending = _PENDING_TRANSLATIONS.get()
+    if pending is None:
+        apply(translate_from_de(text_de, target_lang))
+    else:
+        apply(text_de)
+        pending.append((text_de, target_lang, apply))
+
+
+def set_translated(target: Dict[str, Any], key: str, text_de: str, target_lang: Optional[str]) -> None:
+    """Sets target[key] to text_de translated into target_lang (deferred inside batched_translations)."""
+    if not target_lang or target_lang == "de":
+        target[key] = text_de
+        return
+    _translate_or_defer(text_de, target_lang, lambda value: target.__setitem__(key, value))
+
+
 def utter_message_with_translation(history, prompt:str, target_lang:str, source_lang:str = None):
     if target_lang == 'de':
         history.append(ChatMessage(role="assistant", content = prompt))
@@ -257,7 +355,9 @@ def utter_message_with_translation(history, prompt:str, target_lang:str, source_
     elif target_lang == None: # no message selected yet -> wizards utters message in user language
         history.append(ChatMessage(role="assistant", content = prompt))
     else:
-        history.append(ChatMessage(role='assistant', content = translate_from_de(prompt,target_lang)))
+        message = ChatMessage(role='assistant', content = prompt)
+        history.append(message)
+        _translate_or_defer(prompt, target_lang, lambda content: setattr(message, "content", content))
     return history
 
 def compose_prompt_for_slot(slot_def: Dict[str, Any]) -> str:
@@ -287,71 +387,17 @@ def compose_prompt_for_slot(slot_def: Dict[str, Any]) -> str:
     return prompt
 
 
-_UMLAUT_MAP = str.maketrans({
-    "ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
-    "Ä": "Ae", "Ö": "Oe", "Ü": "Ue",
-})
-
-def _strip_accents(s: str) -> str:
-    # Entfernt Diakritika (z. B. französische Akzente)
-    nfkd = unicodedata.normalize("NFKD", s)
-    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
-
-def _normalize(s: str) -> str:
-    s = s.strip().translate(_UMLAUT_MAP)
-    s = _strip_accents(s)
-    s = s.lower()
-    # Nur Buchstaben/Ziffern/Leerzeichen behalten
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    # Mehrfachspaces vereinheitlichen
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def _similar(a: str, b: str) -> float:
-    return SequenceMatcher(None, a, b).ratio()  # 0..1
-
 # --- Fuzzy Choice Matching ---
 
 def _best_choice_match(user_text: str, choices: List[str]) -> Tuple[Optional[str], float]:
     """
     Liefert (beste_choice, score). Score 1.0 = perfekt, 0.0 = kein Match.
-    Heuristik:
+    Heuristik (über den vorberechneten ChoiceIndex der Auswahlliste, siehe choice_index.py):
       1) exakter Normalized-Match
       2) Token-Subset/Substring-Match
-      3) Fuzzy-Score (difflib)
+      3) Fuzzy-Score (bit-paralleles LCS)
     """
-    ut = _normalize(user_text)
-    if not ut:
-        return None, 0.0
-    ut_tokens = set(ut.split())
-
-    best: Tuple[Optional[str], float] = (None, 0.0)
-
-    for choice in choices:
-        ct = _normalize(choice)
-        if not ct:
-            continue
-        # 1) Exakt?
-        if ut == ct:
-            return choice, 1.0
-
-        # 2) Token-Subset / Substring
-        ct_tokens = set(ct.split())
-        # Nutzer gibt z.B. "uebernahme" und Choice ist "uebernahme erbfolge kauf pacht"
-        if ut in ct or ut_tokens.issubset(ct_tokens):
-            score = 0.92  # hoch, aber nicht perfekt
-            if score > best[1]:
-                best = (choice, score)
-
-        # 3) Fuzzy-Ähnlichkeit (Tippfehler)
-        # Vergleiche sowohl Gesamtausdruck als auch gegen das längste Wort in der Choice
-        sim_full = _similar(ut, ct)
-        sim_word = max((_similar(ut, w) for w in ct_tokens), default=0.0)
-        score = max(sim_full, sim_word)
-        if score > best[1]:
-            best = (choice, score)
-
-    return best
+    return choice_index_for(choices).best_match(user_text)
 
 # --- Öffentliche API ---
 
@@ -361,11 +407,14 @@ def ensure_string(value) -> str:
     return value
 
 
-def valid_choice_slot(message: str, slot_def: Dict[str, Any], cutoff: float = 0.85) -> bool:
+def valid_choice_slot(message: str, slot_def: Dict[str, Any], cutoff: float = 0.85,
+                      lang: Optional[str] = None) -> bool:
     """
     Wie deine Originalfunktion, aber mit fuzzy Matching.
     - Ziffern-Index (1-basiert) bleibt erhalten.
-    - Textvergleich nutzt Normalisierung, Token-Containment und difflib-Score.
+    - Textvergleich nutzt Normalisierung, Token-Containment und LCS-Score (ChoiceIndex).
+    - Mit lang != "de" wird die unübersetzte Antwort zusätzlich gegen die lokalisierten Labels geprüft;
+      das Ergebnis ist immer das deutsche Label.
     """
     choices: List[str] = slot_def.get("choices", [])
     text = message.strip()
@@ -377,14 +426,19 @@ def valid_choice_slot(message: str, slot_def: Dict[str, Any], cutoff: float = 0.
             print(f"Index match: '{text}' -> '{choices[idx]}'")
             return message , True
 
-    # 2) Fuzzy-Text-Match
+    # 2) Fuzzy-Text-Match (deutsche Labels, z. B. Button-Klick)
     match, score = _best_choice_match(text, choices)
+    # 3) Sitzungssprache: lokalisierte Labels statt translate_to_de-Umweg
+    if score < cutoff and lang and lang != "de":
+        local_match, local_score = choice_resolver_for(choices).match_localized(text, lang)
+        if local_score > score:
+            match, score = local_match, local_score
     if score < cutoff:
         print(f"Fuzzy match failed: '{text}' -> '{match}' (score {score:.2f})")
-        # llm fallback
-        match, score = llm_based_match(message, choices)
-        print(f"LLM match: '{text}' -> '{match}' (score {score:.2f})")
-        return match, score >= 0.5
+        # Fallback: Cache -> Synonymtabelle -> LLM (siehe choice_resolver.py)
+        match, score, tier = choice_resolver_for(choices).resolve(text, llm=llm_based_match)
+        print(f"Resolver match ({tier or 'none'}): '{text}' -> '{match}' (score {score:.2f})")
+        return match, match is not None
     
     return match, score >= cutoff
 
@@ -399,18 +453,17 @@ def fuzzy_choice_match(message: str, choices: List[str], cutoff: float = 0.85) -
     print(f"Fuzzy match: '{text}' -> '{match}' (score {score:.2f})")
     if score >= cutoff:
         return match
-    else: # llm fallback
-        match, llm_score = llm_based_match(message, choices)
-        print(f"LLM match: '{text}' -> '{match}' (score {llm_score:.2f})")
-        if llm_score >= 0.5:
-            return match
+    else: # Fallback: Cache -> Synonymtabelle -> LLM
+        match, llm_score, tier = choice_resolver_for(choices).resolve(text, llm=llm_based_match)
+        print(f"Resolver match ({tier or 'none'}): '{text}' -> '{match}' (score {llm_score:.2f})")
+        return match
 
 class ActivityCheckResponse(BaseModel):
     match: int
     score: float
 
-def llm_based_match(message:str, choices: List[str]) -> Dict:
-    '''performs choice matching based on an llm call'''
+def llm_based_match(message:str, choices: List[str]) -> Tuple[Optional[str], float]:
+    '''performs choice matching based on an llm call; returns (choice label or None, score)'''
 
     choice_text = "\n".join(f"{i+1}. {o}" for i, o in enumerate(choices))
 
@@ -418,7 +471,7 @@ def llm_based_match(message:str, choices: List[str]) -> Dict:
         "Du bist ein präziser Intent und Choice-Klassifikator.\n"
         f"Das ist die Liste der möglichen Optionen:{choice_text}.\n"
         "Erkenne anhand der Nutzereingabe, welche Option der Nutzer gemeint hat.\n"
-        "Gib die passende option exakt zurück (match) und einen Score (score) zwischen 0.0 und 1.0, wobei alles unter 0.5 kein match ist, ab 0.5 eher sicher, ab 0.75 ziemlich sicher und 1.0 absolut sicher ist.\n"
+        "Gib die Nummer der passenden Option zurück (match) und einen Score (score) zwischen 0.0 und 1.0, wobei alles unter 0.5 kein match ist, ab 0.5 eher sicher, ab 0.75 ziemlich sicher und 1.0 absolut sicher ist.\n"
         "**Halte dich exakt an die vorgegebenen Optionen und erfinde keine neuen**.\n"
     )
 
@@ -428,12 +481,16 @@ def llm_based_match(message:str, choices: List[str]) -> Dict:
         user_input=message,
         json_schema=ActivityCheckResponse,
         model = 'gpt-4o-mini',
-        client = OpenAI()
+        client = get_openai_client(),
+        cache = True
     )
 
     score = response.output_parsed.score
     match = response.output_parsed.match
-    return match, score
+    # Nummer (1-basiert, wie in der Liste oben) -> Label
+    if not 1 <= match <= len(choices):
+        return None, 0.0
+    return choices[match - 1], score
 
 class Name(BaseModel):
     family_name: str
@@ -458,14 +515,9 @@ class HRA(BaseModel):
 
 
 def extract_information_HRA_info_from_img(img)->Dict:
-    if isinstance(img,list):
-        extracted_text = ''
-        for i in img:
-            text = pytesseract.image_to_string(i, lang='deu')
-            
-            extracted_text += text
-    else:
-        extracted_text = pytesseract.image_to_string(img,lang='deu')
+    # Seiten parallel erkennen, Texte in Seitenreihenfolge (siehe ocr.py). Die Extraktion ist eine
+    # einzige Structured-Output-Anfrage über den Gesamttext, seitenweises Streaming brächte hier nichts.
+    extracted_text = ocr_text(img)
     # post processing with llm
     system_prompt = (f"Du bist ein hochpräzises Textexraktionsmodell welches aus einem OCR string eines Bildes Informationen extrahiert. Extrahiere aus dem folgenden Str:\n"
                  "Den Namen des Registergerichts / Handelsregister (authority), die Handelsregisternummer (HRA), den Namen der Firma (company_name), die Geschäftsform (legal_type) (GmbH, GDR, etc.), die Adresse des Sitzes/Niederlassung/Geschäftsanschrift (address), den Gegenstand des Unternehmens (activity), den Nachnamen(family_name), Vornamen(given_name) (im Text findest du immer Nachname, Vorname, Wohnort, Geburtsdatum),  Wohnort (city) und das Geburtsdatum (birthdate)(Nur das Datum im Format: TT.MM.JJJJ) des Geschäftsführers (CEO) (lege diese angeben in einer json ab.).\n"
@@ -477,7 +529,7 @@ def extract_information_HRA_info_from_img(img)->Dict:
         system_prompt=system_prompt,
         user_input=extracted_text,
         model="gpt-4.1-mini",
-        client=OpenAI(),
+        client=get_openai_client(),
         json_schema = HRA
     )
 
@@ -493,15 +545,9 @@ class IDCard(BaseModel):
     address:Address
 
 def extract_information_id_card(img)->Dict:
-    if isinstance(img,list):
-        extracted_text = ''
-        for i in img:
-            text = pytesseract.image_to_string(i, lang='deu')
-            
-            extracted_text += text
-    else:
-        extracted_text = pytesseract.image_to_string(img,lang='deu')
-        
+    # Vorder-/Rückseite parallel erkennen; Auflösung auf Ausweisformat normieren (siehe ocr.py)
+    extracted_text = ocr_text(img, preprocessing=PREPROCESS_CONFIG.for_document(ID_CARD_LONG_SIDE_MM))
+
     # extracted_text = pytesseract.image_to_string(img, lang='deu')
     # post processing with llm
     system_prompt = (f"Du bist ein hochpräzises Textexraktionsmodell welches aus einem OCR string eines Bildes eines Personalausweises Informationen extrahiert. Extrahiere aus dem folgenden Str:\n"
@@ -514,7 +560,7 @@ def extract_information_id_card(img)->Dict:
         system_prompt=system_prompt,
         user_input=extracted_text,
         model="gpt-4.1-mini",
-        client=OpenAI(),
+        client=get_openai_client(),
         json_schema = IDCard
     )
 
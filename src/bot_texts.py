@@ -0,0 +1,30 @@
+"""
+bot_texts.py — Feste deutsche Bot-Texte
+
+Formularunabhängige Texte, die bot.py und wizards.py ausspielen. i18n_bundles.py übersetzt genau
+diese Liste (STATIC_TEXTS_DE) in die Sprachpakete; ein hier geänderter Wortlaut wird damit beim
+nächsten Build automatisch neu übersetzt.
+"""
+
+UPLOAD_LABEL = "Dateien hochladen"
+FINAL_UPLOAD_LABEL = "Unterschriebenes Formular hochladen und Vorgang abschließen."
+INVALID_CHOICE = "Ungültige Auswahl. Bitte nutzen Sie die Buttons oder geben Sie die Nummer ein."
+FORM_COMPLETED = (
+    "Vielen Dank! Das Formular ist abgeschlossen. "
+    "Nachdem Sie das Formular unterschrieben haben, können Sie es hier zur elektronischen Übermittlung direkt hochladen."
+)
+
+# Formularauswahl (FormSelectionWizard)
+FORM_SELECTION_HINT = "Sie können die Nummer oder den Namen eingeben."
+FORM_SELECTION_CONFIRM = "Verstanden. Wir starten mit dem Formular:"
+FORM_SELECTION_RETRY = "Ungültige Auswahl. Bitte wählen Sie erneut."
+
+STATIC_TEXTS_DE = (
+    UPLOAD_LABEL,
+    INVALID_CHOICE,
+    FORM_COMPLETED,
+    FINAL_UPLOAD_LABEL,
+    FORM_SELECTION_HINT,
+    FORM_SELECTION_CONFIRM,
+    FORM_SELECTION_RETRY,
+)
@@ -0,0 +1,142 @@
+"""
+choice_index.py — Vorberechneter Index für das Matching von Auswahl-Antworten
+
+Für jede Auswahlliste (slot_def["choices"]) werden einmalig – beim Laden der Formulare – die
+normalisierten Labels, ihre Token-Mengen und Bitmasken-Signaturen für den bit-parallelen
+LCS-Algorithmus (Hyyrö) berechnet. Eine Nutzereingabe wird dann nur noch einmal normalisiert und
+gegen den Index verglichen; die Ähnlichkeit 2·LCS/(|a|+|b|) entspricht der Größenordnung von
+difflib.SequenceMatcher.ratio(), kostet aber nur O(|Eingabe|) Ganzzahl-Operationen je Label.
+Labels, die schon wegen ihrer Länge den bisher besten Score nicht erreichen können, werden übersprungen.
+
+Benchmark: python benchmarks/bench_choice_matching.py
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_UMLAUT_MAP = str.maketrans({
+    "ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
+    "Ä": "Ae", "Ö": "Oe", "Ü": "Ue",
+})
+_NON_ALNUM_RE = re.compile(r"[^\w\s]|_")
+_SPACES_RE = re.compile(r"\s+")
+
+# Score für Teilstring-/Token-Teilmengen-Treffer (hoch, aber nicht perfekt)
+CONTAINMENT_SCORE = 0.92
+
+
+def _strip_accents(s: str) -> str:
+    # Entfernt Diakritika (z. B. französische Akzente)
+    nfkd = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+
+
+def normalize_choice_text(s: str) -> str:
+    """Umlauts transliterated, accents removed, lowercase, only letters/digits (any script)/single spaces."""
+    s = _strip_accents(s.strip().translate(_UMLAUT_MAP)).lower()
+    return _SPACES_RE.sub(" ", _NON_ALNUM_RE.sub(" ", s)).strip()
+
+
+class _Signature:
+    """Pattern bitmasks of one normalized string for bit-parallel LCS."""
+    __slots__ = ("text", "length", "mask", "pm")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.mask = (1 << self.length) - 1
+        pm: Dict[str, int] = {}
+        for i, ch in enumerate(text):
+            pm[ch] = pm.get(ch, 0) | (1 << i)
+        self.pm = pm
+
+    def similarity(self, other: str) -> float:
+        """2 * LCS / (len(self) + len(other)), 0..1."""
+        total = self.length + len(other)
+        if not total:
+            return 1.0
+        pm, mask = self.pm, self.mask
+        v = mask
+        for ch in other:
+            u = v & pm.get(ch, 0)
+            v = ((v + u) | (v - u)) & mask
+        lcs = self.length - bin(v).count("1")
+        return 2.0 * lcs / total
+
+
+def _upper_bound(a: int, b: int) -> float:
+    """Best possible similarity for strings of lengths a and b."""
+    return 2.0 * min(a, b) / (a + b) if a + b else 1.0
+
+
+class _ChoiceEntry:
+    __slots__ = ("choice", "full", "tokens", "token_sigs")
+
+    def __init__(self, choice: str, normalized: str):
+        self.choice = choice
+        self.full = _Signature(normalized)
+        self.tokens = frozenset(normalized.split())
+        self.token_sigs = tuple(_Signature(token) for token in dict.fromkeys(normalized.split()))
+
+
+class ChoiceIndex:
+    """Precomputed matching data for one list of choices."""
+
+    def __init__(self, choices: Sequence[str]):
+        self.choices = tuple(choices)
+        self._exact: Dict[str, str] = {}
+        self._entries: List[_ChoiceEntry] = []
+        for choice in self.choices:
+            normalized = normalize_choice_text(choice)
+            if not normalized:
+                continue
+            self._exact.setdefault(normalized, choice)
+            self._entries.append(_ChoiceEntry(choice, normalized))
+
+    def best_match(self, user_text: str) -> Tuple[Optional[str], float]:
+        """
+        (best choice, score); 1.0 = exact normalized match, CONTAINMENT_SCORE for substring/token-subset
+        matches, otherwise the best LCS similarity against the whole label or one of its words.
+        """
+        ut = normalize_choice_text(user_text)
+        if not ut:
+            return None, 0.0
+        exact = self._exact.get(ut)
+        if exact is not None:
+            return exact, 1.0
+        ut_tokens = set(ut.split())
+        n = len(ut)
+
+        best_choice: Optional[str] = None
+        best = 0.0
+        for entry in self._entries:
+            if best < CONTAINMENT_SCORE and (ut in entry.full.text or ut_tokens <= entry.tokens):
+                best_choice, best = entry.choice, CONTAINMENT_SCORE
+            if _upper_bound(n, entry.full.length) > best:
+                score = entry.full.similarity(ut)
+                if score > best:
+                    best_choice, best = entry.choice, score
+            for sig in entry.token_sigs:
+                if _upper_bound(n, sig.length) > best:
+                    score = sig.similarity(ut)
+                    if score > best:
+                        best_choice, best = entry.choice, score
+        return best_choice, best
+
+
+# Indizes je Auswahlliste (Schlüssel: Labels als Tupel)
+_INDEXES: Dict[Tuple[str, ...], ChoiceIndex] = {}
+_LOCK = threading.Lock()
+
+
+def choice_index_for(choices: Sequence[str]) -> ChoiceIndex:
+    """Cached ChoiceIndex for a list of choice labels (built on first use or by load_forms)."""
+    key = tuple(choices)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = ChoiceIndex(key)
+        with _LOCK:
+            _INDEXES.setdefault(key, index)
+    return index
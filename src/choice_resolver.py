@@ -0,0 +1,181 @@
+"""
+choice_resolver.py — Gestufte Auflösung von Auswahl-Antworten, die das Fuzzy-Matching nicht trifft
+
+In Sitzungen mit anderer Sprache wird zuerst in der Sitzungssprache gegen die lokalisierten Labels
+verglichen (match_localized; Labels aus den Sprachpaketen bzw. dem Übersetzungsspeicher) – ohne die
+Eingabe vorher mit translate_to_de ins Deutsche zu übersetzen.
+
+Reihenfolge je Auswahlliste:
+    1. cache    – frühere Auflösungen (normalisierte Eingabe -> Label), LRU-begrenzt
+    2. synonyms – lokale, mehrsprachige Synonymtabelle aus den Labels, ihren vorübersetzten
+                  Varianten (forms/i18n, von load_forms registriert) und allgemeinen Ja/Nein-Wörtern
+    3. llm      – llm_based_match (als Funktion übergeben)
+Jede Stufe, die eine Eingabe auflöst, schreibt das Ergebnis in den Cache zurück.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from .choice_index import ChoiceIndex, normalize_choice_text
+from .local_validation import VALIDATOR_METRICS
+from .translator import translate_many
+
+logger = logging.getLogger(__name__)
+
+# Allgemeine Ja/Nein-Antworten in den unterstützten Sprachen (für Auswahllisten mit "ja"/"nein")
+YES_NO_SYNONYMS = {
+    "ja": ("yes", "y", "yeah", "yep", "jawohl", "oui", "si", "sim", "evet", "tak", "da", "да", "так",
+           "نعم", "بله", "是", "igen", "ano", "po"),
+    "nein": ("no", "n", "nope", "non", "nao", "hayir", "nie", "ne", "nem", "нет", "ні", "не",
+             "لا", "نه", "不", "不是", "nu"),
+}
+
+LlmMatcher = Callable[[str, Sequence[str]], Tuple[Optional[str], float]]
+
+
+class ChoiceResolver:
+    """Cache -> synonym table -> LLM resolution for one list of choice labels."""
+
+    def __init__(self, choices: Sequence[str], max_cache_items: int = 512):
+        self.choices = tuple(choices)
+        self.max_cache_items = max_cache_items
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._synonyms: Dict[str, str] = {}
+        self._synonym_index: Optional[ChoiceIndex] = None
+        self._localized: Dict[str, Dict[str, str]] = {}       # lang -> {Label: Übersetzung}
+        self._localized_index: Dict[str, Tuple[ChoiceIndex, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        for choice in self.choices:
+            self._add_synonym(choice, choice)
+            for word in YES_NO_SYNONYMS.get(normalize_choice_text(choice), ()):
+                self._add_synonym(word, choice)
+
+    def _add_synonym(self, text: str, choice: str) -> None:
+        key = normalize_choice_text(text or "")
+        if key:
+            self._synonyms.setdefault(key, choice)
+            self._synonym_index = None
+
+    def add_translations(self, translations: Dict[str, str], lang: Optional[str] = None) -> None:
+        """Registers translated labels ({german label: translation}) as synonyms of their choice."""
+        with self._lock:
+            for choice in self.choices:
+                if translations.get(choice):
+                    self._add_synonym(translations[choice], choice)
+                    if lang:
+                        self._localized.setdefault(lang, {})[choice] = translations[choice]
+                        self._localized_index.pop(lang, None)
+
+    def _localized_labels(self, lang: str) -> Tuple[ChoiceIndex, Dict[str, str]]:
+        """Index over the labels in `lang` plus {normalized label: choice}; missing labels via translate_many."""
+        with self._lock:
+            built = self._localized_index.get(lang)
+            known = dict(self._localized.get(lang, {}))
+        if built is not None:
+            return built
+        missing = [c for c in self.choices if c not in known]
+        if missing:
+            try:
+                # Übersetzungen der Labels kommen i. d. R. aus dem Übersetzungsspeicher (Anzeige/Prefetch)
+                known.update(zip(missing, translate_many(missing, lang)))
+            except Exception as e:
+                logger.warning(f"Localized choice labels for '{lang}' not available: {e}")
+        targets = {normalize_choice_text(label): choice for choice, label in known.items() if label}
+        built = (ChoiceIndex(list(targets)), targets)
+        with self._lock:
+            if len(known) == len(self.choices):
+                self._localized_index[lang] = built
+            for choice, label in known.items():
+                self._add_synonym(label, choice)
+        return built
+
+    def match_localized(self, text: str, lang: str) -> Tuple[Optional[str], float]:
+        """(choice, score) of the best localized label for an answer in the session language."""
+        index, targets = self._localized_labels(lang)
+        label, score = index.best_match(text)
+        if label is None:
+            return None, 0.0
+        return targets[normalize_choice_text(label)], score
+
+    def cached(self, text: str) -> Optional[str]:
+        key = normalize_choice_text(text)
+        with self._lock:
+            choice = self._cache.get(key)
+            if choice is not None:
+                self._cache.move_to_end(key)
+            return choice
+
+    def remember(self, text: str, choice: str) -> None:
+        key = normalize_choice_text(text)
+        if not key or choice not in self.choices:
+            return
+        with self._lock:
+            self._cache[key] = choice
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_items:
+                self._cache.popitem(last=False)
+
+    def match_synonym(self, text: str, cutoff: float = 0.85) -> Optional[str]:
+        """Exact or fuzzy match against the synonym table."""
+        key = normalize_choice_text(text)
+        if not key:
+            return None
+        with self._lock:
+            choice = self._synonyms.get(key)
+            if choice is not None:
+                return choice
+            if self._synonym_index is None:
+                self._synonym_index = ChoiceIndex(list(self._synonyms))
+            index, synonyms = self._synonym_index, self._synonyms
+        synonym, score = index.best_match(key)
+        return synonyms[normalize_choice_text(synonym)] if synonym and score >= cutoff else None
+
+    def resolve(self, text: str, llm: Optional[LlmMatcher] = None,
+                cutoff: float = 0.85) -> Tuple[Optional[str], float, str]:
+        """(choice, score, tier) with tier "cache", "synonyms", "llm" or "" if unresolved."""
+        choice = self.cached(text)
+        if choice is not None:
+            VALIDATOR_METRICS.record("valid_choice_slot", "cache")
+            return choice, 1.0, "cache"
+
+        choice = self.match_synonym(text, cutoff=cutoff)
+        if choice is not None:
+            VALIDATOR_METRICS.record("valid_choice_slot", "local")
+            self.remember(text, choice)
+            return choice, 1.0, "synonyms"
+
+        if llm is None:
+            return None, 0.0, ""
+        choice, score = llm(text, self.choices)
+        VALIDATOR_METRICS.record("valid_choice_slot", "llm")
+        if choice in self.choices and score >= 0.5:
+            self.remember(text, choice)
+            return choice, score, "llm"
+        return None, score, ""
+
+
+# Resolver je Auswahlliste (Schlüssel: Labels als Tupel)
+_RESOLVERS: Dict[Tuple[str, ...], ChoiceResolver] = {}
+_LOCK = threading.Lock()
+_MAX_CACHE_ITEMS = int(os.getenv("CHOICE_CACHE_MAX_ITEMS", "512"))
+
+
+def choice_resolver_for(choices: Sequence[str]) -> ChoiceResolver:
+    """Process-wide ChoiceResolver for a list of choice labels."""
+    key = tuple(choices)
+    resolver = _RESOLVERS.get(key)
+    if resolver is None:
+        with _LOCK:
+            resolver = _RESOLVERS.setdefault(key, ChoiceResolver(key, max_cache_items=_MAX_CACHE_ITEMS))
+    return resolver
+
+
+def register_translations(choices: Sequence[str], bundles: Dict[str, Dict[str, str]]) -> None:
+    """Adds the prebuilt translations of all languages ({lang: {german: translation}}) as synonyms."""
+    resolver = choice_resolver_for(choices)
+    for lang, translations in bundles.items():
+        resolver.add_translations(translations, lang=lang)
+
@@ -0,0 +1,162 @@
+"""
+i18n_bundles.py — Vorübersetzte Sprachpakete je Formular
+
+Offline-Build: alle übersetzbaren Texte eines Formulars (Slot-Prompts, Hinweise, Zusatzinformationen,
+Upload-Labels, Auswahloptionen) sowie die festen Bot-Texte aus bot_texts.py werden in jede Sprache aus translator.SUPPORTED
+übersetzt und als kompakte JSON-Pakete abgelegt:
+
+    forms/i18n/<formular>/<sprache>.json   ->   {"form", "lang", "model", "source_digest", "strings": {de: übersetzt}}
+
+Die Pakete liegen bewusst nicht in forms/ge, damit load_forms sie nicht als Formulare einliest.
+load_forms lädt sie beim Start und pinnt sie im Übersetzungsspeicher; translate_from_de bedient
+diese Texte danach ohne LLM-Aufruf. Unveränderte Texte werden beim erneuten Build wiederverwendet.
+
+CLI:
+    python -m src.i18n_bundles
+    python -m src.i18n_bundles --forms-path forms/ge --langs en tr --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .bot_texts import STATIC_TEXTS_DE
+from .translation_memory import TRANSLATION_MEMORY
+from .translator import SUPPORTED, translate_from_de
+
+DEFAULT_FORMS_PATH = Path(__file__).resolve().parents[1] / "forms" / "ge"
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+def default_i18n_path(form_path: str) -> str:
+    """Bundle root next to the forms directory (forms/ge -> forms/i18n)."""
+    return os.path.join(os.path.dirname(os.path.normpath(form_path)), "i18n")
+
+
+def bundle_path(i18n_path: str, form_key: str, lang: str) -> str:
+    return os.path.join(i18n_path, form_key, f"{lang}.json")
+
+
+def _info_texts(info: Any) -> Iterable[str]:
+    if isinstance(info, str):
+        yield info
+    elif isinstance(info, dict):
+        for key in ("title", "body"):
+            if info.get(key):
+                yield info[key]
+    elif isinstance(info, list):
+        for item in info:
+            yield from _info_texts(item)
+
+
+def collect_strings(form_conf: Dict[str, Any]) -> List[str]:
+    """All translatable German strings of a form plus the static bot texts (deduplicated, in order)."""
+    strings: List[str] = list(STATIC_TEXTS_DE)
+    for slot in form_conf.get("slots", []):
+        strings.append(slot.get("prompt", slot.get("description", "")) or "")
+        for key in ("description", "upload_label", "ui_label", "placeholder"):
+            strings.append(slot.get(key) or "")
+        strings.extend(slot.get("choices", []))
+        strings.extend((slot.get("hints") or {}).values())
+        strings.extend(_info_texts(slot.get("additional_information")))
+    return [s for s in dict.fromkeys(strings) if isinstance(s, str) and s.strip()]
+
+
+def source_digest(strings: List[str]) -> str:
+    return hashlib.sha256("\x00".join(strings).encode("utf-8")).hexdigest()
+
+
+def _read_bundle(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_bundle(form_key: str, form_conf: Dict[str, Any], lang: str, i18n_path: str,
+                 model: str = DEFAULT_MODEL, workers: int = 8) -> bool:
+    """Builds (or refreshes) one bundle; returns False if it was already up to date."""
+    strings = collect_strings(form_conf)
+    digest = source_digest(strings)
+    path = bundle_path(i18n_path, form_key, lang)
+
+    existing = _read_bundle(path) or {}
+    if existing.get("source_digest") == digest and existing.get("model") == model:
+        return False
+    known = existing.get("strings", {}) if existing.get("model") == model else {}
+
+    missing = [s for s in strings if s not in known]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        translated = pool.map(lambda text: translate_from_de(text, lang, model=model), missing)
+        known.update(zip(missing, translated))
+
+    bundle = {
+        "form": form_key,
+        "lang": lang,
+        "model": model,
+        "source_digest": digest,
+        "strings": {s: known[s] for s in strings},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_bundles(form_key: str, i18n_path: str, preload: bool = True) -> Dict[str, Dict[str, str]]:
+    """
+    Loads all bundles of a form as {lang: {de_text: translation}}.
+    With preload=True the translations are pinned in TRANSLATION_MEMORY for translate_from_de.
+    """
+    bundles: Dict[str, Dict[str, str]] = {}
+    form_dir = os.path.join(i18n_path, form_key)
+    if not os.path.isdir(form_dir):
+        return bundles
+    for fname in sorted(os.listdir(form_dir)):
+        if not fname.endswith(".json"):
+            continue
+        bundle = _read_bundle(os.path.join(form_dir, fname))
+        if not bundle or bundle.get("lang") not in SUPPORTED:
+            continue
+        bundles[bundle["lang"]] = bundle.get("strings", {})
+        if preload:
+            TRANSLATION_MEMORY.preload("from_de", bundle["lang"], bundle["strings"].items())
+    return bundles
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Erzeugt vorübersetzte Sprachpakete für alle Formulare.")
+    parser.add_argument("--forms-path", default=str(DEFAULT_FORMS_PATH), help="Verzeichnis der Formular-JSONs")
+    parser.add_argument("--out", default=None, help="Zielverzeichnis (Default: <forms-path>/../i18n)")
+    parser.add_argument("--langs", nargs="*", default=None, help="Sprachcodes (Default: alle aus SUPPORTED außer de)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Übersetzungsmodell")
+    parser.add_argument("--workers", type=int, default=8, help="Parallele Übersetzungen je Paket")
+    args = parser.parse_args(argv)
+
+    i18n_path = args.out or default_i18n_path(args.forms_path)
+    langs = sorted(set(args.langs or SUPPORTED) - {"de"})
+    unknown = [lang for lang in langs if lang not in SUPPORTED]
+    if unknown:
+        parser.error(f"Nicht unterstützte Sprachcodes: {', '.join(unknown)}")
+
+    for fname in sorted(os.listdir(args.forms_path)):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(args.forms_path, fname), encoding="utf-8") as f:
+            form_conf = json.load(f)
+        form_key = fname.rsplit(".", 1)[0]
+        for lang in langs:
+            built = build_bundle(form_key, form_conf, lang, i18n_path, model=args.model, workers=args.workers)
+            print(f"{form_key}/{lang}: {'erzeugt' if built else 'aktuell'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
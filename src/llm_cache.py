@@ -0,0 +1,138 @@
+"""
+llm_cache.py — Persistenter Cache für LLM-Antworten
+
+SQLite-basierter Key/Value-Cache mit TTL, größenbegrenzter Verdrängung (am längsten nicht
+genutzte Einträge zuerst) und Hit/Miss-Zählern. Wird von LLMValidatorService genutzt, damit
+wiederholte Validierungen (z. B. "Deutschland", "Sanitärdienstleistungen") ohne Netzwerk-Roundtrip
+beantwortet werden.
+
+Relative Pfade beziehen sich auf das Repo-Verzeichnis (nicht auf das Arbeitsverzeichnis); die
+SQLite-Datei wird erst beim ersten Zugriff angelegt, nicht schon beim Import.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable sha256 key over arbitrary JSON-serializable parts."""
+    material = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SqliteCache:
+    """Thread-safe SQLite key/value cache with TTL, max_entries eviction and hit/miss counters."""
+
+    def __init__(self, path: str, max_entries: int = 50_000, default_ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Verbindung (und Datei) erst bei der ersten Nutzung öffnen; Aufrufer halten self._lock
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires REAL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+            self._db = conn
+        return self._db
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, expires, now),
+            )
+            self._evict_locked(now)
+
+    def _evict_locked(self, now: float) -> None:
+        self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = 0
+            if self._db is not None or os.path.exists(self.path):
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        total = self.hits + self.misses
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def resolve_path(path: str) -> str:
+    """Resolves a relative path against the repo root (independent of the working directory)."""
+    if path == ":memory:" or os.path.isabs(path):
+        return path
+    return str(ROOT / path)
+
+
+def cache_from_env(path: str, ttl_hours: Optional[float], max_entries: int) -> Optional[SqliteCache]:
+    """Builds a SqliteCache; path "off" (or empty) disables caching and returns None."""
+    if path.strip().lower() in ("", "off", "0", "false"):
+        return None
+    return SqliteCache(resolve_path(path), max_entries=max_entries,
+                       default_ttl=ttl_hours * 3600 if ttl_hours else None)
+
+
+# Prozessweiter Cache für LLM-Antworten (bewusst außerhalb von out/, das der ArtifactStore verwaltet)
+LLM_CACHE = cache_from_env(
+    path=os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_cache.sqlite")),
+    ttl_hours=env_float("LLM_CACHE_TTL_HOURS", 24 * 30),
+    max_entries=int(env_float("LLM_CACHE_MAX_ENTRIES", 50_000)),
+)
@@ -1,96 +1,297 @@
-import requests
-import logging
-from typing import Optional
-from openai import OpenAI, OpenAIError
-from pydantic import BaseModel
-
-logger = logging.getLogger(__name__)
-
-class ResponseFormat(BaseModel):
-    input_message:str # User Input
-    validity:str # True if input is valid, false otherwise
-    corrected_input:str # Set if llm is told to correct input based on some rule, else empty
-    in_valid_reason:str # reson for invalidity, if valid, empty
-
-
-class LLMValidatorService:
-    """
-    Service class for sending prompts to a local LLM endpoint and retrieving responses.
-    """
-
-    @staticmethod
-    def validate_locally(prompt: str, endpoint: str, max_tokens: int = 5,
-                         temperature: float = 0.0, timeout: int = 10) -> Optional[str]:
-        """
-        Sends a prompt to the local LLM endpoint and retrieves the response content.
-        """
-        payload = {
-            "prompt": prompt,
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-        try:
-            resp = requests.post(endpoint, json=payload, timeout=timeout)
-            resp.raise_for_status()
-            data = resp.json()
-            content = data.get("content", "").strip()
-            return content
-        except requests.exceptions.RequestException as e:
-            logger.error(f"LLM local request failed: {e}")
-            return None
-
-    @staticmethod
-    def validate_openai(prompt: str, model: str, client: OpenAI) -> Optional[str]:
-        """
-        Sends a prompt to the OpenAI API and retrieves the response.
-        """
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            if not response.choices or not response.choices[0].message:
-                return None
-            return response.choices[0].message.content.strip()
-        except OpenAIError as e:
-            logger.error(f"OpenAI request failed: {e}")
-            return None
-        
-    @staticmethod
-    def validate_openai_json_mode(system_prompt: str, user_input:str, json_schema:dict, model: str, client: OpenAI) -> Optional[str]:
-        """
-        Sends a prompt to the OpenAI API and retrieves the response.
-        """
-        resp = client.responses.create(
-        model=model,  # z.B. "gpt-4o-2024-08-06" oder "gpt-4o-mini"
-        input=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input},
-        ],
-        text={
-            "format": {
-                "type": "json_schema",     # Structured Outputs aktivieren
-                "name": "structured_output",# <-- MUSS hier stehen (nicht im Schema)
-                "schema": json_schema,  # <-- reines JSON Schema-Objekt
-                "strict": True             # harte Schemakonformität
-            }
-        }
-    )
-        return resp
-    
-    def validate_openai_structured_output(self,system_prompt: str, user_input: str, json_schema:BaseModel, model:str, client: OpenAI):
-        response = client.responses.parse(
-        model=model,
-        input=[
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": user_input,
-            },
-        ],
-        text_format=json_schema,
-    )
-        return response
-                
-
-    
+import requests
+import asyncio
+import hashlib
+import httpx
+import logging
+import os
+import weakref
+from dataclasses import dataclass
+from typing import Any, Optional
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+from pydantic import BaseModel
+
+from .llm_cache import LLM_CACHE, SqliteCache, make_cache_key
+from .openai_clients import get_async_http_client, get_async_openai_client
+
+logger = logging.getLogger(__name__)
+
+class ResponseFormat(BaseModel):
+    input_message:str # User Input
+    validity:str # True if input is valid, false otherwise
+    corrected_input:str # Set if llm is told to correct input based on some rule, else empty
+    in_valid_reason:str # reson for invalidity, if valid, empty
+
+
+@dataclass
+class CachedResponse:
+    """
+    Stand-in for a Responses API result served from the cache.
+    Exposes output_text and (for structured outputs) output_parsed, so response_to_dict works unchanged.
+    """
+    output_text: str
+    output_parsed: Any = None
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _endpoint(client: Any) -> str:
+    # Gleicher Modellname an verschiedenen Endpunkten (OpenAI, Azure, lokal) darf sich keine Einträge teilen
+    return str(getattr(client, "base_url", "") or "")
+
+
+def _schema_key(json_schema: Any) -> Any:
+    if isinstance(json_schema, type) and issubclass(json_schema, BaseModel):
+        return json_schema.model_json_schema()
+    return json_schema
+
+
+def _json_mode_format(json_schema: dict) -> dict:
+    return {
+        "format": {
+            "type": "json_schema",     # Structured Outputs aktivieren
+            "name": "structured_output",# <-- MUSS hier stehen (nicht im Schema)
+            "schema": json_schema,  # <-- reines JSON Schema-Objekt
+            "strict": True             # harte Schemakonformität
+        }
+    }
+
+
+def _messages(system_prompt: str, user_input: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_input},
+    ]
+
+
+# Maximale Anzahl gleichzeitiger async LLM-Requests pro Event-Loop
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Semaphoren sind an ihren Event-Loop gebunden, daher je Loop eine Instanz
+_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = _SEMAPHORES[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
+class LLMValidatorService:
+    """
+    Service class for sending prompts to a local LLM endpoint and retrieving responses.
+
+    Responses are cached in `cache` (SQLite, see llm_cache.py) under a sha256 key over
+    (method, endpoint, model, system prompt hash, user input, schema). Set `cache = None` to disable.
+    Caching is chosen per call (`cache=`): on by default for the short validator verdicts of
+    validate_locally/validate_openai, off by default for json_mode/structured outputs, whose
+    results may contain personal data (e.g. document extraction); callers opt in only for outputs
+    without personal data.
+    """
+
+    cache: Optional[SqliteCache] = LLM_CACHE
+
+    @staticmethod
+    def _cache_get(key: Optional[str]) -> Optional[str]:
+        cache = LLMValidatorService.cache
+        return cache.get(key) if cache is not None and key is not None else None
+
+    @staticmethod
+    def _cache_set(key: Optional[str], value: Optional[str]) -> None:
+        cache = LLMValidatorService.cache
+        if cache is not None and key is not None and value:
+            cache.set(key, value)
+
+    @staticmethod
+    def validate_locally(prompt: str, endpoint: str, max_tokens: int = 5,
+                         temperature: float = 0.0, timeout: int = 10, cache: bool = True) -> Optional[str]:
+        """
+        Sends a prompt to the local LLM endpoint and retrieves the response content.
+        """
+        key = make_cache_key("locally", endpoint, _prompt_hash(prompt), max_tokens, temperature) if cache else None
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        payload = {
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        try:
+            resp = requests.post(endpoint, json=payload, timeout=timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            content = data.get("content", "").strip()
+            LLMValidatorService._cache_set(key, content)
+            return content
+        except requests.exceptions.RequestException as e:
+            logger.error(f"LLM local request failed: {e}")
+            return None
+
+    @staticmethod
+    def validate_openai(prompt: str, model: str, client: OpenAI, cache: bool = True) -> Optional[str]:
+        """
+        Sends a prompt to the OpenAI API and retrieves the response.
+        """
+        key = make_cache_key("openai", _endpoint(client), model, _prompt_hash(prompt)) if cache else None
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            if not response.choices or not response.choices[0].message:
+                return None
+            content = response.choices[0].message.content.strip()
+            LLMValidatorService._cache_set(key, content)
+            return content
+        except OpenAIError as e:
+            logger.error(f"OpenAI request failed: {e}")
+            return None
+        
+    @staticmethod
+    def validate_openai_json_mode(system_prompt: str, user_input:str, json_schema:dict, model: str, client: OpenAI,
+                                  cache: bool = False) -> Optional[str]:
+        """
+        Sends a prompt to the OpenAI API and retrieves the response.
+        """
+        key = (make_cache_key("json_mode", _endpoint(client), model, _prompt_hash(system_prompt), user_input, json_schema)
+               if cache else None)
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return CachedResponse(output_text=cached)
+
+        resp = client.responses.create(
+            model=model,  # z.B. "gpt-4o-2024-08-06" oder "gpt-4o-mini"
+            input=_messages(system_prompt, user_input),
+            text=_json_mode_format(json_schema),
+        )
+        LLMValidatorService._cache_set(key, getattr(resp, "output_text", None))
+        return resp
+    
+    def validate_openai_structured_output(self,system_prompt: str, user_input: str, json_schema:BaseModel, model:str, client: OpenAI,
+                                          cache: bool = False):
+        key = (make_cache_key("structured", _endpoint(client), model, _prompt_hash(system_prompt), user_input,
+                              _schema_key(json_schema)) if cache else None)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return CachedResponse(output_text=cached, output_parsed=json_schema.model_validate_json(cached))
+
+        response = client.responses.parse(
+            model=model,
+            input=_messages(system_prompt, user_input),
+            text_format=json_schema,
+        )
+        if response.output_parsed is not None:
+            self._cache_set(key, response.output_parsed.model_dump_json())
+        return response
+
+    # -- Async-Varianten -------------------------------------------------------
+    # Gleiche Semantik und gleicher Cache wie die synchronen Methoden; ohne client wird der
+    # gemeinsame AsyncOpenAI-Client genutzt. Gleichzeitige Requests sind durch LLM_MAX_CONCURRENCY begrenzt.
+
+    @staticmethod
+    async def avalidate_locally(prompt: str, endpoint: str, max_tokens: int = 5,
+                                temperature: float = 0.0, timeout: int = 10, cache: bool = True) -> Optional[str]:
+        """
+        Async counterpart of validate_locally; uses the shared httpx client of the running loop.
+        """
+        key = make_cache_key("locally", endpoint, _prompt_hash(prompt), max_tokens, temperature) if cache else None
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        payload = {
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        try:
+            async with _semaphore():
+                resp = await get_async_http_client().post(endpoint, json=payload, timeout=timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            content = data.get("content", "").strip()
+            LLMValidatorService._cache_set(key, content)
+            return content
+        except httpx.HTTPError as e:
+            logger.error(f"LLM local request failed: {e}")
+            return None
+
+    @staticmethod
+    async def avalidate_openai(prompt: str, model: str, client: Optional[AsyncOpenAI] = None,
+                               cache: bool = True) -> Optional[str]:
+        """
+        Async counterpart of validate_openai.
+        """
+        client = client or get_async_openai_client()
+        key = make_cache_key("openai", _endpoint(client), model, _prompt_hash(prompt)) if cache else None
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            async with _semaphore():
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                )
+            if not response.choices or not response.choices[0].message:
+                return None
+            content = response.choices[0].message.content.strip()
+            LLMValidatorService._cache_set(key, content)
+            return content
+        except OpenAIError as e:
+            logger.error(f"OpenAI request failed: {e}")
+            return None
+
+    @staticmethod
+    async def avalidate_openai_json_mode(system_prompt: str, user_input: str, json_schema: dict, model: str,
+                                         client: Optional[AsyncOpenAI] = None, cache: bool = False):
+        """
+        Async counterpart of validate_openai_json_mode.
+        """
+        client = client or get_async_openai_client()
+        key = (make_cache_key("json_mode", _endpoint(client), model, _prompt_hash(system_prompt), user_input, json_schema)
+               if cache else None)
+        cached = LLMValidatorService._cache_get(key)
+        if cached is not None:
+            return CachedResponse(output_text=cached)
+
+        async with _semaphore():
+            resp = await client.responses.create(
+                model=model,
+                input=_messages(system_prompt, user_input),
+                text=_json_mode_format(json_schema),
+            )
+        LLMValidatorService._cache_set(key, getattr(resp, "output_text", None))
+        return resp
+
+    async def avalidate_openai_structured_output(self, system_prompt: str, user_input: str, json_schema: BaseModel,
+                                                 model: str, client: Optional[AsyncOpenAI] = None, cache: bool = False):
+        """
+        Async counterpart of validate_openai_structured_output.
+        """
+        client = client or get_async_openai_client()
+        key = (make_cache_key("structured", _endpoint(client), model, _prompt_hash(system_prompt), user_input,
+                              _schema_key(json_schema)) if cache else None)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return CachedResponse(output_text=cached, output_parsed=json_schema.model_validate_json(cached))
+
+        async with _semaphore():
+            response = await client.responses.parse(
+                model=model,
+                input=_messages(system_prompt, user_input),
+                text_format=json_schema,
+            )
+        if response.output_parsed is not None:
+            self._cache_set(key, response.output_parsed.model_dump_json())
+        return response
@@ -0,0 +1,244 @@
+"""
+local_validation.py — Lokale, deterministische Vorprüfungen für LLM-gestützte Validatoren
+
+Jede Prüfung liefert entweder eine Entscheidung (LocalDecision) oder None, wenn die Eingabe lokal
+nicht eindeutig zu beurteilen ist; erst dann fragen die Validatoren das LLM.
+
+- parse_german_address: "Hauptstraße 5, 73033 Göppingen" -> Straße, Hausnummer, PLZ, Ort (mit PLZ-Prüfung;
+  nur bekannte Ortsnamen, Tippfehler im Ort korrigiert weiterhin das LLM)
+- match_country: Länder-/Staatsangehörigkeits-Lexikon mit Normalisierung und Fuzzy-Matching
+- classify_activity: Beschreibungen nur aus Sammelbegriffen (z. B. "Dienstleistungen aller Art") sind zu allgemein
+
+VALIDATOR_METRICS zählt je Validator, welcher Pfad (local/llm) die Eingabe entschieden hat.
+"""
+
+import difflib
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LocalDecision:
+    valid: bool
+    reason: str
+    payload: str
+
+
+# -- Normalisierung -----------------------------------------------------------
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase, umlauts transliterated, accents/punctuation removed, single spaces."""
+    text = (text or "").strip().lower().translate(_UMLAUTS)
+    text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# -- Adressen -------------------------------------------------------------------
+_ADDRESS_RE = re.compile(
+    r"^\s*(?P<street>[^\d,]*?[^\W\d_][^\d,]*?)\s*"
+    r"(?P<number>\d{1,4}\s?[a-zA-Z]?(?:\s?[-/]\s?\d{1,4}\s?[a-zA-Z]?)?)\s*,?\s*"
+    r"(?:D\s?-\s?)?(?P<postal_code>\d{5})\s+"
+    r"(?P<city>[^\W\d_][^\d,]*?)\s*$"
+)
+
+
+# Gleiche Regel wie im Prompt von valid_representative_address ("genau 5 Ziffern zwischen 01000 und 99999")
+POSTAL_CODE_RANGE = (1000, 99999)
+
+# Ortsnamen, die lokal ohne Korrektur übernommen werden: Großstädte und die Gemeinden der Region.
+# Andere (oder falsch geschriebene) Orte entscheidet das LLM, das Tippfehler im Ortsnamen korrigiert.
+KNOWN_CITIES = (
+    "Aachen", "Augsburg", "Bergisch Gladbach", "Berlin", "Bielefeld", "Bochum", "Bonn", "Bottrop",
+    "Braunschweig", "Bremen", "Bremerhaven", "Chemnitz", "Darmstadt", "Dortmund", "Dresden", "Duisburg",
+    "Düsseldorf", "Erfurt", "Erlangen", "Essen", "Frankfurt am Main", "Freiburg im Breisgau", "Fürth",
+    "Gelsenkirchen", "Göttingen", "Gütersloh", "Hagen", "Halle (Saale)", "Hamburg", "Hamm", "Hannover",
+    "Heidelberg", "Heilbronn", "Herne", "Hildesheim", "Ingolstadt", "Jena", "Karlsruhe", "Kassel", "Kiel",
+    "Koblenz", "Köln", "Krefeld", "Leipzig", "Leverkusen", "Lübeck", "Ludwigshafen am Rhein", "Magdeburg",
+    "Mainz", "Mannheim", "Moers", "Mönchengladbach", "Mülheim an der Ruhr", "München", "Münster",
+    "Neuss", "Nürnberg", "Oberhausen", "Offenbach am Main", "Oldenburg", "Osnabrück", "Paderborn",
+    "Pforzheim", "Potsdam", "Recklinghausen", "Regensburg", "Remscheid", "Reutlingen", "Rostock",
+    "Saarbrücken", "Salzgitter", "Siegen", "Solingen", "Stuttgart", "Trier", "Ulm", "Wiesbaden",
+    "Wolfsburg", "Wuppertal", "Würzburg",
+    # Region Göppingen / Stuttgart
+    "Adelberg", "Albershausen", "Backnang", "Bad Boll", "Bad Ditzenbach", "Bad Überkingen", "Birenbach",
+    "Böblingen", "Böhmenkirch", "Börtlingen", "Deggingen", "Donzdorf", "Drackenstein", "Dürnau",
+    "Ebersbach an der Fils", "Eislingen/Fils", "Esslingen am Neckar", "Eschenbach", "Filderstadt",
+    "Gammelshausen", "Geislingen an der Steige", "Gingen an der Fils", "Göppingen", "Gruibingen",
+    "Hattenhofen", "Heiningen", "Hohenstadt", "Kirchheim unter Teck", "Kuchen", "Lauterstein",
+    "Leinfelden-Echterdingen", "Ludwigsburg", "Mühlhausen im Täle", "Nürtingen", "Ostfildern",
+    "Ottenbach", "Rechberghausen", "Salach", "Schlat", "Schorndorf", "Schwäbisch Gmünd", "Sindelfingen",
+    "Süßen", "Uhingen", "Waiblingen", "Wäschenbeuren", "Wangen", "Wiesensteig", "Zell unter Aichelberg",
+)
+_CITY_INDEX: Dict[str, str] = {normalize_key(city): city for city in KNOWN_CITIES}
+
+
+def valid_postal_code(postal_code: str) -> bool:
+    """German postal codes have exactly 5 digits between 01000 and 99999 (same rule as the LLM prompt)."""
+    low, high = POSTAL_CODE_RANGE
+    return bool(re.fullmatch(r"\d{5}", postal_code)) and low <= int(postal_code) <= high
+
+
+def match_city(text: str) -> Optional[str]:
+    """Canonical spelling of a known city ("goeppingen" -> "Göppingen"); None for unknown or misspelled names."""
+    return _CITY_INDEX.get(normalize_key(text))
+
+
+def parse_german_address(text: str) -> Optional[LocalDecision]:
+    """
+    Parses "<Straße> <Nr>[,] <PLZ> <Ort>". Returns VALID with the payload
+    "<Straße>, <Nr>, <PLZ>, <Ort>" (format of valid_representative_address) if the city is a
+    known spelling, INVALID for a complete address with an impossible postal code, and None for
+    anything else (-> LLM, which also corrects typos in the city name).
+    """
+    match = _ADDRESS_RE.match(text or "")
+    if not match:
+        return None
+    street = re.sub(r"\s+", " ", match.group("street")).strip(" ,")
+    number = re.sub(r"\s+", "", match.group("number"))
+    postal_code = match.group("postal_code")
+    city = re.sub(r"\s+", " ", match.group("city")).strip(" ,")
+    if len(street) < 3 or len(city) < 2:
+        return None
+    if not valid_postal_code(postal_code):
+        return LocalDecision(False, f"Die Postleitzahl {postal_code} ist keine gültige deutsche Postleitzahl.", "")
+    known_city = match_city(city)
+    if known_city is None:
+        return None
+    return LocalDecision(True, "", f"{street}, {number}, {postal_code}, {known_city}")
+
+
+# -- Länder / Staatsangehörigkeiten ------------------------------------------
+COUNTRIES = (
+    "Afghanistan", "Ägypten", "Albanien", "Algerien", "Andorra", "Angola", "Antigua und Barbuda",
+    "Äquatorialguinea", "Argentinien", "Armenien", "Aserbaidschan", "Äthiopien", "Australien",
+    "Bahamas", "Bahrain", "Bangladesch", "Barbados", "Belarus", "Belgien", "Belize", "Benin",
+    "Bhutan", "Bolivien", "Bosnien und Herzegowina", "Botsuana", "Brasilien", "Brunei", "Bulgarien",
+    "Burkina Faso", "Burundi", "Chile", "China", "Costa Rica", "Côte d'Ivoire", "Dänemark",
+    "Deutschland", "Dominica", "Dominikanische Republik", "Dschibuti", "Ecuador", "El Salvador",
+    "Eritrea", "Estland", "Eswatini", "Fidschi", "Finnland", "Frankreich", "Gabun", "Gambia",
+    "Georgien", "Ghana", "Grenada", "Griechenland", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana",
+    "Haiti", "Honduras", "Indien", "Indonesien", "Irak", "Iran", "Irland", "Island", "Israel",
+    "Italien", "Jamaika", "Japan", "Jemen", "Jordanien", "Kambodscha", "Kamerun", "Kanada",
+    "Kap Verde", "Kasachstan", "Katar", "Kenia", "Kirgisistan", "Kiribati", "Kolumbien", "Komoren",
+    "Kongo", "Demokratische Republik Kongo", "Kosovo", "Kroatien", "Kuba", "Kuwait", "Laos", "Lesotho",
+    "Lettland", "Libanon", "Liberia", "Libyen", "Liechtenstein", "Litauen", "Luxemburg", "Madagaskar",
+    "Malawi", "Malaysia", "Malediven", "Mali", "Malta", "Marokko", "Marshallinseln", "Mauretanien",
+    "Mauritius", "Mexiko", "Mikronesien", "Moldau", "Monaco", "Mongolei", "Montenegro", "Mosambik",
+    "Myanmar", "Namibia", "Nauru", "Nepal", "Neuseeland", "Nicaragua", "Niederlande", "Niger",
+    "Nigeria", "Nordkorea", "Nordmazedonien", "Norwegen", "Oman", "Österreich", "Osttimor",
+    "Pakistan", "Palau", "Palästina", "Panama", "Papua-Neuguinea", "Paraguay", "Peru", "Philippinen",
+    "Polen", "Portugal", "Ruanda", "Rumänien", "Russland", "Salomonen", "Sambia", "Samoa",
+    "San Marino", "São Tomé und Príncipe", "Saudi-Arabien", "Schweden", "Schweiz", "Senegal",
+    "Serbien", "Seychellen", "Sierra Leone", "Simbabwe", "Singapur", "Slowakei", "Slowenien",
+    "Somalia", "Spanien", "Sri Lanka", "St. Kitts und Nevis", "St. Lucia",
+    "St. Vincent und die Grenadinen", "Südafrika", "Sudan", "Südkorea", "Südsudan", "Suriname",
+    "Syrien", "Tadschikistan", "Taiwan", "Tansania", "Thailand", "Togo", "Tonga",
+    "Trinidad und Tobago", "Tschad", "Tschechien", "Tunesien", "Türkei", "Turkmenistan", "Tuvalu",
+    "Uganda", "Ukraine", "Ungarn", "Uruguay", "Usbekistan", "Vanuatu", "Vatikanstadt", "Venezuela",
+    "Vereinigte Arabische Emirate", "Vereinigte Staaten", "Vereinigtes Königreich", "Vietnam",
+    "Zentralafrikanische Republik", "Zypern",
+)
+
+# Gebräuchliche Alternativen und Staatsangehörigkeiten (Adjektive) -> Ländername
+COUNTRY_ALIASES = {
+    "USA": "Vereinigte Staaten", "Vereinigte Staaten von Amerika": "Vereinigte Staaten", "Amerika": "Vereinigte Staaten",
+    "amerikanisch": "Vereinigte Staaten", "UK": "Vereinigtes Königreich", "Großbritannien": "Vereinigtes Königreich",
+    "England": "Vereinigtes Königreich", "britisch": "Vereinigtes Königreich", "Weißrussland": "Belarus",
+    "Holland": "Niederlande", "Tschechische Republik": "Tschechien", "Elfenbeinküste": "Côte d'Ivoire",
+    "Mazedonien": "Nordmazedonien", "Moldawien": "Moldau", "Republik Moldau": "Moldau", "Burma": "Myanmar",
+    "Swasiland": "Eswatini", "Türkiye": "Türkei", "Kongo (Brazzaville)": "Kongo", "Kongo (Kinshasa)": "Demokratische Republik Kongo",
+    "BRD": "Deutschland", "Bundesrepublik Deutschland": "Deutschland", "VAE": "Vereinigte Arabische Emirate",
+    "deutsch": "Deutschland", "türkisch": "Türkei", "österreichisch": "Österreich", "schweizerisch": "Schweiz",
+    "italienisch": "Italien", "französisch": "Frankreich", "spanisch": "Spanien", "portugiesisch": "Portugal",
+    "griechisch": "Griechenland", "polnisch": "Polen", "rumänisch": "Rumänien", "bulgarisch": "Bulgarien",
+    "ungarisch": "Ungarn", "kroatisch": "Kroatien", "serbisch": "Serbien", "bosnisch": "Bosnien und Herzegowina",
+    "kosovarisch": "Kosovo", "albanisch": "Albanien", "russisch": "Russland", "ukrainisch": "Ukraine",
+    "syrisch": "Syrien", "irakisch": "Irak", "iranisch": "Iran", "afghanisch": "Afghanistan",
+    "chinesisch": "China", "indisch": "Indien", "vietnamesisch": "Vietnam", "niederländisch": "Niederlande",
+    "belgisch": "Belgien", "tschechisch": "Tschechien", "slowakisch": "Slowakei", "marokkanisch": "Marokko",
+    "tunesisch": "Tunesien", "ägyptisch": "Ägypten", "nigerianisch": "Nigeria", "pakistanisch": "Pakistan",
+}
+
+_COUNTRY_INDEX: Dict[str, str] = {normalize_key(name): name for name in COUNTRIES}
+_COUNTRY_INDEX.update({normalize_key(alias): name for alias, name in COUNTRY_ALIASES.items()})
+
+
+HOME_COUNTRY = "Deutschland"
+
+
+def match_country(text: str, cutoff: float = 0.88) -> Optional[str]:
+    """Canonical German country name for a country name, alias or nationality; None if not recognized."""
+    key = normalize_key(text)
+    if not key:
+        return None
+    if key in _COUNTRY_INDEX:
+        return _COUNTRY_INDEX[key]
+    close = difflib.get_close_matches(key, _COUNTRY_INDEX.keys(), n=2, cutoff=cutoff)
+    # nur eindeutige Treffer lokal entscheiden
+    if len(close) == 1 or (len(close) == 2 and _COUNTRY_INDEX[close[0]] == _COUNTRY_INDEX[close[1]]):
+        return _COUNTRY_INDEX[close[0]]
+    return None
+
+
+# -- Tätigkeiten ----------------------------------------------------------------
+# Beschreibungen, die nur aus Sammelbegriffen bestehen, sind zu allgemein ("Handel mit Waren aller Art",
+# "Dienstleistungen aller Art", "Dinge verkaufen", "Online Marketing"). Lokal wird nur dieses INVALID
+# entschieden; ob eine präzise Beschreibung zulässig ist, beurteilt weiterhin das LLM.
+GENERIC_ACTIVITY_TERMS = frozenset({
+    "handel", "einzelhandel", "grosshandel", "onlinehandel", "vertrieb", "verkauf", "verkaufen", "ankauf",
+    "import", "export", "waren", "ware", "produkte", "produkt", "artikel", "gueter", "dinge", "sachen",
+    "dienstleistungen", "dienstleistung", "dienste", "service", "services", "taetigkeit", "taetigkeiten",
+    "gewerbe", "geschaefte", "handwerk", "beratung", "vermittlung", "online", "marketing", "internet",
+})
+# Füllwörter und Mengenangaben, die eine Beschreibung nicht präziser machen
+_ACTIVITY_FILLERS = frozenset({
+    "aller", "alle", "allen", "art", "arten", "jeglicher", "jeder", "sonstige", "sonstiger", "sonstigen",
+    "diverse", "diverser", "diversen", "verschiedener", "verschiedenen", "allgemeinen",
+    "verschiedene", "allgemeine", "allgemeiner", "allgemein", "mit", "von", "und", "oder", "im", "in",
+    "bereich", "der", "die", "das", "den", "dem", "des", "ein", "eine", "einer", "fuer", "zum", "zur",
+})
+
+
+def classify_activity(text: str) -> Optional[bool]:
+    """
+    False if the description consists of generic terms only (too general); None otherwise (-> LLM).
+    A description is never accepted locally, since the LLM also checks for inadmissible activities.
+    """
+    words = [word for word in normalize_key(text).split() if word not in _ACTIVITY_FILLERS]
+    if words and all(word in GENERIC_ACTIVITY_TERMS for word in words):
+        return False
+    return None
+
+
+# -- Metriken -------------------------------------------------------------------
+class ValidatorMetrics:
+    """Thread-safe counters of (validator, path) with path "local", "llm" or "cache" (memoized result)."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, validator: str, path: str) -> None:
+        with self._lock:
+            self._counts[(validator, path)] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def local_share(self, validator: str) -> float:
+        with self._lock:
+            local = self._counts[(validator, "local")]
+            total = local + self._counts[(validator, "llm")]
+        return local / total if total else 0.0
+
+
+# Prozessweite Validator-Metriken
+VALIDATOR_METRICS = ValidatorMetrics()
@@ -0,0 +1,66 @@
+"""
+ocr.py — Parallele OCR-Stufe für hochgeladene Dokumente (Handelsregisterauszug, Personalausweis)
+
+Die Seiten eines Dokuments werden auf einen begrenzten Thread-Pool verteilt (jeder
+pytesseract-Aufruf startet einen eigenen tesseract-Prozess, die Threads warten nur darauf).
+iter_page_texts liefert die Seitentexte in Seitenreihenfolge, sobald eine Seite und alle
+vorherigen fertig sind, sodass die Extraktion sie bereits einsammeln kann, während spätere
+Seiten noch erkannt werden. Vor der Erkennung durchläuft jede Seite die Vorverarbeitung aus
+ocr_preprocessing.py (im Worker, also ebenfalls parallel).
+
+Umgebungsvariablen:
+    OCR_WORKERS   – maximale Anzahl parallel erkannter Seiten (Default: min(4, CPU-Kerne))
+    OCR_LANG      – tesseract-Sprache (Default: deu)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Sequence, Union
+
+# tesseract nutzt intern OpenMP; bei mehreren parallelen Prozessen würde das die Kerne überbuchen
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import pytesseract
+except ImportError:  # OCR-Stufe ohne tesseract nicht nutzbar, Modul bleibt importierbar
+    pytesseract = None
+
+from .ocr_preprocessing import PreprocessConfig, preprocess  # noqa: E402
+
+OCR_LANG = os.getenv("OCR_LANG", "deu")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_OCR_POOL = ThreadPoolExecutor(max_workers=max(OCR_WORKERS, 1), thread_name_prefix="ocr")
+
+
+def ocr_page(img: Any, lang: str = OCR_LANG, preprocessing: Optional[PreprocessConfig] = None) -> str:
+    """OCR of one page image (numpy array or PIL image) after preprocessing (default: PREPROCESS_CONFIG)."""
+    if pytesseract is None:
+        raise RuntimeError("pytesseract ist nicht installiert (pip install pytesseract, tesseract-ocr)")
+    return pytesseract.image_to_string(preprocess(img, preprocessing), lang=lang)
+
+
+def iter_page_texts(images: Union[Any, Sequence[Any]], lang: str = OCR_LANG,
+                    preprocessing: Optional[PreprocessConfig] = None) -> Iterator[str]:
+    """
+    Yields the OCR text of each page in page order. All pages are submitted to the pool at once;
+    page i is yielded as soon as pages 0..i are done.
+    """
+    pages: List[Any] = list(images) if isinstance(images, (list, tuple)) else [images]
+    if len(pages) == 1:
+        yield ocr_page(pages[0], lang, preprocessing)
+        return
+    futures = [_OCR_POOL.submit(ocr_page, page, lang, preprocessing) for page in pages]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        # Abbruch durch den Verbraucher: noch nicht gestartete Seiten verwerfen
+        for future in futures:
+            future.cancel()
+
+
+def ocr_text(images: Union[Any, Sequence[Any]], lang: str = OCR_LANG,
+             preprocessing: Optional[PreprocessConfig] = None) -> str:
+    """OCR text of all pages, concatenated in page order."""
+    return "".join(iter_page_texts(images, lang, preprocessing))
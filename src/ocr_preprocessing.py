@@ -0,0 +1,179 @@
+"""
+ocr_preprocessing.py — Bildvorverarbeitung vor der OCR (Kamera-/Handyfotos, PDF-Renderings)
+
+Schritte (in dieser Reihenfolge, einzeln abschaltbar):
+    grayscale  – Graustufen
+    crop       – auf das Dokument zuschneiden (größte Kontur, nur wenn sie sich vom Hintergrund abhebt)
+    resize     – Auflösung auf OCR_TARGET_DPI normieren (bezogen auf die lange Dokumentseite in mm)
+    deskew     – Schräglage über die Richtung langer Kanten (Hough) korrigieren
+    threshold  – adaptive Binarisierung (gleicht Schatten/ungleichmäßige Beleuchtung aus)
+
+Farbbilder werden in der Kanalreihenfolge von PreprocessConfig.channel_order erwartet (Default "RGB",
+wie PIL-Bilder und die Seiten aus main.load_file_as_images); mit cv2.imread gelesene Bilder sind BGR.
+
+Umgebungsvariablen:
+    OCR_PREPROCESS  – kommagetrennte Schritte, "all" oder "off" (Default: off, Opt-in bis der Benchmark
+                      mit tesseract einen Gewinn an Genauigkeit/Zeit zeigt)
+    OCR_TARGET_DPI  – Zielauflösung (Default: 300)
+
+Benchmark: python benchmarks/bench_ocr_preprocessing.py
+"""
+
+import math
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+STEPS = ("grayscale", "crop", "resize", "deskew", "threshold")
+
+# Lange Seite gängiger Dokumente in mm
+A4_LONG_SIDE_MM = 297.0
+ID_CARD_LONG_SIDE_MM = 85.6
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    steps: Tuple[str, ...] = STEPS
+    target_dpi: int = 300
+    doc_long_side_mm: float = A4_LONG_SIDE_MM
+    channel_order: str = "RGB"          # "RGB" (PIL, Pipeline) oder "BGR" (cv2.imread/imdecode)
+    max_scale: float = 4.0              # Vergrößerung kleiner Fotos begrenzen
+    min_crop_area: float = 0.2          # Dokumentkontur muss >= 20 % des Bildes bedecken
+    min_crop_contrast: float = 25.0     # Grauwertabstand Dokument <-> Rand, sonst kein Zuschnitt
+    max_skew_deg: float = 30.0
+    threshold_block: int = 31
+    threshold_c: int = 15
+
+    def for_document(self, long_side_mm: float) -> "PreprocessConfig":
+        return replace(self, doc_long_side_mm=long_side_mm)
+
+
+def config_from_env() -> PreprocessConfig:
+    spec = os.getenv("OCR_PREPROCESS", "off").strip().lower()
+    if spec == "all":
+        steps = STEPS
+    else:
+        steps = () if spec in ("", "off", "none", "0", "false") else tuple(
+            step for step in (part.strip() for part in spec.split(",")) if step in STEPS
+        )
+    return PreprocessConfig(steps=steps, target_dpi=int(os.getenv("OCR_TARGET_DPI", "300")))
+
+
+PREPROCESS_CONFIG = config_from_env()
+
+
+def _as_array(img: Any) -> np.ndarray:
+    """numpy view of the image; PIL images in other modes (P, CMYK, …) are converted to RGB first."""
+    if isinstance(img, np.ndarray):
+        return img
+    if getattr(img, "mode", "RGB") not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGB")
+    return np.asarray(img)
+
+
+_GRAY_CODES = {
+    ("RGB", 3): cv2.COLOR_RGB2GRAY, ("RGB", 4): cv2.COLOR_RGBA2GRAY,
+    ("BGR", 3): cv2.COLOR_BGR2GRAY, ("BGR", 4): cv2.COLOR_BGRA2GRAY,
+}
+
+
+def to_grayscale(img: np.ndarray, channel_order: str = "RGB") -> np.ndarray:
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 1:
+        return img[:, :, 0]
+    return cv2.cvtColor(img, _GRAY_CODES[(channel_order.upper(), img.shape[2])])
+
+
+def crop_to_document(img: np.ndarray, config: PreprocessConfig) -> np.ndarray:
+    """Crops to the largest contour if it covers enough of the image and differs from the border."""
+    gray = to_grayscale(img, config.channel_order)
+    h, w = gray.shape
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.dilate(cv2.Canny(blurred, 50, 150), np.ones((5, 5), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return img
+    contour = max(contours, key=cv2.contourArea)
+    x, y, cw, ch = cv2.boundingRect(contour)
+    if cw * ch < config.min_crop_area * w * h or (cw >= w - 2 and ch >= h - 2):
+        return img
+
+    # Nur zuschneiden, wenn sich das Dokument vom Hintergrund abhebt (z. B. nicht bei PDF-Seiten)
+    mask = np.zeros_like(gray)
+    cv2.drawContours(mask, [contour], -1, 255, thickness=cv2.FILLED)
+    inside = cv2.mean(gray, mask=mask)[0]
+    outside = cv2.mean(gray, mask=cv2.bitwise_not(mask))[0]
+    if abs(inside - outside) < config.min_crop_contrast:
+        return img
+    return img[y:y + ch, x:x + cw]
+
+
+def normalize_resolution(img: np.ndarray, config: PreprocessConfig) -> np.ndarray:
+    """Scales so that the long side corresponds to doc_long_side_mm at target_dpi."""
+    long_side = max(img.shape[:2])
+    target = config.doc_long_side_mm / 25.4 * config.target_dpi
+    scale = min(target / long_side, config.max_scale)
+    if abs(scale - 1.0) < 0.05:
+        return img
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def estimate_skew(img: np.ndarray, config: PreprocessConfig) -> float:
+    """Median angle (degrees) of long, roughly horizontal edges; 0.0 if none are found."""
+    gray = to_grayscale(img, config.channel_order)
+    edges = cv2.Canny(gray, 50, 150)
+    min_len = max(gray.shape[1] // 4, 20)
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 360, threshold=100, minLineLength=min_len, maxLineGap=10)
+    if lines is None:
+        return 0.0
+    angles = []
+    for x1, y1, x2, y2 in lines.reshape(-1, 4):
+        angle = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        if abs(angle) <= config.max_skew_deg:
+            angles.append(angle)
+    return float(np.median(angles)) if angles else 0.0
+
+
+def deskew(img: np.ndarray, config: PreprocessConfig) -> np.ndarray:
+    angle = estimate_skew(img, config)
+    if abs(angle) < 0.3:
+        return img
+    h, w = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_w, new_h = int(h * sin + w * cos), int(h * cos + w * sin)
+    matrix[0, 2] += new_w / 2 - w / 2
+    matrix[1, 2] += new_h / 2 - h / 2
+    border = 255 if img.ndim == 2 else (255, 255, 255)
+    return cv2.warpAffine(img, matrix, (new_w, new_h), flags=cv2.INTER_CUBIC,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+
+
+def adaptive_threshold(img: np.ndarray, config: PreprocessConfig) -> np.ndarray:
+    block = config.threshold_block | 1  # muss ungerade sein
+    return cv2.adaptiveThreshold(to_grayscale(img, config.channel_order), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY, block, config.threshold_c)
+
+
+def preprocess(img: Any, config: Optional[PreprocessConfig] = None) -> Any:
+    """Runs the configured steps; returns the input unchanged if no step is enabled."""
+    config = config or PREPROCESS_CONFIG
+    if not config.steps:
+        return img
+    out = _as_array(img)
+    if "grayscale" in config.steps:
+        out = to_grayscale(out, config.channel_order)
+    if "crop" in config.steps:
+        out = crop_to_document(out, config)
+    if "resize" in config.steps:
+        out = normalize_resolution(out, config)
+    if "deskew" in config.steps:
+        out = deskew(out, config)
+    if "threshold" in config.steps:
+        out = adaptive_threshold(out, config)
+    return out
@@ -0,0 +1,88 @@
+"""
+openai_clients.py — Gemeinsame, gepoolte OpenAI-Clients
+
+Statt an jeder Aufrufstelle OpenAI() neu zu erzeugen (eigener Connection-Pool, neue TLS-Handshakes),
+liefert die Registry pro (base_url, API-Key) genau einen Client mit Keep-Alive-Pool.
+Pool-Grenzen über Umgebungsvariablen:
+    OPENAI_MAX_CONNECTIONS     (Default 20)
+    OPENAI_MAX_KEEPALIVE       (Default 10)
+    OPENAI_KEEPALIVE_EXPIRY    (Sekunden, Default 30)
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+_Key = Tuple[Optional[str], str]
+
+_CLIENTS: Dict[_Key, OpenAI] = {}
+# Async-Clients sind an ihren Event-Loop gebunden, daher je Loop eine eigene Registry
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_Key, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+# Plain-httpx-Clients (lokale LLM-Endpunkte) ebenfalls je Loop
+_ASYNC_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool limits from the environment."""
+    return httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30")),
+    )
+
+
+def _resolve(api_key: Optional[str], base_url: Optional[str]) -> Tuple[Optional[str], Optional[str], _Key]:
+    # Gleiche Defaults wie OpenAI(): Key und base_url aus der Umgebung
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    return api_key, base_url, (base_url, key_hash)
+
+
+def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+    """Shared OpenAI client for (base_url, api_key); created on first use."""
+    api_key, base_url, key = _resolve(api_key, base_url)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = _CLIENTS[key] = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=DefaultHttpxClient(limits=pool_limits()),
+                )
+    return client
+
+
+def get_async_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """Shared AsyncOpenAI client for (base_url, api_key) in the running event loop."""
+    api_key, base_url, key = _resolve(api_key, base_url)
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=DefaultAsyncHttpxClient(limits=pool_limits()),
+            )
+    return client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared httpx.AsyncClient (same pool limits) for plain HTTP endpoints in the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        client = _ASYNC_HTTP_CLIENTS.get(loop)
+        if client is None:
+            client = _ASYNC_HTTP_CLIENTS[loop] = httpx.AsyncClient(limits=pool_limits())
+    return client
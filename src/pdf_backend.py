@@ -1,115 +1,456 @@
 import os
+import io
+import re
 import json
+import hashlib
+import logging
+import unicodedata
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
-from pypdf import PdfReader, PdfWriter
-from pypdf.generic import NameObject, BooleanObject
 import pikepdf
 
+ROOT = Path(__file__).resolve().parents[1]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WidgetRef:
+    """Position of one widget annotation inside a template."""
+    page: int                   # Seitenindex
+    annot: int                  # Index im /Annots-Array der Seite
+    on_state: Optional[str]     # „On“-State einer Checkbox (z. B. "/Ja"), sonst None
+
+
+class PdfTemplate:
+    """
+    A PDF template parsed once per process.
+    Widget backgrounds are removed and NeedAppearances is set ahead of time, so the prepared
+    bytes only need the per-request field values. `fields` maps each field name to its widgets.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        index: Dict[str, list] = {}
+        with open(path, "rb") as f:
+            source = f.read()
+        # Digest über die Originaldatei: stabil über Prozess-Neustarts hinweg
+        self.digest = hashlib.sha256(source).hexdigest()
+        with pikepdf.open(io.BytesIO(source)) as pdf:
+            for page_idx, page in enumerate(pdf.pages):
+                for annot_idx, annot in enumerate(page.get("/Annots", [])):
+                    if annot.get("/Subtype") != pikepdf.Name("/Widget"):
+                        continue
+
+                    # Hintergrund & Rahmenfarbe einmalig löschen
+                    mk = annot.get("/MK")
+                    if mk is not None:
+                        if "/BG" in mk:    del mk["/BG"]
+                        if "/BC" in mk:    del mk["/BC"]
+
+                    field_name = annot.get("/T")
+                    if field_name is None:
+                        continue
+                    on_state = None
+                    ap_dict = annot.get("/AP", {}).get("/N", {})
+                    if isinstance(ap_dict, pikepdf.Dictionary):
+                        on_state = next((str(k) for k in ap_dict.keys() if k != "/Off"), None)
+                    index.setdefault(str(field_name), []).append(WidgetRef(page_idx, annot_idx, on_state))
+
+            acro = pdf.Root.get("/AcroForm")
+            if acro is None:
+                acro = pdf.make_indirect(pikepdf.Dictionary(Fields=pikepdf.Array()))
+                pdf.Root["/AcroForm"] = acro
+            acro["/NeedAppearances"] = True
+
+            buffer = io.BytesIO()
+            pdf.save(buffer)
+
+        self.data = buffer.getvalue()
+        self.fields: Mapping[str, Tuple[WidgetRef, ...]] = MappingProxyType(
+            {name: tuple(refs) for name, refs in index.items()}
+        )
+
+    def open(self) -> pikepdf.Pdf:
+        """Returns a fresh, independent document for one fill request."""
+        return pikepdf.open(io.BytesIO(self.data))
+
+
+_TEMPLATES: Dict[Tuple[str, int], PdfTemplate] = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def resolve_template_path(pdf_file: str) -> str:
+    """Resolves a template path relative to the working directory, falling back to the repo root."""
+    path = Path(pdf_file)
+    if not path.is_absolute() and not path.exists():
+        path = ROOT / path
+    return str(path.resolve())
+
+
+def get_template(pdf_file: str) -> PdfTemplate:
+    """
+    Returns the parsed template for pdf_file from the process-wide registry.
+    The entry is keyed by the file's mtime, so an updated template is parsed again.
+    """
+    path = resolve_template_path(pdf_file)
+    key = (path, os.stat(path).st_mtime_ns)
+    template = _TEMPLATES.get(key)
+    if template is None:
+        with _TEMPLATES_LOCK:
+            template = _TEMPLATES.get(key)
+            if template is None:
+                template = PdfTemplate(path)
+                for stale in [k for k in _TEMPLATES if k[0] == path]:
+                    del _TEMPLATES[stale]
+                _TEMPLATES[key] = template
+    return template
+
+
+_TRUTH_VALUES = ("true", "false")
+
+
+@dataclass(frozen=True)
+class SlotFillRule:
+    """
+    Precompiled mapping of one slot onto its PDF fields.
+    kind: "text" (value is collected for the text fields), "choice_text" (choice value is
+    written as text into a single field) or "checkbox" (checkbox_table maps the normalized
+    value to the checkboxes that have to be ticked).
+    """
+    kind: str
+    targets: Tuple[str, ...]
+    checkbox_table: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+
+
+def compile_slot_rule(targets, choices=None, check_box_condition=None) -> SlotFillRule:
+    """Compiles target field(s), choices and check_box_condition of one slot into a SlotFillRule."""
+    if targets is None:
+        target_tuple: Tuple[str, ...] = ()
+    elif isinstance(targets, list):
+        target_tuple = tuple(targets)
+    else:
+        target_tuple = (targets,)
+
+    if not choices:
+        return SlotFillRule("text", target_tuple)
+    if not isinstance(targets, list):
+        return SlotFillRule("choice_text", target_tuple)
+
+    # Wahrheits-Abgleich vorab auflösen: normalisierter Wert -> anzukreuzende Checkboxen
+    table: Dict[str, Tuple[str, ...]] = {}
+    for idx, choice in enumerate(choices[:len(target_tuple)]):
+        table.setdefault(str(choice).lower(), (target_tuple[idx],))
+    if check_box_condition is not None:
+        for truth in _TRUTH_VALUES:
+            table[truth] = target_tuple if truth == check_box_condition else ()
+    else:
+        table["true"] = target_tuple[:1]
+        table["false"] = target_tuple[1:2]
+    return SlotFillRule("checkbox", target_tuple, MappingProxyType(table))
+
+
+def _apply_rules(responses: Dict[str, Dict[str, Any]], rule_for) -> Dict[str, str]:
+    """Turns a responses dict into the field map { field_name: value } using rule_for(slot, details)."""
+    field_map = {}
+    text_accum = {}
+    for slot, details in responses.items():
+        value = details.get("value")
+        rule = rule_for(slot, details)
+        if rule.kind == "checkbox":
+            for fn in rule.checkbox_table.get(str(value).strip().lower(), ()):
+                field_map[fn] = "/Y"
+        elif rule.kind == "choice_text":
+            for fn in rule.targets:
+                text_accum.setdefault(fn, []).append(str(value))
+        else:
+            for fn in rule.targets:
+                text_accum.setdefault(fn, []).append(value)
+
+    # Text flachlegen
+    for fn, vals in text_accum.items():
+        non_empty = [str(v) for v in vals if v]
+        field_map[fn] = ", ".join(non_empty)
+
+    return field_map
+
+
+def build_field_map(responses: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Builds the PDF field map { field_name: value } from a responses dict in the
+    save_responses_to_json format. Selected checkboxes are marked with "/Y",
+    text values of fields shared by several slots are concatenated with ", ".
+    """
+    return _apply_rules(
+        responses,
+        lambda slot, details: compile_slot_rule(
+            details.get("target_filed_name"), details.get("choices"), details.get("check_box_condition")
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class FillPlan:
+    """
+    Immutable slot -> PDF field plan of one form, compiled once by load_forms.
+    unknown_fields lists (slot_name, field_name) pairs that do not exist in the template.
+    """
+    pdf_file: str
+    rules: Mapping[str, SlotFillRule]
+    unknown_fields: Tuple[Tuple[str, str], ...]
+
+    def field_map(self, responses: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Builds the field map with plan lookups; slots outside the plan fall back to their payload."""
+        rules = self.rules
+        return _apply_rules(
+            responses,
+            lambda slot, details: rules.get(slot) or compile_slot_rule(
+                details.get("target_filed_name"), details.get("choices"), details.get("check_box_condition")
+            ),
+        )
+
+
+def compile_fill_plan(form_conf: Dict[str, Any]) -> FillPlan:
+    """Compiles the slots of a form JSON (filed_name, choices, check_box_condition) into a FillPlan."""
+    template_fields = get_template(form_conf["pdf_file"]).fields
+    rules = {}
+    unknown = []
+    for slot_def in form_conf.get("slots", []):
+        rule = compile_slot_rule(
+            slot_def.get("filed_name"), slot_def.get("choices"), slot_def.get("check_box_condition")
+        )
+        rules[slot_def["slot_name"]] = rule
+        unknown.extend((slot_def["slot_name"], fn) for fn in rule.targets if fn not in template_fields)
+    return FillPlan(form_conf["pdf_file"], MappingProxyType(rules), tuple(unknown))
+
+
+# ---------------------------------------------------------------------------
+# Eigene Appearance-Streams für Textfelder (Helvetica, WinAnsiEncoding)
+# ---------------------------------------------------------------------------
+APPEARANCE_MODES = ("viewer", "generate", "flatten")
+
+# Glyphbreiten von Helvetica (AFM, 1/1000 em) für ASCII 32..126
+_HELVETICA_WIDTHS = dict(zip(
+    (chr(c) for c in range(32, 127)),
+    (278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+     1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+     667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+     333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+     556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584),
+))
+_HELVETICA_WIDTHS["ß"] = 611
+_DA_FONT_RE = re.compile(r"/(\S+)\s+([\d.]+)\s+Tf")
+_MULTILINE_FLAG = 1 << 12
+
+
+def is_winansi(text: str) -> bool:
+    """True if text can be drawn with the built-in Helvetica/WinAnsi font without loss."""
+    try:
+        text.encode("cp1252")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _to_winansi(text: str) -> bytes:
+    """Encodes text in WinAnsi (cp1252); other characters lose their accents or become '?'."""
+    chars = []
+    for ch in text:
+        try:
+            ch.encode("cp1252")
+        except UnicodeEncodeError:
+            ch = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c)) or "?"
+        chars.append(ch)
+    return "".join(chars).encode("cp1252", errors="replace")
+
+
+def _text_width(text: str, size: float) -> float:
+    width = 0
+    for ch in text:
+        w = _HELVETICA_WIDTHS.get(ch)
+        if w is None:
+            base = unicodedata.normalize("NFKD", ch)[:1]
+            w = _HELVETICA_WIDTHS.get(base, 556)
+        width += w
+    return width * size / 1000.0
+
+
+def _wrap_lines(text: str, size: float, max_width: float) -> list:
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and _text_width(candidate, size) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _escape_pdf_string(raw: bytes) -> bytes:
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r")
+
+
+def _build_text_appearance(pdf: pikepdf.Pdf, annot: pikepdf.Dictionary, value: str,
+                           font: pikepdf.Object, default_da: str) -> pikepdf.Stream:
+    """Builds the normal appearance stream (/AP /N) of a text widget for value."""
+    llx, lly, urx, ury = (float(v) for v in annot["/Rect"])
+    width, height = abs(urx - llx), abs(ury - lly)
+    padding = 2.0
+
+    m = _DA_FONT_RE.search(str(annot.get("/DA", default_da)))
+    size = float(m.group(2)) if m else 0.0
+    multiline = bool(int(annot.get("/Ff", 0)) & _MULTILINE_FLAG)
+
+    if multiline:
+        size = size or 9.0
+        lines = _wrap_lines(value, size, width - 2 * padding)
+        leading = size * 1.15
+        y = height - padding - size
+    else:
+        if not size:
+            # Auto-Größe: an Höhe und Breite anpassen
+            size = min(12.0, (height - 2 * padding) * 0.8)
+            text_width = _text_width(value, 1.0)
+            if text_width:
+                size = min(size, (width - 2 * padding) / text_width)
+            size = max(size, 4.0)
+        lines = [value.replace("\n", " ")]
+        leading = size
+        y = (height - size * 0.72) / 2
+
+    ops = [b"/Tx BMC", b"q", b"BT", b"/Helv %.2f Tf 0 g" % size, b"%.2f TL" % leading, b"%.2f %.2f Td" % (padding, y)]
+    for idx, line in enumerate(lines):
+        if idx:
+            ops.append(b"T*")
+        ops.append(b"(" + _escape_pdf_string(_to_winansi(line)) + b") Tj")
+    ops += [b"ET", b"Q", b"EMC"]
+
+    stream = pikepdf.Stream(pdf, b"\n".join(ops))
+    stream["/Type"] = pikepdf.Name("/XObject")
+    stream["/Subtype"] = pikepdf.Name("/Form")
+    stream["/BBox"] = [0, 0, width, height]
+    stream["/Resources"] = pikepdf.Dictionary(Font=pikepdf.Dictionary(Helv=font))
+    return stream
+
 
 class GenericPdfFiller:
     """
     A universal PDF filler that reads a JSON payload with form data and target field mappings,
     handles text concatenation for shared fields, and checkbox/radio button logic based on choices.
-    After filling, sets NeedAppearances and makes widget backgrounds transparent.
+    Field values and checkbox states are written in a single pass over a copy of the cached
+    template (see get_template), which already carries NeedAppearances and transparent widgets.
     """
-    def __init__(self, json_path: str):
-        with open(json_path, 'r', encoding='utf-8') as f:
-            payload = json.load(f)
+    def __init__(self, json_path: Optional[str] = None, payload: Optional[Dict[str, Any]] = None,
+                 plan: Optional[FillPlan] = None):
+        if payload is None:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
         self.template = payload["pdf_file"]
         self.responses = payload["data"]
+        self.plan = plan
 
-    def fill(self, output_path: str):
-        # 1. Feld-Map bauen
-        field_map = {}
-        text_accum = {}
-        for slot, details in self.responses.items():
-            value   = details.get("value")
-            targets = details.get("target_filed_name")
-            choices = details.get("choices")
-            check_box_condition = details.get("check_box_condition")
-            if choices:
-                if not isinstance(targets, list):
-                    text_accum.setdefault(targets, []).append(str(value))
-                    continue
-                for idx, fn in enumerate(targets):
-                    # Wahrheits-Abgleich
-                    if isinstance(value, str) and value.lower() in ("true","false"):
-                        if check_box_condition is not None:
-                            selected = value.lower() == check_box_condition
-                        else:
-                            val_bool = value.lower() in ("true","ja","yes","1","on")
-                            selected = (val_bool and idx==0) or (not val_bool and idx==1)
+    def fill_bytes(self, appearance: str = "viewer") -> bytes:
+        """
+        Fills a copy of the cached template in memory and returns the finished PDF as bytes.
+        appearance: "viewer" leaves appearance generation to the PDF viewer (NeedAppearances),
+        "generate" writes appearance streams for the filled text fields itself and
+        "flatten" additionally merges all fields into the page content.
+        Values that WinAnsi cannot represent (e.g. "Yılmaz", "Łódź", CJK) get no own appearance:
+        these fields stay interactive and are rendered by the viewer (NeedAppearances), also when
+        flattening, so that names and addresses are never written with replacement characters.
+        """
+        if appearance not in APPEARANCE_MODES:
+            raise ValueError(f"Unbekannter Appearance-Modus '{appearance}', erlaubt: {APPEARANCE_MODES}")
+        if self.plan is not None:
+            field_map = self.plan.field_map(self.responses)
+        else:
+            field_map = build_field_map(self.responses)
+        template = get_template(self.template)
+
+        with template.open() as pdf:
+            pages = pdf.pages
+            acro = pdf.Root["/AcroForm"]
+            generate = appearance != "viewer"
+            if generate:
+                default_da = str(acro.get("/DA", "/Helv 0 Tf 0 g"))
+                font = pdf.make_indirect(pikepdf.Dictionary(
+                    Type=pikepdf.Name.Font, Subtype=pikepdf.Name.Type1,
+                    BaseFont=pikepdf.Name.Helvetica, Encoding=pikepdf.Name.WinAnsiEncoding,
+                ))
+
+            viewer_fields = []
+            for field_name, value in field_map.items():
+                own_appearance = generate and value != "/Y" and is_winansi(value)
+                if generate and value != "/Y" and not own_appearance and template.fields.get(field_name):
+                    viewer_fields.append(field_name)
+                for ref in template.fields.get(field_name, ()):
+                    annot = pages[ref.page]["/Annots"][ref.annot]
+                    if value == "/Y":
+                        # Checkbox ankreuzen (Annotation /AS + /V auf den „On“-State)
+                        if ref.on_state is not None:
+                            annot["/AS"] = pikepdf.Name(ref.on_state)
+                            annot["/V"]  = pikepdf.Name(ref.on_state)
                     else:
-                        try:
-                            selected = str(value).strip().lower() == str(choices[idx]).lower()
-                        except IndexError:
-                            print(slot)
-                            print(details)
-                    if selected:
-                        field_map[fn] = "/Y"
+                        annot["/V"] = pikepdf.String(value)
+                        if own_appearance:
+                            annot["/AP"] = pikepdf.Dictionary(
+                                N=pdf.make_indirect(_build_text_appearance(pdf, annot, value, font, default_da))
+                            )
+                        elif generate and "/AP" in annot:
+                            # alte (leere) Appearance der Vorlage verwerfen → Viewer erzeugt sie neu
+                            del annot["/AP"]
+
+            buffer = io.BytesIO()
+            if generate:
+                if viewer_fields:
+                    logger.warning(f"PDF-Felder {viewer_fields} enthalten Zeichen außerhalb von WinAnsi; "
+                                   f"sie bleiben interaktiv und werden vom Viewer dargestellt")
+                # Appearances liegen vor → Viewer muss nichts mehr erzeugen (außer für viewer_fields)
+                if "/NeedAppearances" in acro:
+                    del acro["/NeedAppearances"]
+                if appearance == "flatten":
+                    # Widgets ohne Appearance (leere Felder) zeichnen nichts → vorab entfernen;
+                    # Felder mit Nicht-WinAnsi-Werten bleiben als Widget erhalten
+                    keep_names = set(viewer_fields)
+                    def keep_widget(a):
+                        return "/AP" in a or str(a.get("/T", "")) in keep_names
+                    for page in pages:
+                        annots = page.get("/Annots")
+                        if annots is None:
+                            continue
+                        keep = [a for a in annots if a.get("/Subtype") != pikepdf.Name("/Widget") or keep_widget(a)]
+                        if len(keep) != len(annots):
+                            page["/Annots"] = pikepdf.Array(keep)
+                    acro["/Fields"] = pikepdf.Array([f for f in acro.get("/Fields", [])
+                                                     if keep_widget(f) or "/Kids" in f])
+                    form_defaults = {k: acro[k] for k in ("/DA", "/DR") if k in acro}
+                    pdf.flatten_annotations(mode="all")
+                    if viewer_fields and "/AcroForm" not in pdf.Root:
+                        # qpdf entfernt das AcroForm nach dem Flachlegen → für die übrigen Felder neu anlegen
+                        remaining = [a for page in pages for a in page.get("/Annots", [])
+                                     if a.get("/Subtype") == pikepdf.Name("/Widget")]
+                        acro = pdf.make_indirect(pikepdf.Dictionary(
+                            Fields=pikepdf.Array([a.get("/Parent", a) for a in remaining]), **{
+                                k[1:]: v for k, v in form_defaults.items()}))
+                        pdf.Root["/AcroForm"] = acro
+                if viewer_fields:
+                    acro["/NeedAppearances"] = True
+                pdf.save(buffer, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
             else:
-                # Text sammeln
-                if isinstance(targets, list):
-                    for fn in targets:
-                        text_accum.setdefault(fn,[]).append(value)
-                else:
-                    text_accum.setdefault(targets,[]).append(value)
-
-        # 2. Text flachlegen
-        for fn, vals in text_accum.items():
-            non_empty = [str(v) for v in vals if v]
-            field_map[fn] = ", ".join(non_empty)
-
-        # 3. PDF laden & Felder füllen
-        reader = PdfReader(self.template)
-        writer = PdfWriter()
-        for page in reader.pages:
-            writer.add_page(page)
-
-        # 3a) AcroForm-Objekt übernehmen
-        acro = reader.trailer["/Root"].get("/AcroForm")
-        if acro is not None:
-            writer._root_object[NameObject("/AcroForm")] = acro
-
-        # 3b) Feldwerte schreiben
-        for pg in writer.pages:
-            writer.update_page_form_field_values(pg, field_map)
-
-        # 4. NeedAppearances setzen
-        root = writer._root_object
-        acro = root.get("/AcroForm")
-        if acro is None:
-            acro = writer._add_object({})
-            root[NameObject("/AcroForm")] = acro
-        acro.update({ NameObject("/NeedAppearances"): BooleanObject(True) })
-
-        # 5. Zwischenspeichern
+                pdf.save(buffer)
+        return buffer.getvalue()
+
+    def fill(self, output_path: str, appearance: str = "viewer"):
+        """Fills the template and writes the result to output_path (see fill_bytes for appearance)."""
+        pdf_bytes = self.fill_bytes(appearance=appearance)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, "wb") as f:
-            writer.write(f)
-
-        # 6. Post-Processing mit pikepdf:
-        #    a) Widget-Hintergründe entfernen
-        #    b) Checkboxen setzten (Annotation /AS + /V auf den „On“-State)
-        with pikepdf.open(output_path, allow_overwriting_input=True) as pdf:
-            for page in pdf.pages:
-                # statt page.Annots oder [] jetzt:
-                for annot in page.get("/Annots", []):
-                    if annot.get("/Subtype") == pikepdf.Name("/Widget"):
-                        # a) Hintergrund & Rahmenfarbe löschen
-                        mk = annot.get("/MK")
-                        if mk is not None:
-                            if "/BG" in mk:    del mk["/BG"]
-                            if "/BC" in mk:    del mk["/BC"]
-
-                        # b) Checkbox ankreuzen
-                        field_name = annot.get("/T")
-                        if field_name and field_map.get(field_name) == "/Y":
-                            ap_dict = annot.get("/AP", {}).get("/N", {})
-                            for state in ap_dict.keys():
-                                if state != "/Off":
-                                    annot["/AS"] = pikepdf.Name(state)
-                                    annot["/V"]  = pikepdf.Name(state)
-                                    break
-
-            pdf.save(output_path)
+            f.write(pdf_bytes)
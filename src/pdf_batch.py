@@ -0,0 +1,251 @@
+"""
+pdf_batch.py — Batch-Erzeugung von PDFs aus archivierten Payloads
+
+Füllt viele Payloads im Format von save_responses_to_json (z. B. out/*.json) über einen
+Prozess-Pool. Jeder Worker parst jede PDF-Vorlage genau einmal (get_template) und kompiliert den
+Fill-Plan eines Formulars beim ersten Dokument dieses Formulars; ein fehlerhaftes Formular betrifft
+nur dessen Dokumente. Die Eingabe wird gestreamt: es sind höchstens window Pakete gleichzeitig
+unterwegs, Ergebnisse kommen in Eingabereihenfolge. Doppelte Dokument-IDs erhalten ein Suffix (-2, -3, …).
+IDs aus JSONL-Zeilen werden nur übernommen, wenn sie aus [A-Za-z0-9._-] bestehen (kein Pfad), sonst
+line-NNNNNN; Zeilen, die kein JSON-Objekt sind, werden zu Fehlern des jeweiligen Dokuments.
+
+CLI:
+    python -m src.pdf_batch out/ regenerated/ --workers 4
+    python -m src.pdf_batch payloads.jsonl regenerated/
+    cat payloads.jsonl | python -m src.pdf_batch - regenerated/
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from .pdf_backend import APPEARANCE_MODES, FillPlan, GenericPdfFiller, compile_fill_plan
+
+DEFAULT_FORMS_PATH = Path(__file__).resolve().parents[1] / "forms" / "ge"
+
+# Je Worker-Prozess: Formularverzeichnis und lazy kompilierte Fill-Pläne (form_type -> Plan oder Fehler)
+_WORKER_FORMS_PATH: Optional[str] = None
+_WORKER_PLANS: Dict[str, Union[FillPlan, Exception, None]] = {}
+
+# Dokument-IDs und Formularnamen landen in Dateipfaden: keine Trenner, kein führender Punkt
+_SAFE_NAME_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]{0,127}")
+
+
+def is_safe_name(name: str) -> bool:
+    return bool(_SAFE_NAME_RE.fullmatch(name))
+
+
+@dataclass
+class BatchResult:
+    """Summary of one batch run."""
+    succeeded: int = 0
+    failures: List[Tuple[str, str]] = field(default_factory=list)  # (Dokument-ID, Fehlermeldung)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)   # (doppelte ID, vergebene ID)
+    elapsed: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.succeeded + len(self.failures)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def iter_payloads(source: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (doc_id, item) pairs from a directory of *.json payloads, a JSONL file or "-" (JSONL on stdin).
+    For directories the item is the file path (read in the worker), for JSONL the parsed payload.
+    """
+    if source != "-" and os.path.isdir(source):
+        for path in sorted(Path(source).glob("*.json")):
+            yield path.stem, str(path)
+        return
+
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield f"line-{line_no:06d}", exc
+                continue
+            if not isinstance(payload, dict):
+                yield f"line-{line_no:06d}", ValueError(f"Zeile {line_no}: kein JSON-Objekt ({type(payload).__name__})")
+                continue
+            doc_id = str(payload.get("id") or "")
+            yield (doc_id if is_safe_name(doc_id) else f"line-{line_no:06d}"), payload
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def unique_ids(items: Iterator[Tuple[str, Any]], renamed: Optional[List[Tuple[str, str]]] = None
+               ) -> Iterator[Tuple[str, Any]]:
+    """Makes doc_ids unique by appending -2, -3, … (renamings are appended to `renamed`)."""
+    seen = set()
+    for doc_id, item in items:
+        unique, n = doc_id, 1
+        while unique in seen:
+            n += 1
+            unique = f"{doc_id}-{n}"
+        seen.add(unique)
+        if unique != doc_id and renamed is not None:
+            renamed.append((doc_id, unique))
+        yield unique, item
+
+
+def _init_worker(forms_path: Optional[str]) -> None:
+    """Only remembers the forms directory; plans are compiled per form on first use (_plan_for)."""
+    global _WORKER_FORMS_PATH
+    _WORKER_FORMS_PATH = forms_path
+    _WORKER_PLANS.clear()
+
+
+def _plan_for(form_type: Optional[str]) -> Optional[FillPlan]:
+    """Fill plan of form_type, compiled once per worker; raises the form's error for each of its documents."""
+    if not form_type or not _WORKER_FORMS_PATH:
+        return None
+    if not is_safe_name(str(form_type)):
+        raise ValueError(f"Ungültiger Formularname: {form_type!r}")
+    if form_type not in _WORKER_PLANS:
+        path = os.path.join(_WORKER_FORMS_PATH, f"{form_type}.json")
+        try:
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    _WORKER_PLANS[form_type] = compile_fill_plan(json.load(f))
+            else:
+                _WORKER_PLANS[form_type] = None
+        except Exception as exc:
+            _WORKER_PLANS[form_type] = RuntimeError(f"Formular '{form_type}': {type(exc).__name__}: {exc}")
+    plan = _WORKER_PLANS[form_type]
+    if isinstance(plan, Exception):
+        raise plan
+    return plan
+
+
+def _fill_one(job: Tuple[str, Any, str, str]) -> Tuple[str, Optional[str]]:
+    """Fills one payload and writes <doc_id>.pdf; returns (doc_id, error or None)."""
+    doc_id, item, output_dir, appearance = job
+    try:
+        if isinstance(item, Exception):
+            raise item
+        if isinstance(item, str):
+            with open(item, "r", encoding="utf-8") as f:
+                item = json.load(f)
+        if not isinstance(item, dict):
+            raise ValueError(f"kein JSON-Objekt ({type(item).__name__})")
+        plan = _plan_for(item.get("form_type"))
+        if plan is not None and plan.pdf_file != item.get("pdf_file"):
+            plan = None
+        pdf_bytes = GenericPdfFiller(payload=item, plan=plan).fill_bytes(appearance=appearance)
+        with open(os.path.join(output_dir, f"{doc_id}.pdf"), "wb") as f:
+            f.write(pdf_bytes)
+        return doc_id, None
+    except Exception as exc:
+        return doc_id, f"{type(exc).__name__}: {exc}"
+
+
+def _fill_chunk(jobs: List[Tuple[str, Any, str, str]]) -> List[Tuple[str, Optional[str]]]:
+    return [_fill_one(job) for job in jobs]
+
+
+def iter_fill_batch(
+    source: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    forms_path: Optional[str] = str(DEFAULT_FORMS_PATH),
+    chunksize: int = 8,
+    appearance: str = "viewer",
+    window: Optional[int] = None,
+    renamed: Optional[List[Tuple[str, str]]] = None,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Streams (doc_id, error or None) in input order. At most `window` chunks of `chunksize` payloads
+    (default: 2 per worker) are submitted at a time, so the source is read only as fast as PDFs are filled.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+    jobs = ((doc_id, item, output_dir, appearance)
+            for doc_id, item in unique_ids(iter_payloads(source), renamed))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(forms_path,)) as pool:
+        pending: Deque[Future] = deque()
+        while True:
+            while len(pending) < window:
+                chunk = list(islice(jobs, chunksize))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_fill_chunk, chunk))
+            if not pending:
+                break
+            yield from pending.popleft().result()
+
+
+def fill_batch(
+    source: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    forms_path: Optional[str] = str(DEFAULT_FORMS_PATH),
+    chunksize: int = 8,
+    appearance: str = "viewer",
+    window: Optional[int] = None,
+) -> BatchResult:
+    """
+    Fills all payloads from source (see iter_payloads) into output_dir using a process pool.
+    Failures are collected per document instead of aborting the batch.
+    """
+    result = BatchResult()
+    start = time.perf_counter()
+
+    for doc_id, error in iter_fill_batch(source, output_dir, workers=workers, forms_path=forms_path,
+                                         chunksize=chunksize, appearance=appearance, window=window,
+                                         renamed=result.renamed):
+        if error is None:
+            result.succeeded += 1
+        else:
+            result.failures.append((doc_id, error))
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Füllt archivierte Formular-Payloads als PDFs (Batch).")
+    parser.add_argument("source", help="Verzeichnis mit *.json, JSONL-Datei oder '-' für JSONL auf stdin")
+    parser.add_argument("output_dir", help="Zielverzeichnis für die PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Worker-Prozesse (Default: CPU-Anzahl)")
+    parser.add_argument("--forms-path", default=str(DEFAULT_FORMS_PATH), help="Formular-JSONs für die Fill-Pläne")
+    parser.add_argument("--chunksize", type=int, default=8, help="Payloads pro Worker-Auftrag")
+    parser.add_argument("--appearance", choices=APPEARANCE_MODES, default="viewer",
+                        help="viewer: NeedAppearances, generate: eigene Appearance-Streams, flatten: Felder einbrennen")
+    args = parser.parse_args(argv)
+
+    result = fill_batch(args.source, args.output_dir, workers=args.workers,
+                        forms_path=args.forms_path, chunksize=args.chunksize,
+                        appearance=args.appearance)
+
+    print(f"{result.succeeded}/{result.total} PDFs erzeugt in {result.elapsed:.2f}s "
+          f"({result.docs_per_second:.1f} Dokumente/s)")
+    for doc_id, unique in result.renamed:
+        print(f"HINWEIS doppelte ID {doc_id}: gespeichert als {unique}.pdf", file=sys.stderr)
+    for doc_id, error in result.failures:
+        print(f"FEHLER {doc_id}: {error}", file=sys.stderr)
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
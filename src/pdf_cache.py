@@ -0,0 +1,98 @@
+"""
+pdf_cache.py — Inhaltsadressierter Cache für erzeugte PDFs
+
+Schlüssel ist ein Hash über (Digest der PDF-Vorlage, Formular, kanonische Antworten,
+Appearance-Modus). Identische Anfragen (z. B. erneuter Download nach einem Rerun oder nach
+verlorenem st.session_state) werden ohne Füll-Arbeit aus dem Speicher bzw. aus dem
+ArtifactStore (out/) bedient.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .artifact_store import ARTIFACT_STORE, ArtifactStore
+from .pdf_backend import FillPlan, GenericPdfFiller, get_template
+
+
+def canonical_json(data: Any) -> str:
+    """Deterministic JSON representation (sorted keys, no whitespace)."""
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class PdfCache:
+    """
+    Two-tier cache for filled PDFs: a bounded in-memory LRU in front of an ArtifactStore,
+    which stores the PDF as artifact <key>.pdf and applies its own age/size eviction.
+    """
+    def __init__(self, store: Optional[ArtifactStore] = ARTIFACT_STORE, max_memory_items: int = 64):
+        self.store = store
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(payload: Dict[str, Any], appearance: str = "viewer") -> str:
+        """
+        Content key of a payload in the save_responses_to_json format. The session language
+        ("lang") is deliberately not part of the key: the filled PDF does not depend on it, since
+        answers are stored in German (text answers translated before validation, choices mapped
+        to the German labels) and GenericPdfFiller only reads data, form_type and pdf_file.
+        """
+        template = get_template(payload["pdf_file"])
+        material = "\n".join([
+            template.digest,
+            str(payload.get("form_type")),
+            appearance,
+            canonical_json(payload.get("data", {})),
+        ])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self.store.get(key, "pdf") if self.store is not None else None
+        if data is not None:
+            self._remember(key, data)
+            with self._lock:
+                self.hits += 1
+            return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        if self.store is not None:
+            self.store.put(key, "pdf", data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def get_or_fill(self, payload: Dict[str, Any], plan: Optional[FillPlan] = None,
+                    appearance: str = "viewer", key: Optional[str] = None) -> bytes:
+        """Returns the cached PDF for payload or fills, stores and returns it."""
+        key = key or self.key_for(payload, appearance)
+        data = self.get(key)
+        if data is None:
+            data = GenericPdfFiller(payload=payload, plan=plan).fill_bytes(appearance=appearance)
+            self.put(key, data)
+        return data
+
+
+# Prozessweiter Cache
+PDF_CACHE = PdfCache()
@@ -0,0 +1,200 @@
+"""
+permit_index.py — Lokaler Suchindex über data/jobs_which_need_permit.txt
+
+Die Liste erlaubnis-/anzeigepflichtiger Tätigkeiten wird einmal in Einträge (Bezeichnung +
+Regelungs-/Behördenzeilen) zerlegt und über Zeichen-N-Gramme der Bezeichnungen mit TF-IDF indiziert.
+check_if_permit_is_required sucht damit lokal wenige Kandidaten: Ist der beste Treffer sicher genug
+(PERMIT_CONFIDENT_SCORE), bekommt das LLM einen kleinen Prompt mit ausschließlich diesen Kandidaten,
+sonst die komplette Liste. Eine "nicht erlaubnispflichtig"-Antwort fällt nie lokal, damit Lücken der
+Suche (fehlende Synonyme, Umschreibungen) nicht zu falschen Rechtsauskünften werden.
+
+Recall der Vorauswahl: tests/test_permit_index.py mit dem Evaluationsset tests/data/permit_eval.json
+"""
+
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .llm_cache import env_float
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PERMIT_LIST = ROOT / "data" / "jobs_which_need_permit.txt"
+# Mindestähnlichkeit (Kosinus), ab der ein Eintrag als plausibler Kandidat gilt
+PERMIT_MIN_SCORE = env_float("PERMIT_MIN_SCORE", 0.3)
+# Mindestscore des besten Treffers, ab dem nur die Kandidaten (statt der ganzen Liste) ans LLM gehen
+PERMIT_CONFIDENT_SCORE = env_float("PERMIT_CONFIDENT_SCORE", 0.5)
+
+# Zeilen, mit denen die Regelung zu einer Tätigkeit beginnt (die Zeile davor ist die Bezeichnung)
+_REGULATION_RE = re.compile(
+    r"^(Erlaubnis(?!behörde)|Anzeigepflicht|Genehmigung|Zulassung|Reisegewerbekarte|öffentliche Bestellung|Deponie)"
+)
+
+# Beim PDF-Export verlorene Bezeichnungsteile
+_TITLE_FIXES = {
+    "und Holzspielzeugmacher (Handwerk)": "Drechsler (Elfenbeinschnitzer) und Holzspielzeugmacher (Handwerk)",
+    "(Versicherungsvertreter + Versicherungsberater)":
+        "Versicherungsvermittler (Versicherungsvertreter + Versicherungsberater)",
+}
+# Kategorie-Zusatz, der nicht in den Index eingeht
+_CATEGORY_RE = re.compile(r"\((zulassungsfreies )?Handwerk(sähnliche Gewerbe)?\)")
+# Allgemeine Wörter aus Tätigkeitsbeschreibungen, die sonst beliebige Einträge treffen
+_GENERIC_WORDS = frozenset({
+    "und", "mit", "von", "der", "die", "das", "im", "in", "fur", "aller", "art", "sowie", "online",
+    "handel", "verkauf", "vertrieb", "herstellung", "unternehmen", "betrieb", "gewerbe", "service",
+    "dienstleistung", "dienstleistungen", "beratung", "arbeiten",
+})
+
+# Umgangssprachliche Begriffe -> Bezeichnungen aus der Liste (Suchanfrage wird damit ergänzt)
+QUERY_SYNONYMS = {
+    "sanitar": "klempner", "installateur": "klempner", "heizung": "ofen luftheizungsbauer",
+    "restaurant": "gaststattenbetrieb", "kneipe": "gaststattenbetrieb", "bar": "gaststattenbetrieb",
+    "cafe": "gaststattenbetrieb", "imbiss": "gaststattenbetrieb", "alkohol": "gaststattenbetrieb",
+    "pizzeria": "gaststattenbetrieb", "gastronomie": "gaststattenbetrieb", "catering": "gaststattenbetrieb",
+    "reinigung": "gebaudereiniger textilreiniger",
+    "taxi": "personenbeforderung", "security": "bewachungsgewerbe", "sicherheitsdienst": "bewachungsgewerbe",
+    "makler": "immobilienmakler", "versicherung": "versicherungsvertreter versicherungsberater",
+    "pflegedienst": "altenpflege", "spedition": "guterfern nahverkehr", "umzug": "guterfern nahverkehr",
+    "kfz": "kraftfahrzeugtechniker", "autowerkstatt": "kraftfahrzeugtechniker", "friseur": "friseure",
+    "kosmetik": "kosmetiker", "zeitarbeit": "arbeitnehmeruberlassung", "leiharbeit": "arbeitnehmeruberlassung",
+    "backerei": "backer", "metzgerei": "fleischer", "metzger": "fleischer", "schreiner": "tischler",
+    "elektriker": "elektrotechniker", "waffen": "waffenherstellung", "bestatter": "bestattungsgewerbe",
+}
+
+
+@dataclass(frozen=True)
+class PermitEntry:
+    title: str
+    details: Tuple[str, ...]
+
+    @property
+    def text(self) -> str:
+        return "\n".join((self.title,) + self.details)
+
+
+def _fold(text: str) -> str:
+    """Lowercase, diacritics removed (ä -> a), punctuation to spaces."""
+    text = unicodedata.normalize("NFKD", (text or "").lower().replace("ß", "ss"))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", text)).strip()
+
+
+def _ngrams(text: str, sizes: Tuple[int, ...] = (3, 4)) -> Counter:
+    grams: Counter = Counter()
+    for word in _fold(text).split():
+        padded = f" {word} "
+        for n in sizes:
+            grams.update(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return grams
+
+
+def _query_words(text: str) -> List[str]:
+    """Folded query words without generic words; generic compound tails are cut (Malerarbeiten -> maler)."""
+    words = []
+    for word in _fold(text).split():
+        for tail in _GENERIC_WORDS:
+            if len(word) > len(tail) + 2 and word.endswith(tail):
+                word = word[:-len(tail)]
+                word = word[:-1] if word.endswith("s") and word[:-1] in _GENERIC_WORDS else word
+                break
+        if word not in _GENERIC_WORDS:
+            words.append(word)
+    return words
+
+
+def parse_permit_list(text: str) -> List[PermitEntry]:
+    """Splits the permit list into entries: title line followed by its regulation/authority lines."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    starts: List[Tuple[int, str]] = []
+    for i, line in enumerate(lines):
+        if i == 0 or not _REGULATION_RE.match(line) or _REGULATION_RE.match(lines[i - 1]):
+            continue
+        first = i - 1
+        # "(Handwerk)" in eigener Zeile gehört zur Bezeichnung davor
+        if lines[first].startswith("(") and lines[first].endswith("Handwerk)") and first > 0:
+            first -= 1
+        starts.append(first)
+
+    entries = []
+    for k, first in enumerate(starts):
+        end = starts[k + 1] if k + 1 < len(starts) else len(lines)
+        head = 2 if lines[first + 1].startswith("(") and lines[first + 1].endswith("Handwerk)") else 1
+        title = " ".join(lines[first:first + head])
+        entries.append(PermitEntry(title=_TITLE_FIXES.get(title, title), details=tuple(lines[first + head:end])))
+    return entries
+
+
+class PermitIndex:
+    """Character n-gram TF-IDF index over the entry titles (without the "(Handwerk)" category suffix)."""
+
+    def __init__(self, entries: List[PermitEntry]):
+        self.entries = entries
+        docs = [_ngrams(_CATEGORY_RE.sub(" ", e.title)) for e in entries]
+        df: Counter = Counter()
+        for doc in docs:
+            df.update(doc.keys())
+        n = len(docs)
+        self._idf: Dict[str, float] = {g: math.log((1 + n) / (1 + c)) + 1.0 for g, c in df.items()}
+        self._vectors = [self._weigh(doc) for doc in docs]
+
+    def _weigh(self, grams: Counter) -> Tuple[Dict[str, float], float]:
+        vec = {g: (1 + math.log(c)) * self._idf[g] for g, c in grams.items() if g in self._idf}
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        return vec, norm
+
+    def search(self, query: str, top_k: int = 5,
+               min_score: Optional[float] = None) -> List[Tuple[PermitEntry, float]]:
+        """Entries whose title is similar to the query (cosine similarity >= min_score), best first."""
+        min_score = PERMIT_MIN_SCORE if min_score is None else min_score
+        words = _query_words(query)
+        extra = [syn for word, syn in QUERY_SYNONYMS.items() if any(w.startswith(word) for w in words)]
+        qvec, qnorm = self._weigh(_ngrams(" ".join(words + extra)))
+        if not qnorm:
+            return []
+        scored = []
+        for entry, (vec, norm) in zip(self.entries, self._vectors):
+            if not norm:
+                continue
+            dot = sum(w * vec[g] for g, w in qvec.items() if g in vec)
+            score = dot / (qnorm * norm)
+            if score >= min_score:
+                scored.append((entry, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:top_k]
+
+    def shortlist(self, query: str, top_k: int = 5,
+                  confident_score: Optional[float] = None) -> Optional[List[PermitEntry]]:
+        """
+        Candidate entries for a small LLM prompt, or None if the best match is below
+        confident_score; the caller then has to check against the full list (full_text).
+        """
+        confident_score = PERMIT_CONFIDENT_SCORE if confident_score is None else confident_score
+        candidates = self.search(query, top_k=top_k)
+        if not candidates or candidates[0][1] < confident_score:
+            return None
+        return [entry for entry, _ in candidates]
+
+    @property
+    def full_text(self) -> str:
+        return "\n\n".join(entry.text for entry in self.entries)
+
+
+_INDEXES: Dict[Tuple[str, int], PermitIndex] = {}
+_LOCK = threading.Lock()
+
+
+def get_permit_index(path: Optional[str] = None) -> PermitIndex:
+    """Parses and indexes the permit list once per (path, mtime)."""
+    path = str(path or DEFAULT_PERMIT_LIST)
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            with open(path, "r", encoding="utf-8") as f:
+                index = _INDEXES[key] = PermitIndex(parse_permit_list(f.read()))
+    return index
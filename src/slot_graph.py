@@ -0,0 +1,217 @@
+"""
+slot_graph.py — Kompilierter Abhängigkeitsgraph der Slots eines Formulars
+
+load_forms übersetzt die "condition"-Angaben der Slots einmalig in einen SlotGraph:
+  - Position je Slot-Name, Abhängigkeit (Slot, von dem die Bedingung abhängt) und ein
+    vorkompiliertes Prädikat pro bedingtem Slot,
+  - Slot -> abhängige Slots (transitiv, in Formularreihenfolge).
+
+next_slot_index wertet damit nur noch Prädikate aus, statt die Bedingungen bei jedem Aufruf neu zu
+interpretieren. Je Sitzung führt state["open_slots"] die noch offenen Positionen als sortierte Liste;
+next_open springt per Bisektion zu state["idx"] und entfernt beantwortete/gesperrte Slots dauerhaft.
+Ändert sich eine Antwort (set_response), werden nur die abhängigen Slots neu bewertet:
+  - Slots, deren Bedingung nicht mehr gilt, werden gesperrt; eine vorhandene Antwort wird dabei in
+    state["stashed_responses"] aufbewahrt und im Ergebnis (ResponseChange.locked) gemeldet,
+  - gilt die Bedingung wieder, wird die aufbewahrte Antwort wiederhergestellt (restored), sonst wird
+    der Slot wieder geöffnet (reopened) und state["idx"] bei Bedarf zurückgesetzt.
+Bedingungen, die auf einen unbekannten oder erst später definierten Slot verweisen, werden beim
+Laden erkannt (invalid_conditions). Der Graph hängt an der Slot-Liste des Formulars (SlotList).
+"""
+
+import hashlib
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+Predicate = Callable[[Any], bool]
+
+
+def compile_condition(cond: Dict[str, Any]) -> Predicate:
+    """Predicate over the value of the referenced slot ("not empty", list membership or equality)."""
+    expected = cond["slot_value"]
+    if expected == "not empty":
+        return bool
+    if isinstance(expected, list):
+        allowed = tuple(expected)
+        return lambda value: value in allowed
+    return lambda value: value == expected
+
+
+def is_answered(entry: Optional[Dict[str, Any]]) -> bool:
+    """True if a response is filled or locked by an unmet condition."""
+    if not entry:
+        return False
+    if entry.get("locked"):
+        return True
+    return entry.get("value") not in (None, "", [], {})
+
+
+@dataclass(frozen=True)
+class ResponseChange:
+    """Dependent slots affected by set_response (slot names in form order)."""
+    locked: Tuple[str, ...] = ()     # bisher beantwortet, Bedingung gilt nicht mehr (Antwort aufbewahrt)
+    restored: Tuple[str, ...] = ()   # Bedingung gilt wieder, aufbewahrte Antwort zurückgeholt
+    reopened: Tuple[str, ...] = ()   # Bedingung gilt wieder, Slot muss (erneut) gefragt werden
+
+
+@dataclass(frozen=True)
+class SlotGraph:
+    """
+    Immutable dependency graph of one form, compiled once by load_forms.
+    invalid_conditions lists (slot_name, referenced_slot) pairs whose reference is unknown or not defined earlier.
+    """
+    slots: List[Dict[str, Any]]
+    positions: Mapping[str, int]
+    depends_on: Tuple[Optional[str], ...]
+    predicates: Tuple[Optional[Predicate], ...]
+    dependents: Mapping[str, Tuple[int, ...]]
+    invalid_conditions: Tuple[Tuple[str, str], ...]
+    key: str = ""   # Kennung der Slot-Liste, damit state["open_slots"] nicht formularübergreifend gilt
+
+    def _lock(self, responses: Dict[str, Any], pos: int) -> None:
+        slot_def = self.slots[pos]
+        responses[slot_def["slot_name"]] = {
+            "value": "",
+            "target_filed_name": slot_def.get("filed_name"),
+            "locked": True
+        }
+
+    def _open_slots(self, state: Dict[str, Any]) -> List[int]:
+        """Sorted positions not yet known to be answered (created per session and form)."""
+        open_slots = state.get("open_slots")
+        if not open_slots or open_slots.get("form") != self.key:
+            open_slots = state["open_slots"] = {"form": self.key, "positions": list(range(len(self.slots)))}
+        return open_slots["positions"]
+
+    def next_open(self, state: Dict[str, Any]) -> Optional[int]:
+        """
+        Index of the next slot to ask, starting at state["idx"]. Slots whose condition is not met are
+        soft-skipped (locked with an empty value), like the former linear next_slot_index.
+        Answered and locked slots leave the open list for good (responses written directly, e.g. by
+        the wizards, are picked up here as well).
+        """
+        start_idx = int(state.get("idx", 0) or 0)
+        responses = state.setdefault("responses", {})
+        positions = self._open_slots(state)
+        i = bisect_left(positions, start_idx)
+        while i < len(positions):
+            pos = positions[i]
+            if is_answered(responses.get(self.slots[pos]["slot_name"])):
+                del positions[i]
+                continue
+            predicate = self.predicates[pos]
+            if predicate is not None:
+                dep_entry = responses.get(self.depends_on[pos])
+                assert dep_entry is not None, \
+                    "The slot on which a slot is conditioned needs to be asked first!"
+                if not predicate(dep_entry.get("value")):
+                    self._lock(responses, pos)
+                    del positions[i]
+                    continue
+            return pos
+        return None
+
+    def set_response(self, state: Dict[str, Any], slot_name: str, entry: Dict[str, Any]) -> ResponseChange:
+        """
+        Stores a response and re-evaluates only the slots depending on it: slots whose condition no longer
+        holds are locked (an existing answer is stashed), previously locked slots whose condition holds
+        again get their stashed answer back or are reopened.
+        """
+        responses = state.setdefault("responses", {})
+        stashed = state.setdefault("stashed_responses", {})
+        previous = responses.get(slot_name)
+        responses[slot_name] = entry
+        if previous == entry:
+            return ResponseChange()
+        positions = self._open_slots(state)
+        locked, restored, reopened = [], [], []
+        for pos in self.dependents.get(slot_name, ()):
+            dep_entry = responses.get(self.depends_on[pos])
+            if dep_entry is None:
+                continue
+            name = self.slots[pos]["slot_name"]
+            current = responses.get(name)
+            if not self.predicates[pos](dep_entry.get("value")):
+                if current is not None and not current.get("locked") and is_answered(current):
+                    stashed[name] = current
+                    locked.append(name)
+                if current is None or not current.get("locked"):
+                    self._lock(responses, pos)
+            elif current is not None and current.get("locked"):
+                if name in stashed:
+                    responses[name] = stashed.pop(name)
+                    restored.append(name)
+                else:
+                    del responses[name]
+                    reopened.append(name)
+                    i = bisect_left(positions, pos)
+                    if i == len(positions) or positions[i] != pos:
+                        insort(positions, pos)
+        if reopened:
+            first = self.positions[reopened[0]]
+            if first < int(state.get("idx", 0) or 0):
+                state["idx"] = first
+        return ResponseChange(tuple(locked), tuple(restored), tuple(reopened))
+
+
+def compile_slot_graph(slots: List[Dict[str, Any]]) -> SlotGraph:
+    """Compiles the slot conditions of a form into a SlotGraph."""
+    positions: Dict[str, int] = {}
+    depends_on: List[Optional[str]] = []
+    predicates: List[Optional[Predicate]] = []
+    direct: Dict[str, List[int]] = {}
+    invalid: List[Tuple[str, str]] = []
+    for pos, slot_def in enumerate(slots):
+        cond = slot_def.get("condition")
+        dep = cond.get("slot_name") if cond else None
+        if cond and dep not in positions:
+            # Bedingung auf unbekannten oder später definierten Slot
+            invalid.append((slot_def["slot_name"], str(dep)))
+        depends_on.append(dep)
+        predicates.append(compile_condition(cond) if cond else None)
+        if dep is not None:
+            direct.setdefault(dep, []).append(pos)
+        positions[slot_def["slot_name"]] = pos
+
+    # transitive Hülle: a -> b -> c  =>  a beeinflusst b und c
+    dependents: Dict[str, Tuple[int, ...]] = {}
+    for name in direct:
+        seen, stack = set(), list(direct[name])
+        while stack:
+            pos = stack.pop()
+            if pos in seen:
+                continue
+            seen.add(pos)
+            stack.extend(direct.get(slots[pos]["slot_name"], ()))
+        dependents[name] = tuple(sorted(seen))
+
+    names = "\n".join(slot_def["slot_name"] for slot_def in slots)
+    return SlotGraph(
+        slots=slots,
+        positions=MappingProxyType(positions),
+        depends_on=tuple(depends_on),
+        predicates=tuple(predicates),
+        dependents=MappingProxyType(dependents),
+        invalid_conditions=tuple(invalid),
+        key=hashlib.sha1(names.encode("utf-8")).hexdigest()[:12],
+    )
+
+
+class SlotList(list):
+    """Slot list of a loaded form that carries its compiled SlotGraph (set by graph_for)."""
+    graph: Optional[SlotGraph] = None
+
+
+def graph_for(slots: List[Dict[str, Any]]) -> SlotGraph:
+    """
+    Compiled graph for a slot list. For a SlotList (as created by load_forms) the graph is attached to
+    the list and lives exactly as long as the form; plain lists are compiled on every call.
+    """
+    graph = getattr(slots, "graph", None)
+    if graph is not None and graph.slots is slots:
+        return graph
+    graph = compile_slot_graph(slots)
+    if isinstance(slots, SlotList):
+        slots.graph = graph
+    return graph
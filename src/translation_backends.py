@@ -0,0 +1,219 @@
+"""
+translation_backends.py — Austauschbare Übersetzungs-Backends für translator.py
+
+Backends:
+    openai  – gehostetes Modell über die Responses API (Default, gpt-4.1-mini)
+    local   – lokal betriebenes Modell am Endpoint LLM_ENDPOINT (gleiches Request-Format wie
+              LLMValidatorService.validate_locally: {"prompt", "max_tokens", "temperature"} -> {"content"})
+
+Routing je Sprache über Umgebungsvariablen:
+    TRANSLATION_ROUTES="en=local,tr=local,ar=local"   # nicht genannte Sprachen -> TRANSLATION_DEFAULT_BACKEND
+    TRANSLATION_DEFAULT_BACKEND="openai"
+Weitere Backends können mit register_backend(name, factory) ergänzt werden.
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+from openai import OpenAI
+from pydantic import BaseModel
+
+from .openai_clients import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+LLM_ENDPOINT = os.getenv("LLM_ENDPOINT", "http://localhost:8080/completion")
+
+_RULES = (
+    "- Keep placeholders and variables exactly as-is: {like_this}, {{like_this}}, <TAGS>, $VARS, %(fmt)s.\n"
+    "- Do not translate URLs, emails, codes, or content inside {{double braces}}.\n"
+    "- Do not translate legal/corporate terms such as GmbH, AG, UG, OHG, KG, e.K., mbH.\n"
+    "- Preserve punctuation, line breaks, and Markdown.\n"
+)
+
+
+def system_prompt(source_lang: str, target_lang: str) -> str:
+    """Translator instructions for one direction (one side is always German)."""
+    if source_lang == "de":
+        return (
+            "You are a precise translator. Translate from German into the target language.\n"
+            f"- Target language (ISO 639-1): {target_lang}\n"
+            + _RULES +
+            "- Style: concise, polite, clear."
+        )
+    return (
+        "You are a precise translator. Translate into **German** from the given source language.\n"
+        f"- Source language (ISO 639-1): {source_lang}\n"
+        + _RULES +
+        "- Style: concise, polite, clear German."
+    )
+
+
+class TranslationBackend(ABC):
+    """Base class; `cache_id` identifies the backend/model in the translation memory."""
+    name = "base"
+
+    @property
+    def cache_id(self) -> str:
+        return self.name
+
+    @abstractmethod
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Translates one text."""
+
+    def translate_many(self, texts: Sequence[str], source_lang: str, target_lang: str) -> List[str]:
+        """Default: one translate() round trip per text; backends override this to batch."""
+        return [self.translate(text, source_lang, target_lang) for text in texts]
+
+
+class _TranslationBatch(BaseModel):
+    translations: List[str]
+
+
+class OpenAITranslationBackend(TranslationBackend):
+    name = "openai"
+
+    def __init__(self, model: str = DEFAULT_MODEL, client: Optional[OpenAI] = None):
+        self.model = model
+        self.client = client
+
+    @property
+    def cache_id(self) -> str:
+        return self.model
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        client = self.client or get_openai_client()
+        resp = client.responses.create(
+            model=self.model,
+            input=[
+                {"role": "system", "content": [{"type": "input_text", "text": system_prompt(source_lang, target_lang)}]},
+                {"role": "user",   "content": [{"type": "input_text", "text": text}]},
+            ],
+            temperature=0.0
+        )
+        return (resp.output_text or "").strip()
+
+    def translate_many(self, texts: Sequence[str], source_lang: str, target_lang: str) -> List[str]:
+        """One structured-output request for all texts; falls back to single requests on a count mismatch."""
+        if len(texts) <= 1:
+            return [self.translate(text, source_lang, target_lang) for text in texts]
+        client = self.client or get_openai_client()
+        resp = client.responses.parse(
+            model=self.model,
+            input=[
+                {"role": "system", "content": system_prompt(source_lang, target_lang)
+                    + "\n- The input is a JSON array: return exactly one translation per text, in the same order."},
+                {"role": "user", "content": json.dumps(list(texts), ensure_ascii=False)},
+            ],
+            text_format=_TranslationBatch,
+            temperature=0.0
+        )
+        parsed = resp.output_parsed
+        if parsed is not None and len(parsed.translations) == len(texts):
+            return [t.strip() for t in parsed.translations]
+        return super().translate_many(texts, source_lang, target_lang)
+
+
+class LocalTranslationBackend(TranslationBackend):
+    name = "local"
+
+    def __init__(self, endpoint: str, max_tokens: int = 1024, temperature: float = 0.0, timeout: int = 30):
+        self.endpoint = endpoint
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = timeout
+
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        resp = requests.post(
+            self.endpoint,
+            json={"prompt": prompt, "max_tokens": max_tokens, "temperature": self.temperature},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return (resp.json().get("content") or "").strip()
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        prompt = f"{system_prompt(source_lang, target_lang)}\n\nText:\n{text}\n\nTranslation:\n"
+        return self._complete(prompt, self.max_tokens)
+
+    def translate_many(self, texts: Sequence[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        One completion for all texts (JSON array in, JSON array out); falls back to single requests
+        if the answer is no JSON array of the same length.
+        """
+        if len(texts) <= 1:
+            return [self.translate(text, source_lang, target_lang) for text in texts]
+        prompt = (
+            f"{system_prompt(source_lang, target_lang)}\n"
+            "- The input is a JSON array: answer with a JSON array of strings only, "
+            "exactly one translation per text, in the same order.\n\n"
+            f"Texts:\n{json.dumps(list(texts), ensure_ascii=False)}\n\nTranslations:\n"
+        )
+        translations = parse_json_array(self._complete(prompt, self.max_tokens * len(texts)))
+        if translations is not None and len(translations) == len(texts):
+            return [t.strip() for t in translations]
+        logger.info(f"Local batch translation unusable for {len(texts)} texts, translating one by one")
+        return super().translate_many(texts, source_lang, target_lang)
+
+
+def parse_json_array(content: str) -> Optional[List[str]]:
+    """The first JSON array of strings in a completion (tolerates code fences and surrounding text)."""
+    start, end = content.find("["), content.rfind("]")
+    if start < 0 or end < start:
+        return None
+    try:
+        value = json.loads(content[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        return None
+    return value
+
+
+# name -> Factory(model, client) ; lokale Backends ignorieren model/client
+_FACTORIES: Dict[str, Callable[[str, Optional[OpenAI]], Optional[TranslationBackend]]] = {
+    "openai": lambda model, client: OpenAITranslationBackend(model=model, client=client),
+    "local": lambda model, client: LocalTranslationBackend(LLM_ENDPOINT),
+}
+
+
+def register_backend(name: str, factory: Callable[[str, Optional[OpenAI]], Optional[TranslationBackend]]) -> None:
+    """Registers an additional backend usable in TRANSLATION_ROUTES / TRANSLATION_DEFAULT_BACKEND."""
+    _FACTORIES[name] = factory
+
+
+def parse_routes(spec: str) -> Dict[str, str]:
+    """'en=local, tr=local' -> {'en': 'local', 'tr': 'local'}"""
+    routes = {}
+    for part in spec.split(","):
+        if "=" in part:
+            lang, backend = part.split("=", 1)
+            routes[lang.strip().lower()] = backend.strip()
+    return routes
+
+
+TRANSLATION_ROUTES = parse_routes(os.getenv("TRANSLATION_ROUTES", ""))
+TRANSLATION_DEFAULT_BACKEND = os.getenv("TRANSLATION_DEFAULT_BACKEND", "openai")
+_WARNED: set = set()
+
+
+def backend_for(lang: str, client: Optional[OpenAI] = None, model: str = DEFAULT_MODEL) -> TranslationBackend:
+    """
+    Backend for the non-German side `lang`. An explicitly passed OpenAI client always selects the
+    OpenAI backend; unknown backends fall back to it.
+    """
+    if client is None:
+        name = TRANSLATION_ROUTES.get(lang, TRANSLATION_DEFAULT_BACKEND)
+        factory = _FACTORIES.get(name)
+        backend = factory(model, None) if factory is not None else None
+        if backend is not None:
+            return backend
+        if name != "openai" and name not in _WARNED:
+            _WARNED.add(name)
+            logger.warning(f"Translation backend '{name}' for '{lang}' not available, using openai")
+    return OpenAITranslationBackend(model=model, client=client)
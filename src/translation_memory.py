@@ -0,0 +1,104 @@
+"""
+translation_memory.py — Übersetzungsspeicher für translate_from_de / translate_to_de
+
+Schlüssel ist (Richtung, Sprache, Modell, Hash des Textes). Vor dem persistenten Speicher
+(SqliteCache, geteilt über Sessions und Worker-Prozesse) liegt ein begrenzter In-Process-LRU.
+Statische Texte (Slot-Prompts, Hinweise, Fehlermeldungen) werden so pro Sprache nur einmal übersetzt.
+
+Übersetzungen von Nutzereingaben (Richtung "to_de") können personenbezogene Daten enthalten
+und werden deshalb nur im Prozessspeicher gehalten, nicht auf der Platte.
+Der Pfad bezieht sich auf das Repo-Verzeichnis; die Datei wird erst beim ersten Schreiben/Lesen angelegt.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from .llm_cache import SqliteCache, env_float, cache_from_env
+
+PERSISTENT_DIRECTIONS = ("from_de",)
+
+
+def memory_key(direction: str, lang: str, model: str, text: str) -> str:
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{direction}:{lang}:{model}:{text_hash}"
+
+
+class TranslationMemory:
+    """
+    Bounded in-process LRU in front of an optional persistent SqliteCache.
+    Preloaded entries (prebuilt bundles) are pinned, never evicted and served for every model/backend.
+    """
+
+    def __init__(self, store: Optional[SqliteCache] = None, max_memory_items: int = 4096):
+        self.store = store
+        self.max_memory_items = max_memory_items
+        self._pinned: Dict[str, str] = {}
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, direction: str, lang: str, model: str, text: str) -> Optional[str]:
+        key = memory_key(direction, lang, model, text)
+        with self._lock:
+            value = self._pinned.get(memory_key(direction, lang, "*", text))
+            if value is None:
+                value = self._memory.get(key)
+            if value is not None:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.store is not None and direction in PERSISTENT_DIRECTIONS:
+            value = self.store.get(key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, direction: str, lang: str, model: str, text: str, translation: str) -> None:
+        if not translation:
+            return
+        key = memory_key(direction, lang, model, text)
+        self._remember(key, translation)
+        if self.store is not None and direction in PERSISTENT_DIRECTIONS:
+            self.store.set(key, translation)
+
+    def preload(self, direction: str, lang: str, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Pins (text, translation) pairs in process memory, e.g. from prebuilt bundles."""
+        entries = {memory_key(direction, lang, "*", text): translation
+                   for text, translation in pairs if text and translation}
+        with self._lock:
+            self._pinned.update(entries)
+        return len(entries)
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"pinned_items": len(self._pinned), "memory_items": len(self._memory),
+                "hits": self.hits, "misses": self.misses}
+
+
+# Prozessweiter Übersetzungsspeicher
+TRANSLATION_MEMORY = TranslationMemory(
+    store=cache_from_env(
+        path=os.getenv("TRANSLATION_MEMORY_PATH", os.path.join("cache", "translation_memory.sqlite")),
+        ttl_hours=env_float("TRANSLATION_MEMORY_TTL_HOURS", None),
+        max_entries=int(env_float("TRANSLATION_MEMORY_MAX_ENTRIES", 200_000)),
+    ),
+    max_memory_items=int(env_float("TRANSLATION_MEMORY_MAX_ITEMS", 4096)),
+)
@@ -1,5 +1,13 @@
-from typing import Optional
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
 from openai import OpenAI
+from .translation_backends import OpenAITranslationBackend, TranslationBackend, backend_for
+from .translation_memory import TRANSLATION_MEMORY, memory_key
+
+logger = logging.getLogger(__name__)
 
 SUPPORTED = {
     "de",  # Deutsch
@@ -377,39 +385,119 @@ instruction_msgs = {
           "- אם ברצונך לשנות תשובה שכבר נתת, פשוט כתוב זאת בתיבת הטקסט, לדוגמה: \"אני רוצה **לשנות** את שם החברה שסיפקתי.\" \n\n"
 }
 
+def _run(backend: TranslationBackend, texts: List[str], src: str, tgt: str, model: str) -> List[str]:
+    """Runs a backend; if a non-OpenAI backend fails, the texts are translated via OpenAI instead."""
+    try:
+        return backend.translate_many(texts, src, tgt)
+    except Exception as e:
+        if isinstance(backend, OpenAITranslationBackend):
+            raise
+        logger.error(f"Translation backend '{backend.name}' failed, falling back to openai: {e}")
+        return OpenAITranslationBackend(model=model).translate_many(texts, src, tgt)
+
+
 def translate_from_de(text_de: str, target_lang: str, client: Optional[OpenAI] = None, model: str = "gpt-4.1-mini") -> str:
     """
     Übersetzt 'text_de' von Deutsch -> target_lang (ISO-639-1).
     - Platzhalter {so_was} / {{so_was}} / <TAGS> bleiben unverändert.
     - Juristische Begriffe wie GmbH, AG, UG, OHG, KG, e.K. usw. niemals übersetzen.
     - Bei target_lang == 'de' oder unbekanntem Code -> Rückgabe = text_de (fail-safe).
+    - Backend je Sprache laut TRANSLATION_ROUTES (siehe translation_backends.py).
     """
     tgt = (target_lang or "de").lower()
     if tgt not in SUPPORTED or tgt == "de" or not text_de:
         return text_de
 
-    client = client or OpenAI()
-
-    system_prompt = (
-        "You are a precise translator. Translate from German into the target language.\n"
-        f"- Target language (ISO 639-1): {tgt}\n"
-        "- Keep placeholders and variables exactly as-is: {like_this}, {{like_this}}, <TAGS>, $VARS, %(fmt)s.\n"
-        "- Do not translate URLs, emails, codes, or content inside {{double braces}}.\n"
-        "- Do not translate legal/corporate terms such as GmbH, AG, UG, OHG, KG, e.K., mbH.\n"
-        "- Preserve punctuation, line breaks, and Markdown.\n"
-        "- Style: concise, polite, clear."
-    )
-
-    resp = client.responses.create(
-        model=model,
-        input=[
-            {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
-            {"role": "user",   "content": [{"type": "input_text", "text": text_de}]},
-        ],
-        temperature=0.0
-    )
-
-    return (resp.output_text or "").strip()
+    backend = backend_for(tgt, client=client, model=model)
+    cached = TRANSLATION_MEMORY.get("from_de", tgt, backend.cache_id, text_de)
+    if cached is not None:
+        return cached
+
+    # Läuft die Übersetzung bereits im Hintergrund (Prefetch)? -> auf das Ergebnis warten
+    pending = _PREFETCH_INFLIGHT.get(memory_key("from_de", tgt, backend.cache_id, text_de))
+    if pending is not None:
+        try:
+            return pending.result()
+        except Exception:
+            pass  # Prefetch fehlgeschlagen -> regulär übersetzen
+
+    return _request_from_de(text_de, tgt, backend, model)
+
+
+def _request_from_de(text_de: str, tgt: str, backend: TranslationBackend, model: str) -> str:
+    translated = _run(backend, [text_de], "de", tgt, model)[0]
+    TRANSLATION_MEMORY.put("from_de", tgt, backend.cache_id, text_de, translated)
+    return translated
+
+
+def translate_many(texts: Sequence[str], target_lang: str, client: Optional[OpenAI] = None,
+                   model: str = "gpt-4.1-mini") -> List[str]:
+    """
+    Translates several German texts into target_lang and returns them in input order.
+    Texts in the translation memory (or already being prefetched) are not sent again; the rest go to
+    the backend in one batch (for OpenAI: ONE structured-output request).
+    """
+    tgt = (target_lang or "de").lower()
+    if tgt not in SUPPORTED or tgt == "de":
+        return list(texts)
+
+    backend = backend_for(tgt, client=client, model=model)
+    results: List[Optional[str]] = [None] * len(texts)
+    missing: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        if not text:
+            results[i] = text
+            continue
+        cached = TRANSLATION_MEMORY.get("from_de", tgt, backend.cache_id, text)
+        if cached is None and memory_key("from_de", tgt, backend.cache_id, text) in _PREFETCH_INFLIGHT:
+            cached = translate_from_de(text, tgt, client=client, model=model)
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(text, []).append(i)
+
+    batch = list(missing)
+    if batch:
+        translated = _run(backend, batch, "de", tgt, model)
+        for text, translation in zip(batch, translated):
+            TRANSLATION_MEMORY.put("from_de", tgt, backend.cache_id, text, translation)
+            for i in missing[text]:
+                results[i] = translation
+    return results
+
+
+# Hintergrund-Übersetzungen für voraussichtlich als Nächstes benötigte Texte
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("TRANSLATION_PREFETCH_WORKERS", "4")),
+                                    thread_name_prefix="translate-prefetch")
+_PREFETCH_INFLIGHT: Dict[str, Future] = {}
+_PREFETCH_LOCK = threading.Lock()
+
+
+def prefetch_from_de(texts: Iterable[str], target_lang: str, model: str = "gpt-4.1-mini") -> int:
+    """
+    Starts background translations (German -> target_lang) for texts not yet in the translation memory.
+    A later translate_from_de call for the same text waits for the running request instead of sending a new one.
+    Returns the number of scheduled translations.
+    """
+    tgt = (target_lang or "de").lower()
+    if tgt not in SUPPORTED or tgt == "de":
+        return 0
+
+    backend = backend_for(tgt, model=model)
+    scheduled = 0
+    for text in dict.fromkeys(t for t in texts if t):
+        key = memory_key("from_de", tgt, backend.cache_id, text)
+        with _PREFETCH_LOCK:
+            if key in _PREFETCH_INFLIGHT:
+                continue
+            if TRANSLATION_MEMORY.get("from_de", tgt, backend.cache_id, text) is not None:
+                continue
+            future = _PREFETCH_POOL.submit(_request_from_de, text, tgt, backend, model)
+            _PREFETCH_INFLIGHT[key] = future
+        future.add_done_callback(lambda _f, key=key: _PREFETCH_INFLIGHT.pop(key, None))
+        scheduled += 1
+    return scheduled
+
 
 def translate_to_de(text_src: str, source_lang: str, client: Optional[OpenAI] = None, model: str = "gpt-4.1-mini") -> str:
     """
@@ -417,30 +505,17 @@ def translate_to_de(text_src: str, source_lang: str, client: Optional[OpenAI] =
     - Platzhalter {so_was} / {{so_was}} / <TAGS> bleiben unverändert.
     - Juristische Begriffe wie GmbH, AG, UG, OHG, KG, e.K. usw. niemals übersetzen.
     - Wenn source_lang == 'de' oder unbekannt -> Rückgabe = text_src (fail-safe).
+    - Backend je Sprache laut TRANSLATION_ROUTES (siehe translation_backends.py).
     """
     src = (source_lang or "de").lower()
     if src not in SUPPORTED or src == "de" or not text_src:
         return text_src
 
-    client = client or OpenAI()
-
-    system_prompt = (
-        "You are a precise translator. Translate into **German** from the given source language.\n"
-        f"- Source language (ISO 639-1): {src}\n"
-        "- Keep placeholders and variables exactly as-is: {like_this}, {{like_this}}, <TAGS>, $VARS, %(fmt)s.\n"
-        "- Do not translate URLs, emails, codes, or content inside {{double braces}}.\n"
-        "- Do not translate legal/corporate terms such as GmbH, AG, UG, OHG, KG, e.K., mbH.\n"
-        "- Preserve punctuation, line breaks, and Markdown.\n"
-        "- Style: concise, polite, clear German."
-    )
-
-    resp = client.responses.create(
-        model=model,
-        input=[
-            {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
-            {"role": "user",   "content": [{"type": "input_text", "text": text_src}]},
-        ],
-        temperature=0.0
-    )
-
-    return (resp.output_text or "").strip()
+    backend = backend_for(src, client=client, model=model)
+    cached = TRANSLATION_MEMORY.get("to_de", src, backend.cache_id, text_src)
+    if cached is not None:
+        return cached
+
+    translated = _run(backend, [text_src], src, "de", model)[0]
+    TRANSLATION_MEMORY.put("to_de", src, backend.cache_id, text_src, translated)
+    return translated
@@ -0,0 +1,128 @@
+"""
+validator_cache.py — Memoisierung von Validator-Ergebnissen
+
+Die valid_*-Methoden der Validator-Klassen werden je (Validator, normalisierte Eingabe) zwischengespeichert,
+damit wiederholte Eingaben (z. B. nach einer Korrektur an anderer Stelle oder dieselbe Adresse in
+mehreren Sitzungen) ohne erneuten LLM-Aufruf beantwortet werden.
+
+    @memoize_validator(ttl=24 * 3600)     # rein (pure): Ergebnis hängt nur von der Eingabe ab
+    def valid_activity(self, x, llm_service=None): ...
+
+    @memoize_validator(pure=False)        # zeitabhängig, z. B. valid_start_date: nie cachen
+    def valid_start_date(self, x, llm_service=None): ...
+
+Der Speicher ist prozessweit, LRU-begrenzt (VALIDATOR_CACHE_MAX_ITEMS) und hat eine TTL je Validator.
+Aufrufe mit zusätzlichen Argumenten (z. B. einem injizierten llm_service) werden nicht gecacht, ebenso
+Ausnahmen und Ergebnisse, die der Validator mit uncached(...) als vorläufig markiert (z. B. fehlende
+oder unbrauchbare LLM-Antwort) – sonst würde ein kurzer API-Fehler die Eingabe für die ganze TTL ablehnen.
+"""
+
+import functools
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .local_validation import VALIDATOR_METRICS
+
+
+class UncachedResult(tuple):
+    """Validator result that must not be memoized (compares equal to the plain tuple)."""
+
+
+def uncached(result: tuple) -> UncachedResult:
+    """Marks a validator result as transient, e.g. when the LLM gave no usable answer."""
+    return UncachedResult(result)
+
+
+def normalize_input(x: Any) -> Any:
+    """Whitespace-normalized string input; other types are used as they are."""
+    if isinstance(x, str):
+        return re.sub(r"\s+", " ", x).strip()
+    return x
+
+
+class ValidatorResultCache:
+    """Thread-safe LRU of validator results with per-entry expiry."""
+
+    def __init__(self, max_items: int = 4096):
+        self.max_items = max_items
+        self._items: "OrderedDict[Tuple[str, Any], Tuple[Optional[float], tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, Any]) -> Optional[tuple]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] is not None and item[0] < time.monotonic():
+                del self._items[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Tuple[str, Any], result: tuple, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._items[key] = (expires, result)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Prozessweiter Speicher für alle Validator-Klassen
+VALIDATOR_CACHE = ValidatorResultCache(max_items=int(os.getenv("VALIDATOR_CACHE_MAX_ITEMS", "4096")))
+
+
+def memoize_validator(pure: bool = True, ttl: Optional[float] = None,
+                      cache: Optional[ValidatorResultCache] = None) -> Callable:
+    """
+    Decorator for valid_* methods taking (self, x). pure=False only marks the method as not cacheable;
+    ttl is the lifetime in seconds (None: until evicted).
+    """
+    def decorator(fn: Callable) -> Callable:
+        fn.__validator_pure__ = pure
+        if not pure:
+            return fn
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(self, x, *args, **kwargs):
+            if args or kwargs:
+                return fn(self, x, *args, **kwargs)
+            store = cache or VALIDATOR_CACHE
+            key = (name, normalize_input(x))
+            try:
+                result = store.get(key)
+            except TypeError:  # nicht hashbare Eingabe
+                return fn(self, x)
+            if result is not None:
+                VALIDATOR_METRICS.record(fn.__name__, "cache")
+                return result
+            result = fn(self, x)
+            if isinstance(result, tuple) and not isinstance(result, UncachedResult):
+                store.set(key, result, ttl)
+            return result
+
+        return wrapper
+    return decorator
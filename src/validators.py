@@ -5,14 +5,21 @@ import os
 from typing import List, Dict, Any, Union, Literal, Optional
 
 from .llm_validator_service import LLMValidatorService
-from .validator_helper import response_to_dict, convert_to_bool, load_txt, is_gp_town
-from openai import OpenAI
+from .validator_helper import response_to_dict, convert_to_bool, is_gp_town
+from .openai_clients import get_openai_client
+from .local_validation import HOME_COUNTRY, VALIDATOR_METRICS, classify_activity, match_country, parse_german_address
+from .permit_index import get_permit_index
+from .validator_cache import memoize_validator, uncached
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo  # Python 3.9+
 from pydantic import BaseModel
 
 
 LLM_ENDPOINT = os.getenv("LLM_ENDPOINT", "http://localhost:8080/completion")
+# Threads für die Erlaubnisprüfung, die parallel zur Präzisionsprüfung der Tätigkeit läuft
+_PERMIT_CHECK_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("PERMIT_CHECK_WORKERS", "4")),
+                                        thread_name_prefix="permit-check")
 
 class PermitSchema(BaseModel):
     validity: Literal["VALID", "INVALID"]
@@ -125,12 +132,16 @@ class GewerbeanmeldungValidators(BaseValidators):
     def __init__(self):
         super().__init__()
         # initialize client and set model, theoretically, the model for each task could be set dynamically (use different models for more or less complex tasks)
-        self.client = OpenAI()
+        self.client = get_openai_client()
         self.llm_service = LLMValidatorService()
+        # Erlaubnisliste einmalig als lokaler Suchindex (statt sie bei jeder Prüfung komplett ins Prompt zu laden)
+        self.permit_index = get_permit_index()
 
     def valid_registered_name(self,x):
         return self.valid_name(x)
     
+    # zeitabhängig (Stichtag heute) -> nicht cachen
+    @memoize_validator(pure=False)
     def valid_start_date(self, x: str, llm_service=None) -> tuple:
         """
         Prüft ein Datum im Format TT.MM.JJJJ.
@@ -180,6 +191,7 @@ class GewerbeanmeldungValidators(BaseValidators):
         payload = f"{day:02d}.{month:02d}.{year:04d}"
         return True, "", payload
 
+    @memoize_validator(ttl=24 * 3600)
     def valid_activity(self, x: str, llm_service=None) -> tuple:
         """
         Prüft, ob Tätigkeitsbeschreibung hinreichend präzise und zulässig ist.
@@ -216,26 +228,50 @@ class GewerbeanmeldungValidators(BaseValidators):
 
         user_input = f"Beschreibung: {x}"
 
-        if llm_service is None:
-            llm_service = LLMValidatorService()
-
-        response = llm_service.validate_openai_structured_output(
-            system_prompt=check_prompt,
-            user_input=user_input,
-            model="gpt-4o-mini",
-            client=self.client,
-            json_schema = ActivityCheckResponse
-        )
-        if not response:
-            return False, "Keine Antwort vom LLM", x
-
-        valid = (response.output_parsed.validity == "VALID")
-        reason = "" if valid else response.output_parsed.reason + " Ihre Formulierung sollte Tätigkeitsart, Tätigkeitsobjekt so wie gegebenenfalls Ergänzugen enthalten.Zu breite Formulierungen sollten allerdings vermieden werden."
+        # Lokale Vorprüfung: Beschreibungen nur aus Sammelbegriffen ohne LLM als zu allgemein ablehnen
+        local_valid = classify_activity(x)
+        permit_check = None
+        if local_valid is not None:
+            VALIDATOR_METRICS.record("valid_activity", "local")
+            valid = local_valid
+            llm_reason = "Die Beschreibung ist leider ungültig, weil sie zu allgemein ist."
+        else:
+            if llm_service is None:
+                llm_service = LLMValidatorService()
+
+            # Erlaubnisprüfung parallel zur Präzisionsprüfung starten; Ergebnis wird bei INVALID verworfen
+            permit_check = _PERMIT_CHECK_POOL.submit(self.check_if_permit_is_required, x)
+            try:
+                response = llm_service.validate_openai_structured_output(
+                    system_prompt=check_prompt,
+                    user_input=user_input,
+                    model="gpt-4o-mini",
+                    client=self.client,
+                    json_schema = ActivityCheckResponse,
+                    cache=True  # Urteil über die Tätigkeitsbeschreibung, keine personenbezogenen Daten
+                )
+            except Exception:
+                permit_check.cancel()
+                raise
+            VALIDATOR_METRICS.record("valid_activity", "llm")
+            if not response:
+                permit_check.cancel()
+                return uncached((False, "Keine Antwort vom LLM", x))
+
+            valid = (response.output_parsed.validity == "VALID")
+            llm_reason = response.output_parsed.reason
+
+        reason = "" if valid else llm_reason + " Ihre Formulierung sollte Tätigkeitsart, Tätigkeitsobjekt so wie gegebenenfalls Ergänzugen enthalten.Zu breite Formulierungen sollten allerdings vermieden werden."
         payload = x
         # If valid, further check if a permit may be required
+        if not valid and permit_check is not None:
+            permit_check.cancel()
         if valid:
             print("check permit")
-            needs_permit, permit_reason, _ = self.check_if_permit_is_required(x)
+            if permit_check is not None:
+                needs_permit, permit_reason, _ = permit_check.result()
+            else:
+                needs_permit, permit_reason, _ = self.check_if_permit_is_required(x)
             if needs_permit == 'VALID':
                 reason = permit_reason + ' Weitere Informationen finden Sie [hier](https://www.ihk.de/konstanz/recht-und-steuern/gewerberecht/einzelne-berufe/erlaubnispflichtigegewerbe13180-1672696).'
 
@@ -246,9 +282,12 @@ class GewerbeanmeldungValidators(BaseValidators):
     def check_if_permit_is_required(self, x: str, llm_service=None) -> tuple:
         """ Takes the User inut and checks, whether a permit may be needed for the activity."""
 
-        # load pdf document which contains a list of activities which require a permit
-        permit_list = load_txt('./data/jobs_which_need_permit.txt')
-        
+        # lokale Vorauswahl: bei sicherem Treffer gehen nur die Kandidaten an das LLM, sonst die ganze Liste
+        candidates = self.permit_index.shortlist(x)
+        if candidates is None:
+            permit_list = self.permit_index.full_text
+        else:
+            permit_list = "\n\n".join(entry.text for entry in candidates)
 
         system_prompt = f"""Du bist ein Assistent, welcher Tätigkeitsbeschreibungen mit den in der folgenden Liste
                         definierten Berfusbezeichnungen abgleicht, und die Berufsbezeichnung als Erlaubnisbedürftig (VALID) oder nicht Erlaubnisbedürftig (INVALID) klassifiziert (validity).
@@ -268,15 +307,24 @@ class GewerbeanmeldungValidators(BaseValidators):
             user_input = x,
             json_schema = PermitSchema,
             client = self.client,
-            model = 'gpt-5-mini'
+            model = 'gpt-5-mini',
+            cache = True
         )
+        VALIDATOR_METRICS.record("check_if_permit_is_required", "llm")
         validity = response.output_parsed.validity
         reason = response.output_parsed.permit_reason
 
         # extrahiere validity nach validity, reason nach reason und payload bleibt leer
         return validity, reason, ''
     
+    @memoize_validator(ttl=24 * 3600)
     def valid_representative_address(self, x, llm_service = None) -> bool:
+        # Lokale Vorprüfung: vollständige deutsche Adresse (Straße Nr, PLZ Ort) ohne LLM
+        local = parse_german_address(x)
+        if local is not None:
+            VALIDATOR_METRICS.record("valid_representative_address", "local")
+            return local.valid, local.reason, local.payload if local.valid else None
+
         system_prompt = (
             "Aufgabe: Extrahiere aus der Nutzereingabe den Straßennamen, die Hausnummer, die Postleitzahl und den Stadtnamen. "
             "Wenn alle Angaben vorhanden sind, gib 'VALID' zurück; wenn auch nur eine Information fehlt "
@@ -339,6 +387,7 @@ class GewerbeanmeldungValidators(BaseValidators):
             model="gpt-4.1-mini",
             client = self.client
         )
+        VALIDATOR_METRICS.record("valid_representative_address", "llm")
 
         response = response_to_dict(response)
         
@@ -514,6 +563,7 @@ class GewerbeanmeldungValidators(BaseValidators):
 
         return True, f"Geburtsort '{x.strip()}' wird eingetragen.", x.strip()
     
+    @memoize_validator(ttl=7 * 24 * 3600)
     def valid_other_nationality(self, x: str, llm_service=None):
         """
         Prüft, ob 'x' eine valide Staatsangehörigkeit / ein existierendes Land in korrekter Schreibweise ist.
@@ -524,12 +574,24 @@ class GewerbeanmeldungValidators(BaseValidators):
         - suggested_country: korrigierter Ländername bei leichten Tippfehlern (sonst leer)
         Rückgabe: (bool_valid, reason, payload_country)
         """
+        # Gefragt wird nur, wenn die Person NICHT deutsch ist: Deutschland ist lokal wie im LLM-Pfad ungültig
+        home_reason = "Gefragt ist eine nicht-deutsche Staatsangehörigkeit. Bitte geben Sie das Land Ihrer Staatsangehörigkeit an."
+
+        # Lokale Vorprüfung: Länder-/Staatsangehörigkeits-Lexikon (mit Tippfehler-Toleranz)
+        country = match_country(x)
+        if country is not None:
+            VALIDATOR_METRICS.record("valid_other_nationality", "local")
+            if country == HOME_COUNTRY:
+                return False, home_reason, ""
+            return True, f"Die Staatsangehörigkeit '{country}' wird eingetragen.", country
+
         system_prompt = (
             "Aufgabe:\n"
             "Klassifiziere, ob es sich bei der Eingabe um eine VALIDE Staatsangehörigkeit handelt.\n"
             "VALIDE ist sie NUR, wenn das Land tatsächlich existiert UND die Schreibweise größtenteils korrekt ist.\n"
             "Ist das Land ausgedacht oder nicht zu erkennen, um welches Land es sich handeln soll antworte mit INVALID und lasse 'country_name' leer.\n"
             "Wenn die Schreibweise NUR LEICHT falsch ist aber klar zu erkennen ist um welches Land es sich handelt, gib VALID zurück, gib im Feld 'country_name' den normierten offiziellen Ländernamen an.\n"
+            "Gefragt ist eine NICHT-deutsche Staatsangehörigkeit: Deutschland (auch 'deutsch', 'BRD') ist INVALID.\n"
             "**Halte dich strikt an das JSON-Schema. Keine Erklärtexte außerhalb der Felder. Das ist von höchster Wichtigkeit.**\n"
         )
 
@@ -558,14 +620,20 @@ class GewerbeanmeldungValidators(BaseValidators):
             user_input=f"Beschreibung: {x}\nAntwort:",
             json_schema=nationality_schema,
             model="gpt-4.1-mini",
-            client=self.client
+            client=self.client,
+            cache=True
         )
+        VALIDATOR_METRICS.record("valid_other_nationality", "llm")
 
         # Hilfsfunktion, die dein Service vermutlich bereitstellt; andernfalls: json.loads(response)
         resp = response_to_dict(response)
 
-        validity_str = resp.get("validity", "INVALID")
-        is_valid = (validity_str == "VALID")
+        if resp.get("validity") not in ("VALID", "INVALID"):
+            # unbrauchbare LLM-Antwort: nicht als Urteil über die Eingabe merken
+            return uncached((False, "Die Staatsangehörigkeit konnte gerade nicht geprüft werden. Bitte versuchen Sie es erneut.", ""))
+        is_valid = (resp["validity"] == "VALID")
+        if is_valid and match_country(resp.get("country_name", "")) == HOME_COUNTRY:
+            return False, home_reason, ""
         if is_valid:
             return True, f"Die Staatsangehörigkeit '{resp.get('country_name','')}' wird eingetragen.", resp.get("country_name", x).strip()
         else:
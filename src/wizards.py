@@ -6,9 +6,10 @@ needed to perform the wizards task is stored in a wizard handles object"""
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, Tuple, List
 import json
-from openai import OpenAI
+from .openai_clients import get_openai_client
 import json, re
 from .translator import translate_from_de, instruction_msgs
+from . import bot_texts
 
 def code_to_label(code: str) -> str:
     return {"de":"Deutsch","en":"English","fr":"Français","tr":"Türkçe"}.get(code, code)
@@ -27,7 +28,7 @@ class LanguageWizard:
     def __init__(self, state: Optional[LanguageWizardState] = None, model: str = "gpt-4o-mini"):
         self.state = state or LanguageWizardState()
         self.model = model
-        self.client = OpenAI()
+        self.client = get_openai_client()
 
     # --- LLM-Aufrufe ---------------------------------------------------------
     def _llm_detect_language(self, user_text: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
@@ -352,7 +353,7 @@ class FormSelectionWizard:
     def __init__(self, state: Optional[FormSelectionWizardState] = None, model: str = "gpt-4o-mini"):
         self.state = state or FormSelectionWizardState()
         self.model = model
-        self.client = OpenAI()
+        self.client = get_openai_client()
 
     def _llm_localize_form_list(self, lang_code: str, form_keys: List[str]) -> Tuple[List[str], str, Optional[str]]:
         """
@@ -432,13 +433,13 @@ class FormSelectionWizard:
 
             numbered = self._format_numbered_list(labels)
             hint = {
-                "de": "Sie können die Nummer oder den Namen eingeben.",
+                "de": bot_texts.FORM_SELECTION_HINT,
                 "en": "You can enter the number or the name.",
                 "fr": "Vous pouvez saisir le numéro ou le nom.",
                 "tr": "Numarayı veya adı girebilirsiniz."
             }.get(s.lang_code, False)
             if not hint:
-                hint = translate_from_de(text_de = "Sie können die Nummer oder den Namen eingeben.", target_lang=s.lang_code)
+                hint = translate_from_de(text_de = bot_texts.FORM_SELECTION_HINT, target_lang=s.lang_code)
             return f"{prompt}\n{numbered}\n\n{hint}", False, s.lang_code
 
         # 2) Auswahl verarbeiten (unverändert)
@@ -452,13 +453,13 @@ class FormSelectionWizard:
                     s.selected_form_key = s.available_form_keys[idx]
                     s.awaiting_selection = False
                     confirm = {
-                        "de":"Verstanden. Wir starten mit dem Formular:",
+                        "de":bot_texts.FORM_SELECTION_CONFIRM,
                         "en":"Got it. We'll start with the form:",
                         "fr":"Compris. Nous commençons avec le formulaire :",
                         "tr":"Anlaşıldı. Şu form ile başlıyoruz:"
                     }.get(s.lang_code, False)
                     if not confirm:
-                        confirm = translate_from_de(text_de = "Verstanden. Wir starten mit dem Formular:", target_lang=s.lang_code)
+                        confirm = translate_from_de(text_de = bot_texts.FORM_SELECTION_CONFIRM, target_lang=s.lang_code)
                     return f"{confirm} **{s.translated_labels[idx]}**", True, s.lang_code
 
             # b) Exakter Text-Match (übersetzte Labels)
@@ -468,24 +469,24 @@ class FormSelectionWizard:
                     s.selected_form_key = s.available_form_keys[i]
                     s.awaiting_selection = False
                     confirm = {
-                        "de":"Verstanden. Wir starten mit dem Formular:",
+                        "de":bot_texts.FORM_SELECTION_CONFIRM,
                         "en":"Got it. We'll start with the form:",
                         "fr":"Compris. Nous commençons avec le formulaire :",
                         "tr":"Anlaşıldı. Şu form ile başlıyoruz:"
                     }.get(s.lang_code, False)
                     if not confirm:
-                        confirm = translate_from_de(text_de = "Verstanden. Wir starten mit dem Formular:", target_lang=s.lang_code)
+                        confirm = translate_from_de(text_de = bot_texts.FORM_SELECTION_CONFIRM, target_lang=s.lang_code)
                     return f"{confirm} **{lab}**", True, s.lang_code
 
             # c) Ungültig -> erneut anzeigen
             retry = {
-                "de":"Ungültige Auswahl. Bitte wählen Sie erneut.",
+                "de":bot_texts.FORM_SELECTION_RETRY,
                 "en":"Invalid choice. Please choose again.",
                 "fr":"Choix invalide. Veuillez recommencer.",
                 "tr":"Geçersiz seçim. Lütfen tekrar seçin."
             }.get(s.lang_code, False)
             if not retry:
-                retry = translate_from_de(text_de = "Ungültige Auswahl. Bitte wählen Sie erneut.", target_lang=s.lang_code)
+                retry = translate_from_de(text_de = bot_texts.FORM_SELECTION_RETRY, target_lang=s.lang_code)
             numbered = self._format_numbered_list(s.translated_labels)
             return f"{retry}\n{numbered}", False, s.lang_code
 
@@ -526,7 +527,7 @@ class ActivityWizard:
     def __init__(self, state: Optional[ActivityWizardState] = None, model: str = "gpt-4o-mini"):
         self.state = state or ActivityWizardState()
         self.model = model
-        self.client = OpenAI()
+        self.client = get_openai_client()
 
     # --------- Systemprompt (mehrsprachig, deutsch als Default) ----------
     def _system_prompt(self) -> str:
@@ -0,0 +1,16 @@
+"""
+conftest.py — Gemeinsame Testumgebung
+
+Keine echten API-Keys, keine persistenten Caches: die Module legen ihre Prozess-Singletons beim
+Import an, daher werden die Umgebungsvariablen vor dem ersten Import von src gesetzt.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["LLM_CACHE_PATH"] = "off"
+os.environ["TRANSLATION_MEMORY_PATH"] = "off"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
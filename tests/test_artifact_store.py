@@ -0,0 +1,57 @@
+import json
+import os
+import time
+
+from src.artifact_store import INDEX_FILE, ArtifactStore
+
+
+def test_construction_does_not_touch_the_filesystem(tmp_path):
+    root = tmp_path / "out"
+    ArtifactStore(str(root))
+    assert not root.exists()
+
+
+def test_two_stores_on_one_directory_keep_each_others_entries(tmp_path):
+    a, b = ArtifactStore(str(tmp_path)), ArtifactStore(str(tmp_path))
+    a.put("first", "json", b"{}")
+    b.put("second", "json", b"{}")
+    a.put("third", "pdf", b"%PDF")
+
+    with open(tmp_path / INDEX_FILE, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"first", "second", "third"}
+    assert a.has("second", "json") and b.has("third", "pdf")
+
+
+def test_size_eviction_counts_entries_of_other_stores(tmp_path):
+    a = ArtifactStore(str(tmp_path), max_age_seconds=0, max_total_bytes=10)
+    b = ArtifactStore(str(tmp_path), max_age_seconds=0, max_total_bytes=10)
+    a.put("old", "pdf", b"123456")
+    time.sleep(0.01)
+    b.put("new", "pdf", b"123456")
+
+    assert not (tmp_path / "old.pdf").exists()
+    assert not a.has("old", "pdf") and a.has("new", "pdf")
+
+
+def test_zero_disables_limits(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_age_seconds=0, max_total_bytes=0)
+    store.put("a", "pdf", b"x" * 100)
+    path = store.put("b", "pdf", b"x" * 100)
+    os.utime(tmp_path / "a.pdf", (0, 0))
+    assert store.evict() == 0 and path.exists() and store.has("a", "pdf")
+
+
+def test_age_eviction(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_age_seconds=60, max_total_bytes=0)
+    store.put("a", "json", b"{}")
+    store._entries["a"].created -= 120
+    store._save_index()
+    assert store.evict() == 1
+    assert not store.has("a", "json") and not (tmp_path / "a.json").exists()
+
+
+def test_existing_directory_is_indexed_on_first_use(tmp_path):
+    (tmp_path / "legacy.json").write_text("{}")
+    (tmp_path / "legacy.pdf").write_bytes(b"%PDF")
+    store = ArtifactStore(str(tmp_path))
+    assert store.has("legacy", "pdf") and store.get("legacy", "json") == b"{}"
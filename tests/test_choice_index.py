@@ -0,0 +1,48 @@
+"""
+ChoiceIndex gegen das frühere difflib-Matching (Referenz aus benchmarks/bench_choice_matching.py).
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_choice_matching import best_choice_match_old, load_choice_lists, make_inputs
+from src.choice_index import CONTAINMENT_SCORE, ChoiceIndex, choice_index_for, normalize_choice_text
+
+FORMS_PATH = Path(__file__).resolve().parents[1] / "forms" / "ge"
+
+
+def _workload(seed=7):
+    rng = random.Random(seed)
+    return [(choices, make_inputs(choices, rng)) for choices in load_choice_lists(FORMS_PATH)]
+
+
+@pytest.mark.parametrize("cutoff", [0.75, 0.85])
+@pytest.mark.parametrize("seed", [7, 11, 23])
+def test_decisions_match_the_difflib_baseline(cutoff, seed):
+    for choices, cases in _workload(seed):
+        index = ChoiceIndex(choices)
+        for text, _ in cases:
+            old_choice, old_score = best_choice_match_old(text, choices)
+            new_choice, new_score = index.best_match(text)
+            old = old_choice if old_score >= cutoff else None
+            new = new_choice if new_score >= cutoff else None
+            assert new == old, (text, choices, old_score, new_score)
+
+
+def test_score_tiers():
+    index = ChoiceIndex(["Hauptniederlassung", "Zweigniederlassung", "unselbstständige Zweigstelle"])
+    assert index.best_match("hauptniederlassung") == ("Hauptniederlassung", 1.0)
+    assert index.best_match("unselbststaendige Zweigstelle") == ("unselbstständige Zweigstelle", 1.0)
+    assert index.best_match("Zweigstelle") == ("unselbstständige Zweigstelle", 1.0)   # ganzes Wort
+    assert index.best_match("Zweigst") == ("unselbstständige Zweigstelle", CONTAINMENT_SCORE)
+    choice, score = index.best_match("Zweigniderlassung")
+    assert choice == "Zweigniederlassung" and CONTAINMENT_SCORE < score < 1.0
+    assert index.best_match("") == (None, 0.0)
+
+
+def test_normalization_and_cache():
+    assert normalize_choice_text("  GmbH & Co. KG ") == "gmbh co kg"
+    assert normalize_choice_text("Türkçe") == "tuerkce"
+    assert choice_index_for(["ja", "nein"]) is choice_index_for(("ja", "nein"))
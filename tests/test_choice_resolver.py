@@ -0,0 +1,77 @@
+"""
+Stufen des ChoiceResolvers (Cache -> Synonyme -> LLM) und lokalisierte Labels.
+"""
+
+import pytest
+
+from src import choice_resolver
+from src.choice_resolver import ChoiceResolver
+
+YES_NO = ["ja", "nein"]
+BRANCHES = ["Hauptniederlassung", "Zweigniederlassung", "unselbstständige Zweigstelle", "Reisegewerbe"]
+
+
+class FakeLlm:
+    def __init__(self, answer, score=0.9):
+        self.answer, self.score, self.calls = answer, score, []
+
+    def __call__(self, text, choices):
+        self.calls.append(text)
+        return self.answer, self.score
+
+
+def test_yes_no_synonyms_resolve_without_llm():
+    resolver = ChoiceResolver(YES_NO)
+    llm = FakeLlm("ja")
+    assert resolver.resolve("Evet", llm=llm) == ("ja", 1.0, "synonyms")
+    assert resolver.resolve("нет", llm=llm) == ("nein", 1.0, "synonyms")
+    assert resolver.resolve("yess", llm=llm)[0] == "ja"           # Tippfehler über den Synonym-Index
+    assert llm.calls == []
+
+
+def test_llm_answer_is_cached():
+    resolver = ChoiceResolver(BRANCHES)
+    llm = FakeLlm("Reisegewerbe")
+    assert resolver.resolve("Marktstand ohne feste Adresse", llm=llm) == ("Reisegewerbe", 0.9, "llm")
+    assert resolver.resolve("marktstand ohne feste adresse!", llm=llm) == ("Reisegewerbe", 1.0, "cache")
+    assert llm.calls == ["Marktstand ohne feste Adresse"]
+
+
+@pytest.mark.parametrize("answer, score", [("Filiale", 0.9), ("Reisegewerbe", 0.3), (None, 0.0)])
+def test_unusable_llm_answers_are_not_cached(answer, score):
+    resolver = ChoiceResolver(BRANCHES)
+    llm = FakeLlm(answer, score)
+    assert resolver.resolve("irgendwas", llm=llm)[0] is None
+    assert resolver.cached("irgendwas") is None
+    assert resolver.resolve("irgendwas")[2] == ""
+
+
+def test_registered_translations_become_synonyms_and_localized_labels(monkeypatch):
+    resolver = ChoiceResolver(BRANCHES)
+    resolver.add_translations({"Hauptniederlassung": "Head office", "Zweigniederlassung": "Branch office",
+                               "unselbstständige Zweigstelle": "Dependent branch",
+                               "Reisegewerbe": "Itinerant trade"}, lang="en")
+    monkeypatch.setattr(choice_resolver, "translate_many", lambda texts, lang: pytest.fail("no translation needed"))
+    assert resolver.resolve("head office")[:2] == ("Hauptniederlassung", 1.0)
+    assert resolver.match_localized("Branch ofice", "en")[0] == "Zweigniederlassung"
+
+
+def test_missing_localized_labels_are_translated_once(monkeypatch):
+    calls = []
+
+    def fake_translate_many(texts, lang):
+        calls.append(list(texts))
+        return [f"{lang}:{text}" for text in texts]
+
+    monkeypatch.setattr(choice_resolver, "translate_many", fake_translate_many)
+    resolver = ChoiceResolver(YES_NO)
+    assert resolver.match_localized("xx:ja", "xx") == ("ja", 1.0)
+    assert resolver.match_localized("xx:nein", "xx") == ("nein", 1.0)
+    assert calls == [["ja", "nein"]]
+
+
+def test_cache_is_bounded():
+    resolver = ChoiceResolver(YES_NO, max_cache_items=2)
+    for text in ("a", "b", "c"):
+        resolver.remember(text, "ja")
+    assert resolver.cached("a") is None and resolver.cached("c") == "ja"
@@ -0,0 +1,42 @@
+"""
+Sprachpakete: feste Bot-Texte aus bot_texts.py, Wiederverwendung unveränderter Übersetzungen.
+"""
+
+import json
+from pathlib import Path
+
+from src import bot_texts, i18n_bundles
+from src.i18n_bundles import build_bundle, bundle_path, collect_strings
+
+DEMO_FORM = Path(__file__).resolve().parents[1] / "forms" / "ge" / "Gewerbeanmeldung_demo.json"
+
+
+def _form():
+    return json.loads(DEMO_FORM.read_text(encoding="utf-8"))
+
+
+def test_static_bot_texts_are_collected():
+    strings = collect_strings(_form())
+    assert set(bot_texts.STATIC_TEXTS_DE) <= set(strings)
+    assert len(strings) == len(set(strings))
+
+
+def test_rebuild_translates_only_changed_texts(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_translate(text, lang, model):
+        calls.append(text)
+        return f"[{lang}] {text}"
+
+    monkeypatch.setattr(i18n_bundles, "translate_from_de", fake_translate)
+    form = _form()
+    assert build_bundle("demo", form, "en", str(tmp_path), workers=1)
+    first = len(calls)
+    assert first == len(collect_strings(form))
+    assert not build_bundle("demo", form, "en", str(tmp_path), workers=1)
+
+    form["slots"][0]["prompt"] = "Neue Frage?"
+    assert build_bundle("demo", form, "en", str(tmp_path), workers=1)
+    assert calls[first:] == ["Neue Frage?"]
+    bundle = json.loads(Path(bundle_path(str(tmp_path), "demo", "en")).read_text(encoding="utf-8"))
+    assert bundle["strings"][bot_texts.UPLOAD_LABEL] == f"[en] {bot_texts.UPLOAD_LABEL}"
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from src import llm_validator_service
+from src.llm_cache import SqliteCache
+from src.llm_validator_service import LLMValidatorService
+from src.openai_clients import get_async_http_client
+
+
+class Verdict(BaseModel):
+    validity: str
+
+
+class FakeResponses:
+    def __init__(self):
+        self.calls = 0
+
+    def parse(self, model, input, text_format):
+        self.calls += 1
+        return SimpleNamespace(output_parsed=text_format(validity="VALID"), output_text='{"validity":"VALID"}')
+
+
+def fake_client(base_url="https://api.openai.com/v1/"):
+    return SimpleNamespace(base_url=base_url, responses=FakeResponses())
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SqliteCache(":memory:")
+    monkeypatch.setattr(LLMValidatorService, "cache", cache)
+    return cache
+
+
+def _structured(client, **kwargs):
+    return LLMValidatorService().validate_openai_structured_output(
+        system_prompt="prompt", user_input="Max Mustermann, 01.01.1980", json_schema=Verdict,
+        model="gpt-4.1-mini", client=client, **kwargs)
+
+
+def test_structured_output_is_not_cached_by_default(cache):
+    client = fake_client()
+    _structured(client)
+    _structured(client)
+    assert client.responses.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_structured_output_opt_in_cache(cache):
+    client = fake_client()
+    _structured(client, cache=True)
+    response = _structured(client, cache=True)
+    assert client.responses.calls == 1
+    assert response.output_parsed == Verdict(validity="VALID")
+
+
+def test_cache_key_includes_endpoint(cache):
+    openai, local = fake_client(), fake_client("http://localhost:8000/v1/")
+    _structured(openai, cache=True)
+    _structured(local, cache=True)
+    assert local.responses.calls == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_file_is_created_lazily(tmp_path):
+    path = tmp_path / "sub" / "llm_cache.sqlite"
+    cache = SqliteCache(str(path))
+    assert not path.exists()
+    assert cache.stats()["entries"] == 0
+    cache.set("k", "v")
+    assert path.exists() and cache.get("k") == "v"
+
+
+# -- Async-Varianten -----------------------------------------------------------
+
+class FakeAsyncResponses(FakeResponses):
+    async def parse(self, model, input, text_format):
+        return FakeResponses.parse(self, model, input, text_format)
+
+
+def test_async_structured_output_shares_cache_with_sync(cache):
+    client = fake_client()
+    _structured(client, cache=True)
+    async_client = SimpleNamespace(base_url=client.base_url, responses=FakeAsyncResponses())
+    response = asyncio.run(LLMValidatorService().avalidate_openai_structured_output(
+        system_prompt="prompt", user_input="Max Mustermann, 01.01.1980", json_schema=Verdict,
+        model="gpt-4.1-mini", client=async_client, cache=True))
+    assert async_client.responses.calls == 0
+    assert response.output_parsed == Verdict(validity="VALID")
+
+
+def test_avalidate_locally_uses_shared_http_client(cache, monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"content": " VALID "})
+
+    async def run():
+        shared = get_async_http_client()
+        assert get_async_http_client() is shared
+        monkeypatch.setattr(llm_validator_service, "get_async_http_client",
+                            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        first = await LLMValidatorService.avalidate_locally("prompt", "http://llm.local/completion")
+        second = await LLMValidatorService.avalidate_locally("prompt", "http://llm.local/completion")
+        return first, second
+
+    assert asyncio.run(run()) == ("VALID", "VALID")
+    assert len(requests) == 1
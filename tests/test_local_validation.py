@@ -0,0 +1,106 @@
+"""
+Lokale Vorprüfungen: Adressen, Länder/Staatsangehörigkeiten und zu allgemeine Tätigkeiten.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.local_validation import classify_activity, match_country, parse_german_address
+
+
+@pytest.mark.parametrize("text, payload", [
+    ("Hauptstraße 5, 73033 Göppingen", "Hauptstraße, 5, 73033, Göppingen"),
+    ("Am Markt 12a 10115 Berlin", "Am Markt, 12a, 10115, Berlin"),
+    ("Bahnhofstr. 3-5, D-70173 Stuttgart", "Bahnhofstr., 3-5, 70173, Stuttgart"),
+    ("Lange Reihe 7 / 2, 20099 Hamburg", "Lange Reihe, 7/2, 20099, Hamburg"),
+])
+def test_complete_address_is_parsed(text, payload):
+    decision = parse_german_address(text)
+    assert decision.valid and decision.payload == payload
+
+
+def test_known_city_gets_its_canonical_spelling():
+    assert parse_german_address("Poststr. 1, 73033 goeppingen").payload == "Poststr., 1, 73033, Göppingen"
+
+
+@pytest.mark.parametrize("postal_code, valid", [("00999", False), ("01000", True), ("99999", True)])
+def test_postal_code_rule_matches_the_llm_prompt(postal_code, valid):
+    decision = parse_german_address(f"Hauptstraße 5, {postal_code} Göppingen")
+    assert decision.valid is valid
+    assert valid or postal_code in decision.reason
+
+
+@pytest.mark.parametrize("text", [
+    "Hauptstraße 5", "73033 Göppingen", "Postfach", "",
+    "Hauptstraße 5, 73033 Göpingen",            # Tippfehler im Ort -> Korrektur durch das LLM
+    "Dorfstraße 1, 99999 Kleinkleckersdorf",     # unbekannter Ort
+])
+def test_incomplete_address_goes_to_the_llm(text):
+    assert parse_german_address(text) is None
+
+
+@pytest.mark.parametrize("text, country", [
+    ("Frankreich", "Frankreich"),
+    ("frankreich ", "Frankreich"),
+    ("türkisch", "Türkei"),
+    ("Tuerkei", "Türkei"),
+    ("USA", "Vereinigte Staaten"),
+    ("Osterreich", "Österreich"),
+    ("Itallien", "Italien"),
+    ("deutsch", "Deutschland"),
+])
+def test_country_names_aliases_and_typos(text, country):
+    assert match_country(text) == country
+
+
+@pytest.mark.parametrize("text", ["Atlantis", "Niger ia Mali", ""])
+def test_unknown_country_goes_to_the_llm(text):
+    assert match_country(text) is None
+
+
+@pytest.mark.parametrize("text", [
+    "Handel mit Waren aller Art", "Dienstleistungen aller Art", "Dinge verkaufen",
+    "Allgemeine Dienstleistungen", "Online Marketing", "Import/Export", "Verkauf diverser Produkte",
+])
+def test_generic_activity_is_too_general(text):
+    assert classify_activity(text) is False
+
+
+@pytest.mark.parametrize("text", [
+    "Herstellung von Kinderspielwaren", "Großhandel mit Elektrowaren", "Sanitärdienstleistungen",
+    "Import/Export von Menschen", "Herstellung von Möbeln aller Art",
+])
+def test_specific_activity_goes_to_the_llm(text):
+    assert classify_activity(text) is None
+
+
+class CountryService:
+    def __init__(self, country_name):
+        self.country_name = country_name
+        self.prompts = []
+
+    def validate_openai_json_mode(self, system_prompt, user_input, json_schema, model, client, cache=False):
+        self.prompts.append(system_prompt)
+        return SimpleNamespace(output_parsed=None, output_text=json.dumps(
+            {"validity": "VALID", "country_name": self.country_name}))
+
+
+@pytest.fixture(scope="module")
+def validators():
+    from src.validators import GewerbeanmeldungValidators
+    return GewerbeanmeldungValidators()
+
+
+@pytest.mark.parametrize("text", ["Deutschland", "deutsch", "BRD"])
+def test_other_nationality_rejects_germany_locally(validators, text):
+    valid, reason, payload = validators.valid_other_nationality(text, llm_service=CountryService("Frankreich"))
+    assert not valid and payload == ""
+
+
+def test_other_nationality_rejects_germany_from_the_llm(validators):
+    service = CountryService("Bundesrepublik Deutschland")
+    valid, _, payload = validators.valid_other_nationality("Dschörmany", llm_service=service)
+    assert not valid and payload == ""
+    assert "Deutschland" in service.prompts[0]
@@ -0,0 +1,74 @@
+"""
+Parallele OCR-Stufe: Seitenreihenfolge, Ein-Seiten-Abkürzung und Abbruch durch den Verbraucher.
+pytesseract.image_to_string wird ersetzt; die "Seiten" sind (Nummer, Dauer)-Tupel.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src import ocr
+from src.ocr_preprocessing import PreprocessConfig
+
+OFF = PreprocessConfig(steps=())
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    """Fake image_to_string: sleeps for the page's duration and records start/finish order and thread."""
+    log = SimpleNamespace(started=[], finished=[], threads=[], lock=threading.Lock())
+
+    def image_to_string(page, lang):
+        number, seconds = page
+        with log.lock:
+            log.started.append(number)
+            log.threads.append(threading.current_thread().name)
+        time.sleep(seconds)
+        with log.lock:
+            log.finished.append(number)
+        return f"Seite {number}\n"
+
+    monkeypatch.setattr(ocr, "pytesseract", SimpleNamespace(image_to_string=image_to_string))
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ocr-test")
+    monkeypatch.setattr(ocr, "_OCR_POOL", pool)
+    yield log
+    pool.shutdown(wait=True)
+
+
+def test_pages_are_yielded_in_order_when_they_finish_out_of_order(tesseract):
+    pages = [(0, 0.3), (1, 0.05), (2, 0.05), (3, 0.01)]
+    assert list(ocr.iter_page_texts(pages, preprocessing=OFF)) == [f"Seite {i}\n" for i in range(4)]
+    assert tesseract.finished[0] != 0                      # Seite 0 war nicht als erste fertig
+    assert ocr.ocr_text(pages, preprocessing=OFF) == "".join(f"Seite {i}\n" for i in range(4))
+
+
+def test_page_is_yielded_before_later_pages_finish(tesseract):
+    pages = [(0, 0.01), (1, 0.5)]
+    texts = ocr.iter_page_texts(pages, preprocessing=OFF)
+    start = time.perf_counter()
+    assert next(texts) == "Seite 0\n"
+    assert time.perf_counter() - start < 0.4
+    assert list(texts) == ["Seite 1\n"]
+
+
+def test_single_page_runs_in_the_calling_thread(tesseract):
+    assert ocr.ocr_text([(0, 0.0)], preprocessing=OFF) == "Seite 0\n"
+    assert tesseract.threads == [threading.current_thread().name]
+
+
+def test_stopping_the_consumer_cancels_pending_pages(tesseract):
+    pages = [(i, 0.1) for i in range(10)]
+    texts = ocr.iter_page_texts(pages, preprocessing=OFF)
+    assert next(texts) == "Seite 0\n"
+    texts.close()
+    time.sleep(0.4)
+    assert len(tesseract.started) < len(pages)
+
+
+def test_missing_tesseract_is_reported(monkeypatch):
+    monkeypatch.setattr(ocr, "pytesseract", None)
+    with pytest.raises(RuntimeError, match="pytesseract"):
+        ocr.ocr_page((0, 0.0), preprocessing=OFF)
@@ -0,0 +1,67 @@
+"""
+Bildvorverarbeitung: Kanalreihenfolge, Zuschnitt/Schräglage am Handyfoto, A4-Seiten aus PDFs.
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.ocr_preprocessing import (
+    STEPS, PreprocessConfig, config_from_env, crop_to_document, estimate_skew, normalize_resolution, preprocess,
+    to_grayscale,
+)
+
+IMAGES = Path(__file__).resolve().parents[1] / "images"
+
+
+def _rgb(name):
+    img = cv2.imread(str(IMAGES / name))
+    assert img is not None, name
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def test_grayscale_respects_channel_order():
+    red_rgb = np.zeros((4, 4, 3), np.uint8)
+    red_rgb[..., 0] = 255
+    red_bgr = red_rgb[..., ::-1].copy()
+    assert to_grayscale(red_rgb)[0, 0] == 76                 # 0.299 * 255
+    assert to_grayscale(red_bgr, "BGR")[0, 0] == 76
+    assert to_grayscale(red_bgr)[0, 0] == 29                 # falsch gelesen: 0.114 * 255
+
+
+def test_pil_images_are_converted():
+    config = PreprocessConfig(steps=("grayscale",))
+    red = Image.new("RGB", (4, 4), (255, 0, 0))
+    assert preprocess(red, config)[0, 0] == 76
+    assert preprocess(red.convert("P"), config)[0, 0] == 76
+    assert preprocess(red.convert("RGBA"), config)[0, 0] == 76
+
+
+def test_photographed_page_is_cropped_and_deskewed():
+    photo = _rgb("hra_auszug_foto.jpg")
+    config = PreprocessConfig()
+    cropped = crop_to_document(photo, config)
+    assert cropped.shape[0] < photo.shape[0] * 0.85
+    assert estimate_skew(photo, config) == pytest.approx(-4.0, abs=0.5)
+
+
+def test_a4_page_is_not_cropped_and_scaled_to_target_dpi():
+    page = _rgb("hra_auszug_a4.png")
+    config = PreprocessConfig()
+    assert crop_to_document(page, config).shape == page.shape
+    assert max(normalize_resolution(page, config).shape[:2]) == pytest.approx(297 / 25.4 * 300, abs=2)
+    assert preprocess(page, config).ndim == 2
+
+
+@pytest.mark.parametrize("spec, steps", [
+    (None, ()), ("off", ()), ("all", STEPS), ("grayscale, resize", ("grayscale", "resize")), ("bogus", ()),
+])
+def test_preprocessing_is_opt_in(monkeypatch, spec, steps):
+    if spec is None:
+        monkeypatch.delenv("OCR_PREPROCESS", raising=False)
+    else:
+        monkeypatch.setenv("OCR_PREPROCESS", spec)
+    assert config_from_env().steps == steps
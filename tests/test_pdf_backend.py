@@ -0,0 +1,118 @@
+import io
+
+import pikepdf
+import pytest
+
+from src.pdf_backend import GenericPdfFiller, is_winansi
+
+TEMPLATE = "pdfs/gewerbeanmeldung.pdf"
+
+
+def _fill(data, appearance):
+    pdf_bytes = GenericPdfFiller(payload={"pdf_file": TEMPLATE, "data": data}).fill_bytes(appearance)
+    return pikepdf.open(io.BytesIO(pdf_bytes))
+
+
+def _widgets(pdf):
+    return {str(a.get("/T")): a for page in pdf.pages for a in page.get("/Annots", [])
+            if a.get("/Subtype") == pikepdf.Name("/Widget")}
+
+
+NAMES = {
+    "family_name": {"value": "Yılmaz", "target_filed_name": "txtFamiliennameS1"},
+    "given_name": {"value": "Jörg", "target_filed_name": "txtVornamenS1"},
+}
+
+
+def test_is_winansi():
+    assert is_winansi("Jörg Müller, Straße 1 – 5 €")
+    assert not any(is_winansi(text) for text in ("Şahin", "Yılmaz", "Łódź", "Nguyễn", "李"))
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_generate_leaves_non_winansi_values_to_the_viewer(caplog):
+    pdf = _fill(NAMES, "generate")
+    widgets = _widgets(pdf)
+    assert "/AP" not in widgets["txtFamiliennameS1"]
+    assert str(widgets["txtFamiliennameS1"]["/V"]) == "Yılmaz"
+    assert "/AP" in widgets["txtVornamenS1"]
+    assert pdf.Root.AcroForm.NeedAppearances
+    assert "txtFamiliennameS1" in caplog.text
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_flatten_keeps_non_winansi_fields_interactive():
+    pdf = _fill(NAMES, "flatten")
+    assert set(_widgets(pdf)) == {"txtFamiliennameS1"}
+    assert pdf.Root.AcroForm.NeedAppearances
+    assert len(pdf.Root.AcroForm.Fields) == 1
+
+
+def test_flatten_without_fallback_removes_the_form():
+    pdf = _fill({"given_name": NAMES["given_name"]}, "flatten")
+    assert not _widgets(pdf)
+    assert "/AcroForm" not in pdf.Root
+
+
+# -- FillPlan -------------------------------------------------------------------
+DEMO_FORM = "forms/ge/Gewerbeanmeldung_demo.json"
+
+
+def _demo_form():
+    import json
+    with open(DEMO_FORM, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _demo_responses(form, choice_index=0):
+    """One answer per slot in the save_responses_to_json format (choice slots: choices[choice_index])."""
+    responses = {}
+    for slot in form["slots"]:
+        entry = {"target_filed_name": slot.get("filed_name")}
+        if slot.get("choices"):
+            choice = slot["choices"][min(choice_index, len(slot["choices"]) - 1)]
+            entry["value"] = {"ja": "true", "nein": "false"}.get(choice, choice)
+            entry["choices"] = slot["choices"]
+        else:
+            entry["value"] = f"Wert {slot['slot_name']}"
+        if slot.get("check_box_condition"):
+            entry["check_box_condition"] = slot["check_box_condition"]
+        responses[slot["slot_name"]] = entry
+    return responses
+
+
+@pytest.mark.parametrize("choice_index", [0, 1, 3])
+def test_fill_plan_matches_the_payload_mapping(choice_index):
+    from src.pdf_backend import build_field_map, compile_fill_plan
+    form = _demo_form()
+    plan = compile_fill_plan(form)
+    responses = _demo_responses(form, choice_index)
+    assert plan.unknown_fields == ()
+    assert plan.field_map(responses) == build_field_map(responses)
+
+
+def test_fill_plan_field_map_details():
+    from src.pdf_backend import compile_fill_plan
+    form = _demo_form()
+    field_map = compile_fill_plan(form).field_map({
+        "registered_type": {"value": "GmbH"},
+        "registered_name": {"value": "Muster"},
+        "hra_office": {"value": "Stuttgart"},
+        "hra_number": {"value": ""},
+        "registration_for": {"value": "Zweigniederlassung"},
+        "nationality": {"value": "false"},
+    })
+    assert field_map["txtEintragungsnameS1"] == "GmbH, Muster"   # gemeinsames Feld, leere Werte entfallen
+    assert field_map["txtEintragungsortS1"] == "Stuttgart"
+    assert field_map["chkErstattung2S2"] == "/Y" and "chkErstattung1S2" not in field_map
+    assert field_map["chkStaat2S1"] == "/Y" and "chkStaat1S1" not in field_map
+
+
+def test_fill_plan_reports_unknown_fields_and_falls_back_for_unplanned_slots():
+    from src.pdf_backend import compile_fill_plan
+    form = _demo_form()
+    form["slots"][0]["filed_name"] = "txtGibtEsNicht"
+    plan = compile_fill_plan(form)
+    assert plan.unknown_fields == ((form["slots"][0]["slot_name"], "txtGibtEsNicht"),)
+    extra = {"extra": {"value": "x", "target_filed_name": "txtBeginnS2"}}
+    assert plan.field_map(extra) == {"txtBeginnS2": "x"}
@@ -0,0 +1,107 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.pdf_batch import fill_batch, iter_fill_batch, unique_ids
+
+ROOT = Path(__file__).resolve().parents[1]
+FORM = "Gewerbeanmeldung_demo"
+
+
+def _payload(doc_id, name="Muster", form_type=FORM, pdf_file="pdfs/gewerbeanmeldung.pdf"):
+    return {"id": doc_id, "form_type": form_type, "pdf_file": pdf_file,
+            "data": {"family_name": {"value": name, "target_filed_name": "txtFamiliennameS1"}}}
+
+
+def _write_jsonl(path, payloads):
+    path.write_text("\n".join(json.dumps(p) for p in payloads) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_unique_ids_suffixes_duplicates():
+    renamed = []
+    ids = [doc_id for doc_id, _ in unique_ids(iter([("a", 1), ("b", 2), ("a", 3), ("a", 4)]), renamed)]
+    assert ids == ["a", "b", "a-2", "a-3"]
+    assert renamed == [("a", "a-2"), ("a", "a-3")]
+
+
+def test_fill_batch_success(tmp_path):
+    source = _write_jsonl(tmp_path / "in.jsonl", [_payload(f"doc{i}") for i in range(5)])
+    result = fill_batch(source, str(tmp_path / "out"), workers=2, chunksize=2)
+    assert (result.succeeded, result.failures) == (5, [])
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [f"doc{i}.pdf" for i in range(5)]
+    assert all((tmp_path / "out" / f"doc{i}.pdf").read_bytes().startswith(b"%PDF") for i in range(5))
+
+
+def test_per_document_errors_do_not_abort_the_batch(tmp_path):
+    source = tmp_path / "in.jsonl"
+    _write_jsonl(source, [_payload("ok1"), _payload("missing", pdf_file="pdfs/does_not_exist.pdf"), _payload("ok2")])
+    with open(source, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+    result = fill_batch(str(source), str(tmp_path / "out"), workers=2, chunksize=1)
+    assert result.succeeded == 2
+    assert [doc_id for doc_id, _ in result.failures] == ["missing", "line-000004"]
+
+
+def test_broken_form_only_fails_its_documents(tmp_path):
+    forms = tmp_path / "forms"
+    forms.mkdir()
+    shutil.copy(ROOT / "forms" / "ge" / f"{FORM}.json", forms)
+    (forms / "Kaputt.json").write_text(json.dumps({"pdf_file": "pdfs/fehlt.pdf", "slots": []}), encoding="utf-8")
+    source = _write_jsonl(tmp_path / "in.jsonl", [_payload("a"), _payload("b", form_type="Kaputt"), _payload("c")])
+
+    result = fill_batch(source, str(tmp_path / "out"), workers=2, forms_path=str(forms), chunksize=1)
+    assert result.succeeded == 2
+    assert len(result.failures) == 1 and result.failures[0][0] == "b"
+    assert "Kaputt" in result.failures[0][1]
+
+
+def test_results_stream_in_input_order_with_unique_ids(tmp_path):
+    ids = [f"doc{i:02d}" for i in range(12)] + ["doc03"]
+    source = _write_jsonl(tmp_path / "in.jsonl", [_payload(doc_id) for doc_id in ids])
+    renamed = []
+    results = list(iter_fill_batch(source, str(tmp_path / "out"), workers=3, chunksize=2, window=2,
+                                   renamed=renamed))
+    assert [doc_id for doc_id, _ in results] == ids[:-1] + ["doc03-2"]
+    assert all(error is None for _, error in results)
+    assert renamed == [("doc03", "doc03-2")]
+    assert (tmp_path / "out" / "doc03-2.pdf").exists()
+
+
+@pytest.mark.parametrize("window", [1, 4])
+def test_source_is_consumed_lazily(tmp_path, monkeypatch, window):
+    """Only window * chunksize payloads are read ahead of the first result."""
+    consumed = []
+
+    def payloads(_source):
+        for i in range(50):
+            consumed.append(i)
+            yield f"doc{i}", _payload(f"doc{i}")
+
+    monkeypatch.setattr("src.pdf_batch.iter_payloads", payloads)
+    results = iter_fill_batch("ignored", str(tmp_path / "out"), workers=1, chunksize=2, window=window)
+    next(results)
+    assert len(consumed) <= window * 2 + 1
+    results.close()
+
+
+def test_non_object_lines_fail_only_their_document(tmp_path):
+    source = tmp_path / "in.jsonl"
+    source.write_text("\n".join([json.dumps(_payload("ok1")), "[1, 2]", '"x"', "null", json.dumps(_payload("ok2"))]) + "\n",
+                      encoding="utf-8")
+    result = fill_batch(str(source), str(tmp_path / "out"), workers=2, chunksize=1)
+    assert result.succeeded == 2
+    assert [doc_id for doc_id, _ in result.failures] == ["line-000002", "line-000003", "line-000004"]
+    assert all("kein JSON-Objekt" in error for _, error in result.failures)
+
+
+@pytest.mark.parametrize("bad_id", ["../../escape", "/etc/foo", "a/b", ".hidden", "x" * 200, ""])
+def test_unsafe_ids_fall_back_to_the_line_number(tmp_path, bad_id):
+    out = tmp_path / "nested" / "out"
+    source = _write_jsonl(tmp_path / "in.jsonl", [_payload("ok"), _payload(bad_id)])
+    result = fill_batch(source, str(out), workers=1, chunksize=1)
+    assert result.failures == [] and result.succeeded == 2
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*.pdf")) == [
+        "nested/out/line-000002.pdf", "nested/out/ok.pdf"]
@@ -0,0 +1,60 @@
+"""
+Schlüssel und Stufen des PDF-Caches (Speicher-LRU vor dem ArtifactStore).
+"""
+
+import shutil
+
+from src.artifact_store import ArtifactStore
+from src.pdf_backend import get_template
+from src.pdf_cache import PdfCache
+
+TEMPLATE = "pdfs/gewerbeanmeldung.pdf"
+
+
+def _payload(data, form_type="Gewerbeanmeldung_demo", pdf_file=TEMPLATE):
+    return {"pdf_file": pdf_file, "form_type": form_type, "data": data}
+
+
+DATA = {
+    "family_name": {"value": "Muster", "target_filed_name": "txtFamiliennameS1"},
+    "given_name": {"value": "Erika", "target_filed_name": "txtVornamenS1"},
+}
+
+
+def test_key_ignores_order_but_not_content():
+    key = PdfCache.key_for(_payload(DATA))
+    reordered = {name: dict(reversed(list(entry.items()))) for name, entry in reversed(list(DATA.items()))}
+    assert PdfCache.key_for(_payload(reordered)) == key
+    changed = {**DATA, "given_name": {"value": "Erik", "target_filed_name": "txtVornamenS1"}}
+    assert PdfCache.key_for(_payload(changed)) != key
+
+
+def test_key_depends_on_appearance_form_and_template(tmp_path):
+    key = PdfCache.key_for(_payload(DATA))
+    assert PdfCache.key_for(_payload(DATA), appearance="flatten") != key
+    assert PdfCache.key_for(_payload(DATA, form_type="andere")) != key
+
+    copy = tmp_path / "kopie.pdf"
+    shutil.copyfile(get_template(TEMPLATE).path, copy)
+    assert PdfCache.key_for(_payload(DATA, pdf_file=str(copy))) == key   # gleicher Inhalt, gleicher Schlüssel
+    copy.write_bytes(copy.read_bytes() + b"\n% geaendert\n")
+    assert PdfCache.key_for(_payload(DATA, pdf_file=str(copy))) != key
+
+
+def test_key_ignores_the_session_language():
+    key = PdfCache.key_for(_payload(DATA))
+    assert PdfCache.key_for({**_payload(DATA), "lang": "tr"}) == key
+    assert PdfCache.key_for({**_payload(DATA), "lang": "de"}) == key
+
+
+def test_memory_miss_is_served_from_the_store(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    cache = PdfCache(store=store, max_memory_items=1)
+    first = cache.get_or_fill(_payload(DATA))
+    assert cache.misses == 1 and first.startswith(b"%PDF")
+
+    other = _payload({"family_name": {"value": "Beispiel", "target_filed_name": "txtFamiliennameS1"}})
+    cache.get_or_fill(other)                                   # verdrängt den ersten Eintrag aus dem Speicher
+    assert PdfCache(store=store).get_or_fill(_payload(DATA)) == first
+    assert cache.get_or_fill(_payload(DATA)) == first
+    assert cache.hits == 1 and cache.misses == 2
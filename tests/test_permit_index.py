@@ -0,0 +1,87 @@
+"""
+Recall der lokalen Vorauswahl gegen das gelabelte Evaluationsset tests/data/permit_eval.json.
+Vor einer Änderung von PERMIT_MIN_SCORE, PERMIT_CONFIDENT_SCORE oder QUERY_SYNONYMS hier nachmessen.
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.permit_index import get_permit_index, parse_permit_list
+
+EVAL_SET = json.loads((Path(__file__).parent / "data" / "permit_eval.json").read_text(encoding="utf-8"))
+PERMIT_CASES = [case for case in EVAL_SET if case["expected"]]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return get_permit_index()
+
+
+def test_eval_set_labels_exist_in_the_list(index):
+    titles = {entry.title for entry in index.entries}
+    for case in PERMIT_CASES:
+        assert set(case["expected"]) <= titles, case["activity"]
+
+
+@pytest.mark.parametrize("case", PERMIT_CASES, ids=lambda case: case["activity"])
+def test_permit_activity_reaches_the_llm_with_its_entry(index, case):
+    """A permit-bound activity gets either the full list or a shortlist that contains its entry."""
+    shortlist = index.shortlist(case["activity"])
+    if shortlist is not None:
+        assert {entry.title for entry in shortlist} & set(case["expected"])
+
+
+def test_shortlist_recall_baseline(index):
+    """Share of permit-bound activities answered with the small prompt and the right entry (baseline)."""
+    hits = 0
+    for case in PERMIT_CASES:
+        shortlist = index.shortlist(case["activity"])
+        hits += shortlist is not None and bool({entry.title for entry in shortlist} & set(case["expected"]))
+    assert hits >= 22, f"{hits}/{len(PERMIT_CASES)}"  # Stand: 22/30
+
+
+@pytest.mark.parametrize("activity", ["Online Marketing", "Hausverwaltung", "Kiosk", "Eisdiele"])
+def test_weak_matches_fall_back_to_the_full_list(index, activity):
+    assert index.shortlist(activity) is None
+
+
+def test_parse_merges_split_titles():
+    entries = parse_permit_list(
+        "Augenoptiker\n(Handwerk)\nErlaubnis nach Handwerksordnung\nzuständige Behörde: Handwerkskammer\n"
+        "Bewachungsgewerbe\nErlaubnis nach § 34 a Gewerbeordnung\n"
+    )
+    assert [entry.title for entry in entries] == ["Augenoptiker (Handwerk)", "Bewachungsgewerbe"]
+    assert entries[0].details == ("Erlaubnis nach Handwerksordnung", "zuständige Behörde: Handwerkskammer")
+
+
+# -- check_if_permit_is_required ---------------------------------------------
+
+class RecordingService:
+    def __init__(self):
+        self.prompts = []
+
+    def validate_openai_structured_output(self, system_prompt, user_input, json_schema, client, model, cache=False):
+        self.prompts.append(system_prompt)
+        return SimpleNamespace(output_parsed=json_schema(validity="INVALID", permit_reason=""))
+
+
+@pytest.fixture(scope="module")
+def validators():
+    from src.validators import GewerbeanmeldungValidators
+    return GewerbeanmeldungValidators()
+
+
+def test_unmatched_activity_is_checked_against_the_full_list(validators, index):
+    service = RecordingService()
+    assert validators.check_if_permit_is_required("Online Marketing", llm_service=service)[0] == "INVALID"
+    assert index.full_text in service.prompts[0]
+
+
+def test_confident_match_sends_only_candidates(validators, index):
+    service = RecordingService()
+    validators.check_if_permit_is_required("Friseursalon", llm_service=service)
+    assert "Friseure (Handwerk)" in service.prompts[0]
+    assert index.full_text not in service.prompts[0]
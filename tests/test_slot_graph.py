@@ -0,0 +1,91 @@
+"""
+Sperren, Aufbewahren und Wiederöffnen abhängiger Slots sowie die geordnete Liste offener Slots.
+"""
+
+from src.slot_graph import ResponseChange, SlotList, compile_slot_graph, graph_for
+
+
+def _slots():
+    return SlotList([
+        {"slot_name": "nationality", "filed_name": "f_nat"},
+        {"slot_name": "other_nationality", "filed_name": "f_other",
+         "condition": {"slot_name": "nationality", "slot_value": "false"}},
+        {"slot_name": "name", "filed_name": "f_name"},
+        {"slot_name": "branch_address", "filed_name": "f_branch",
+         "condition": {"slot_name": "nationality", "slot_value": ["false", "unknown"]}},
+    ])
+
+
+def _answer(value, field):
+    return {"value": value, "target_filed_name": field}
+
+
+def test_unmet_condition_is_soft_skipped():
+    graph = compile_slot_graph(_slots())
+    state = {"idx": 0, "responses": {}}
+    assert graph.next_open(state) == 0
+    graph.set_response(state, "nationality", _answer("true", "f_nat"))
+    state["idx"] = 1
+    assert graph.next_open(state) == 2
+    assert state["responses"]["other_nationality"]["locked"] is True
+
+
+def test_changing_the_parent_stashes_and_restores_dependent_answers():
+    graph = compile_slot_graph(_slots())
+    state = {"idx": 0, "responses": {}}
+    graph.set_response(state, "nationality", _answer("false", "f_nat"))
+    graph.set_response(state, "other_nationality", _answer("Frankreich", "f_other"))
+
+    change = graph.set_response(state, "nationality", _answer("true", "f_nat"))
+    assert change == ResponseChange(locked=("other_nationality",))
+    assert state["responses"]["other_nationality"]["locked"] is True
+    assert state["stashed_responses"]["other_nationality"]["value"] == "Frankreich"
+
+    change = graph.set_response(state, "nationality", _answer("false", "f_nat"))
+    assert change.restored == ("other_nationality",)
+    assert state["responses"]["other_nationality"]["value"] == "Frankreich"
+    assert "other_nationality" not in state["stashed_responses"]
+
+
+def test_reopened_slot_without_stash_is_asked_again():
+    graph = compile_slot_graph(_slots())
+    state = {"idx": 0, "responses": {}}
+    graph.set_response(state, "nationality", _answer("true", "f_nat"))
+    state["idx"] = 1
+    assert graph.next_open(state) == 2          # other_nationality gesperrt, aus der offenen Liste entfernt
+    graph.set_response(state, "name", _answer("Muster", "f_name"))
+    state["idx"] = 3
+
+    change = graph.set_response(state, "nationality", _answer("false", "f_nat"))
+    assert change.reopened == ("other_nationality", "branch_address")
+    assert change.locked == ()
+    assert state["idx"] == 1
+    assert graph.next_open(state) == 1
+
+
+def test_unchanged_answer_reports_nothing():
+    graph = compile_slot_graph(_slots())
+    state = {"idx": 0, "responses": {}}
+    graph.set_response(state, "nationality", _answer("true", "f_nat"))
+    assert graph.set_response(state, "nationality", _answer("true", "f_nat")) == ResponseChange()
+
+
+def test_open_list_skips_answers_written_directly_and_resets_per_form():
+    graph = compile_slot_graph(_slots())
+    state = {"idx": 0, "responses": {"nationality": _answer("true", "f_nat"), "name": _answer("Muster", "f_name")}}
+    assert graph.next_open(state) is None
+    assert state["open_slots"]["positions"] == []
+
+    other = compile_slot_graph(SlotList([{"slot_name": "a"}, {"slot_name": "b"}]))
+    state["idx"] = 0
+    assert other.next_open(state) == 0
+    assert state["open_slots"]["form"] == other.key
+
+
+def test_graph_is_attached_to_the_slot_list():
+    slots = _slots()
+    graph = graph_for(slots)
+    assert slots.graph is graph
+    assert graph_for(slots) is graph
+    plain = list(slots)
+    assert graph_for(plain) is not graph
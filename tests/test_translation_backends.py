@@ -0,0 +1,59 @@
+"""
+Basisklasse und Stapelübersetzung des lokalen Backends (Endpoint per monkeypatch ersetzt).
+"""
+
+import json
+
+import pytest
+
+from src import translation_backends
+from src.translation_backends import LocalTranslationBackend, TranslationBackend, parse_json_array
+
+
+class _Response:
+    def __init__(self, content):
+        self._content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"content": self._content}
+
+
+def _endpoint(monkeypatch, answer):
+    calls = []
+
+    def post(endpoint, json, timeout):
+        calls.append(json)
+        return _Response(answer(json["prompt"]))
+
+    monkeypatch.setattr(translation_backends.requests, "post", post)
+    return calls
+
+
+def test_base_class_requires_translate():
+    with pytest.raises(TypeError):
+        TranslationBackend()
+
+
+def test_local_batch_is_one_request(monkeypatch):
+    calls = _endpoint(monkeypatch, lambda prompt: '```json\n["Hello", "Yes"]\n```')
+    backend = LocalTranslationBackend("http://llm")
+    assert backend.translate_many(["Hallo", "Ja"], "de", "en") == ["Hello", "Yes"]
+    assert len(calls) == 1
+    assert json.dumps(["Hallo", "Ja"], ensure_ascii=False) in calls[0]["prompt"]
+    assert calls[0]["max_tokens"] == 2 * backend.max_tokens
+
+
+def test_local_batch_falls_back_to_single_requests(monkeypatch):
+    calls = _endpoint(monkeypatch, lambda prompt: '["only one"]' if "Texts:" in prompt else "single")
+    backend = LocalTranslationBackend("http://llm")
+    assert backend.translate_many(["Hallo", "Ja"], "de", "en") == ["single", "single"]
+    assert len(calls) == 3
+
+
+def test_parse_json_array():
+    assert parse_json_array('Sure: ["a", "b"]') == ["a", "b"]
+    assert parse_json_array("[1, 2]") is None
+    assert parse_json_array("no array") is None
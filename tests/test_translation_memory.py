@@ -0,0 +1,21 @@
+from src.llm_cache import ROOT, cache_from_env
+from src.translation_memory import TranslationMemory
+
+
+def test_relative_path_resolves_against_repo_root():
+    store = cache_from_env("cache/translation_memory.sqlite", ttl_hours=None, max_entries=10)
+    assert store.path == str(ROOT / "cache" / "translation_memory.sqlite")
+
+
+def test_store_is_opened_lazily_and_user_input_stays_in_memory(tmp_path):
+    path = tmp_path / "tm.sqlite"
+    memory = TranslationMemory(store=cache_from_env(str(path), ttl_hours=None, max_entries=10))
+    assert not path.exists()
+
+    memory.put("to_de", "en", "gpt", "my name is Max", "mein Name ist Max")
+    assert not path.exists()
+    assert memory.get("to_de", "en", "gpt", "my name is Max") == "mein Name ist Max"
+
+    memory.put("from_de", "en", "gpt", "Ihre Adresse?", "Your address?")
+    assert path.exists()
+    assert memory.store.stats()["entries"] == 1
@@ -0,0 +1,129 @@
+"""
+Memoisierung der valid_*-Methoden (memoize_validator / ValidatorResultCache).
+"""
+
+from types import SimpleNamespace
+
+from src import validator_cache
+from src import validators as validators_module
+from src.local_validation import VALIDATOR_METRICS
+from src.validator_cache import ValidatorResultCache, memoize_validator, uncached
+
+
+def _validators(cache, **options):
+    class Validators:
+        def __init__(self):
+            self.calls = []
+
+        @memoize_validator(cache=cache, **options)
+        def valid_thing(self, x, llm_service=None):
+            self.calls.append(x)
+            return (bool(x), "", x)
+
+        @memoize_validator(pure=False)
+        def valid_today(self, x):
+            self.calls.append(x)
+            return (True, "", x)
+
+        @memoize_validator(cache=cache)
+        def valid_nothing(self, x):
+            self.calls.append(x)
+            return None
+
+    return Validators()
+
+
+def test_repeated_input_is_served_from_the_cache():
+    cache = ValidatorResultCache()
+    validators = _validators(cache)
+    before = VALIDATOR_METRICS.snapshot().get(("valid_thing", "cache"), 0)
+    assert validators.valid_thing("Hauptstraße 5") == (True, "", "Hauptstraße 5")
+    assert validators.valid_thing("  Hauptstraße   5 ") == (True, "", "Hauptstraße 5")
+    assert validators.calls == ["Hauptstraße 5"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert VALIDATOR_METRICS.snapshot()[("valid_thing", "cache")] == before + 1
+
+
+def test_results_are_shared_between_instances():
+    cache = ValidatorResultCache()
+    first, second = _validators(cache), _validators(cache)
+    first.valid_thing("x")
+    # eigene Klasse je _validators-Aufruf, aber gleicher __qualname__ -> gleicher Schlüssel
+    assert second.valid_thing("x") == (True, "", "x") and second.calls == []
+
+
+def test_calls_with_extra_arguments_and_impure_validators_bypass_the_cache():
+    cache = ValidatorResultCache()
+    validators = _validators(cache)
+    validators.valid_thing("x", llm_service=object())
+    validators.valid_thing("x", object())
+    validators.valid_today("heute")
+    validators.valid_today("heute")
+    assert validators.calls == ["x", "x", "heute", "heute"]
+    assert cache.stats()["entries"] == 0
+    assert validators.valid_today.__validator_pure__ is False
+
+
+def test_non_tuple_results_and_unhashable_inputs_are_not_cached():
+    cache = ValidatorResultCache()
+    validators = _validators(cache)
+    validators.valid_nothing("x")
+    validators.valid_nothing("x")
+    validators.valid_thing(["a"])
+    validators.valid_thing(["a"])
+    assert validators.calls == ["x", "x", ["a"], ["a"]]
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(validator_cache.time, "monotonic", lambda: now[0])
+    cache = ValidatorResultCache()
+    validators = _validators(cache, ttl=60)
+    validators.valid_thing("x")
+    now[0] += 59
+    validators.valid_thing("x")
+    now[0] += 2
+    validators.valid_thing("x")
+    assert validators.calls == ["x", "x"]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ValidatorResultCache(max_items=2)
+    validators = _validators(cache)
+    for x in ("a", "b", "a", "c", "a", "b"):
+        validators.valid_thing(x)
+    assert validators.calls == ["a", "b", "c", "b"]
+
+
+def test_results_marked_uncached_are_not_memoized():
+    class Validators:
+        calls = 0
+
+        @memoize_validator(cache=ValidatorResultCache())
+        def valid_flaky(self, x):
+            Validators.calls += 1
+            return uncached((False, "Keine Antwort vom LLM", x)) if Validators.calls == 1 else (True, "", x)
+
+    validators = Validators()
+    assert validators.valid_flaky("x") == (False, "Keine Antwort vom LLM", "x")
+    assert validators.valid_flaky("x") == (True, "", "x")
+    assert validators.valid_flaky("x") == (True, "", "x")
+    assert Validators.calls == 2
+
+
+def test_missing_llm_answer_for_an_activity_is_retried(monkeypatch):
+    answers = [None]      # erster Aufruf: keine Antwort vom LLM, danach VALID
+
+    class FlakyService:
+        def validate_openai_structured_output(self, system_prompt, user_input, json_schema, client, model, cache=False):
+            if json_schema is validators_module.ActivityCheckResponse:
+                if answers:
+                    return answers.pop()
+                return SimpleNamespace(output_parsed=json_schema(validity="VALID", reason=""))
+            return SimpleNamespace(output_parsed=json_schema(validity="INVALID", permit_reason=""))
+
+    monkeypatch.setattr(validators_module, "LLMValidatorService", FlakyService)
+    validators = validators_module.GewerbeanmeldungValidators()
+    activity = "Reparatur von Präzisionswaagen für Labore (Cache-Test)"
+    assert validators.valid_activity(activity) == (False, "Keine Antwort vom LLM", activity)
+    assert validators.valid_activity(activity)[0] is True